@@ -0,0 +1,275 @@
+import array
+import itertools
+import math
+
+import prime_sieve
+
+
+# rows printed per table before only the totals are kept
+table_limit = 10000
+
+# rows per chunk handed to prime_stream
+rows_per_chunk = 500
+
+# numbers per segment
+segment_size = 1 << 20
+
+# M(v) for v up to this comes from a prefix table, larger v from the
+# recursion in mertens()
+mertens_table = 1 << 23
+
+
+# mu / phi over [start, end] in fixed-size segments with plain lists,
+# the same slice-at-a-time sieve as _numpy_segments below. Memory stays
+# at one segment and nothing below start is ever sieved.
+def _python_segments(start, end):
+    primes = prime_sieve.small_primes(math.isqrt(end))
+
+    for low in range(start, end + 1, segment_size):
+        high = min(low + segment_size - 1, end)
+        n = high - low + 1
+
+        rem = list(range(low, high + 1))
+        phi = rem[:]
+        mu = [1] * n
+
+        for p in primes:
+            if p * p > high:
+                break
+
+            first = -low % p
+            if first >= n:
+                continue
+
+            mu[first::p] = [-m for m in mu[first::p]]
+            phi[first::p] = [f // p * (p - 1) for f in phi[first::p]]
+            rem[first::p] = [r // p for r in rem[first::p]]
+
+            pk = p * p
+            while pk <= high:
+                first = -low % pk
+                if first < n:
+                    mu[first::pk] = [0] * len(range(first, n, pk))
+                    rem[first::pk] = [r // p for r in rem[first::pk]]
+                pk *= p
+
+        mu = [-m if r > 1 else m for m, r in zip(mu, rem)]
+        phi = [f // r * (r - 1) if r > 1 else f for f, r in zip(phi, rem)]
+
+        yield low, mu, phi
+
+
+# Same mu / phi values in fixed-size NumPy segments, so memory stays
+# bounded however large end is. Each prime up to sqrt(end) is applied to
+# its multiples with slice updates; what is left in rem afterwards is a
+# single prime factor above sqrt(end).
+def _numpy_segments(start, end, np):
+    primes = prime_sieve.small_primes(math.isqrt(end))
+
+    for low in range(start, end + 1, segment_size):
+        high = min(low + segment_size - 1, end)
+        n = high - low + 1
+
+        rem = np.arange(low, high + 1, dtype=np.int64)
+        phi = rem.copy()
+        mu = np.ones(n, dtype=np.int8)
+
+        for p in primes:
+            if p * p > high:
+                break
+
+            first = -low % p
+            if first >= n:
+                continue
+
+            hit = slice(first, n, p)
+            mu[hit] *= -1
+            phi[hit] //= p
+            phi[hit] *= p - 1
+            rem[hit] //= p
+
+            pk = p * p
+            while pk <= high:
+                first = -low % pk
+                if first < n:
+                    hit = slice(first, n, pk)
+                    mu[hit] = 0
+                    rem[hit] //= p
+                pk *= p
+
+        big = rem > 1
+        mu[big] *= -1
+        phi[big] = phi[big] // rem[big] * (rem[big] - 1)
+
+        yield low, mu, phi
+
+
+# (low, mu, phi) for consecutive pieces of [start, end]
+def arith_segments(start, end):
+    start = max(start, 1)
+    if start > end:
+        return
+
+    try:
+        import numpy
+    except ImportError:
+        yield from _python_segments(start, end)
+        return
+
+    yield from _numpy_segments(start, end, numpy)
+
+
+def _total(values):
+    return int(values.sum()) if hasattr(values, "sum") else sum(values)
+
+
+def _zeros(values):
+    if hasattr(values, "count"):
+        return values.count(0)
+    return len(values) - int(values.astype(bool).sum())
+
+
+# running sums base + values[0], base + values[0] + values[1], ...
+def _running(values, base):
+    if hasattr(values, "cumsum"):
+        return (values.cumsum() + base).tolist()
+    return list(itertools.accumulate(values, initial=base))[1:]
+
+
+# Mertens M(x) without sieving up to x: M(v) = 1 - sum M(v // d) over
+# d = 2..v, with the d that share a quotient taken together. Like the
+# Lucy tables in prime_count, large[i] holds M(x // i) and is filled
+# from the largest i down, small[v] is M(v) straight from the sieve up
+# to y ~ x^(2/3).
+def mertens(x):
+    if x < 1:
+        return 0
+
+    y = min(x, max(_iroot(x, 3) ** 2, 1000), mertens_table)
+
+    small = array.array("q", [0])
+    for _, mu, _ in arith_segments(1, y):
+        small.extend(_running(mu, small[-1]))
+
+    if x == y:
+        return small[x]
+
+    large = [0] * (x // (y + 1) + 1)
+
+    for i in range(len(large) - 1, 0, -1):
+        v = x // i
+        total = 1
+        d = 2
+
+        while d <= v:
+            q = v // d
+            e = v // q
+            total -= (e - d + 1) * (small[q] if q <= y else large[i * d])
+            d = e + 1
+
+        large[i] = total
+
+    return large[1]
+
+
+# theta(x), theta(x^(1/2)), theta(x^(1/3)), ... straight from the sieve
+def _theta_parts(x):
+    parts = []
+    k = 1
+
+    while True:
+        r = _iroot(x, k)
+        if r < 2:
+            break
+        parts.append(prime_sieve.prime_stats(r, theta=True)["theta"])
+        k += 1
+
+    return parts
+
+
+# Chebyshev psi(x) is the sum of theta(x^(1/k)), so it needs no
+# enumeration of n at all.
+def chebyshev_psi(x):
+    return math.fsum(_theta_parts(x))
+
+
+def _iroot(x, k):
+    r = int(round(x ** (1 / k)))
+    while r**k > x:
+        r -= 1
+    while (r + 1) ** k <= x:
+        r += 1
+    return r
+
+
+# (fraction done, text) chunks for prime_stream.stream_text: a table of
+# n, mu(n), M(n) and phi(n) over [start, end] (first table_limit rows)
+# followed by the totals.
+def arith_chunks(start, end, cancel):
+    start = max(start, 1)
+    span = max(end - start, 1)
+
+    yield 0, "\n=== Möbius, Mertens and Euler φ ===\n\n"
+    yield 0, f"Range: ({start}, {end})\n\n"
+    yield 0, f"{'n':>10} {'μ(n)':>5} {'M(n)':>8} {'φ(n)':>10}\n"
+
+    m = mertens(start - 1) if start > 1 else 0
+    phi_sum = 0
+    squarefree = 0
+    shown = 0
+
+    for low, mu, phi in arith_segments(start, end):
+        if cancel.is_set():
+            return
+
+        running = m
+        rows = []
+
+        for i in range(min(len(mu), table_limit - shown)):
+            running += int(mu[i])
+            rows.append(
+                f"{low + i:>10} {int(mu[i]):>5} {running:>8} {int(phi[i]):>10}"
+            )
+
+            if len(rows) == rows_per_chunk:
+                yield (low + i - start) / span, "\n".join(rows) + "\n"
+                rows = []
+
+        shown += min(len(mu), table_limit - shown)
+
+        m += _total(mu)
+        phi_sum += _total(phi)
+        squarefree += len(mu) - _zeros(mu)
+
+        tail = "".join(row + "\n" for row in rows)
+        yield (low + len(mu) - 1 - start) / span, tail
+
+    if end - start + 1 > table_limit:
+        yield 1, f"... ({end - start + 1 - table_limit} more rows)\n"
+
+    yield 1, "\n=== Totals ===\n"
+    yield 1, f"M({end}) = {m}\n"
+    yield 1, f"Σφ(n) = {phi_sum}\n"
+    yield 1, f"Squarefree: {squarefree}\n"
+
+    if start == 1:
+        yield 1, f"3n²/π² = {3 * end * end / math.pi**2:.2f}\n"
+
+
+def psi_chunks(x, cancel):
+    yield 1, "\n=== Chebyshev Psi ===\n\n"
+
+    # no prime powers up to x, and no √x to scale by
+    if x < 2:
+        yield 1, f"ψ({x}) = 0 (no primes up to {x})\n"
+        return
+
+    parts = _theta_parts(x)
+    psi = math.fsum(parts)
+    theta = parts[0] if parts else 0.0
+
+    yield 1, f"ψ({x}) = {psi:.6f}\n"
+    yield 1, f"θ({x}) = {theta:.6f}\n"
+    yield 1, f"ψ - θ = {psi - theta:.6f}\n"
+    yield 1, f"ψ - x = {psi - x:.6f}\n"
+    yield 1, f"(ψ - x)/√x = {(psi - x) / math.sqrt(x):.6f}\n"
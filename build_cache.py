@@ -0,0 +1,104 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+
+# Executables built from editor buffers, kept by the hash of the source,
+# the compiler (its path and modification time, so an upgrade counts as a
+# different compiler) and the flags. Running unchanged code again reuses
+# the binary instead of compiling it again.
+cache_dir = os.path.expanduser("~/.build_cache")
+
+# least recently used binaries are removed past this many bytes
+max_bytes = 256 * 2**20
+
+compilers = {"c": "gcc", "c++": "g++"}
+
+
+def _key(source, compiler, flags):
+    info = os.stat(compiler)
+    h = hashlib.sha256()
+
+    for part in (compiler, str(info.st_mtime_ns), *flags, source):
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+
+    return h.hexdigest()
+
+
+# Returns (path of the executable, None), or (None, compiler errors) when
+# the source does not compile. The source goes to the compiler on stdin,
+# so no file is written for it.
+def build(source, language="c", flags=()):
+    compiler = shutil.which(compilers[language])
+    if compiler is None:
+        return None, f"{compilers[language]} not found\n"
+
+    os.makedirs(cache_dir, exist_ok=True)
+    exe = os.path.join(cache_dir, _key(source, compiler, flags))
+
+    if os.path.exists(exe):
+        # a hit counts as a use for the eviction order
+        os.utime(exe)
+        return exe, None
+
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+
+    try:
+        c = subprocess.run(
+            [compiler, "-x", language, "-", "-o", tmp, *flags],
+            input=source,
+            capture_output=True,
+            text=True,
+        )
+
+        if c.returncode != 0:
+            return None, c.stderr
+
+        # two builds of the same code may race here, either result will do
+        os.replace(tmp, exe)
+
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+    _evict(keep=exe)
+    return exe, None
+
+
+def _evict(keep):
+    entries = []
+    total = 0
+
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".tmp"):
+            continue
+
+        try:
+            info = entry.stat()
+        except FileNotFoundError:
+            continue
+
+        entries.append((info.st_mtime, info.st_size, entry.path))
+        total += info.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+
+        if path == keep:
+            continue
+
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+        total -= size
+
+
+def clear():
+    shutil.rmtree(cache_dir, ignore_errors=True)
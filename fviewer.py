@@ -2,7 +2,9 @@ from time import sleep
 import re
 import shutil
 
-RESET = "\033[0m"
+import syntax_tokens
+import term_highlight
+
 ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
 terminal_width = shutil.get_terminal_size().columns
 
@@ -10,22 +12,6 @@ variable_color = "\033[1;38;2;255;140;0m"
 string_color = "\033[1;38;2;173;216;230m"
 preprocessor_color = "\033[1;38;2;255;215;0m"
 
-all_keywords = list({
-    "False","None","True","and","as","assert","async","await","break","class",
-    "continue","def","del","elif","else","except","finally","for","from","global",
-    "if","import","in","is","lambda","nonlocal","not","or","pass","raise","return",
-    "try","while","with","yield","match",
-    "auto","case","char","const","default","do","double","enum","extern","float",
-    "goto","inline","int","long","register","restrict","short","signed","sizeof",
-    "static","struct","switch","typedef","union","unsigned","void","volatile",
-    "_Alignas","_Alignof","_Atomic","_Bool","_Complex","_Generic","_Imaginary",
-    "_Noreturn","_Static_assert","_Thread_local",
-    "crate","false","fn","impl","let","loop","mod","move","mut","pub","ref",
-    "self","Self","super","trait","type","unsafe","use","where","dyn","abstract",
-    "become","box","final","macro","override","priv","try","typeof","unsized",
-    "virtual","yield"
-})
-
 def generate_vivid_colors(n):
     base_colors = [
         (255, 255, 0), (255, 165, 0), (0, 255, 255), (255, 215, 0),
@@ -41,14 +27,11 @@ def generate_vivid_colors(n):
         colors.append(f"\033[1;38;2;{r};{g};{b}m")
     return colors
 
-keyword_colors = {kw: col for kw, col in zip(all_keywords, generate_vivid_colors(len(all_keywords)))}
-pattern = re.compile(r'(?<!\w)(' + '|'.join(re.escape(kw) for kw in all_keywords) + r')(?!\w)')
-
-preprocessor_patterns = [
-    r'#include\s*<[^>]+>',
-    r'#define\b.*'
-]
-preprocessor_regex = re.compile('|'.join(preprocessor_patterns))
+colors = {
+    "var": variable_color,
+    "str": string_color,
+    "pre": preprocessor_color,
+}
 
 def wrap_ansi(text, width):
     words = re.findall(r'\S+|\n', text)
@@ -72,13 +55,6 @@ def wrap_ansi(text, width):
         lines.append(current_line)
     return lines
 
-def highlight_code(text):
-    text = re.sub(r'(\".*?\"|\'.*?\')', lambda m: f"{string_color}{m.group(0)}{RESET}", text)
-    text = pattern.sub(lambda m: f"{keyword_colors[m.group(0)]}{m.group(0)}{RESET}", text)
-    text = re.sub(r'(\b\w+\b)(?=\s*=)', lambda m: f"{variable_color}{m.group(1)}{RESET}", text)
-    text = preprocessor_regex.sub(lambda m: f"{preprocessor_color}{m.group(0)}{RESET}", text)
-    return text
-
 filename = input("Enter filename: ").strip()
 
 try:
@@ -88,8 +64,14 @@ except FileNotFoundError:
     print(f"File '{filename}' not found.")
     exit(1)
 
+language = syntax_tokens.for_filename(filename)
+keywords = sorted(language["keywords"])
+keyword_colors = dict(zip(keywords, generate_vivid_colors(len(keywords))))
+
 wrapped_lines = wrap_ansi(content, terminal_width)
-highlighted_lines = [highlight_code(line) for line in wrapped_lines]
+highlighted_lines = term_highlight.ansi_lines(
+    wrapped_lines, language, colors, keyword_colors
+)
 
 for line in highlighted_lines:
     for char in line:
@@ -0,0 +1,337 @@
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import syntax_tokens
+
+
+# Headless timings for the editors' syntax highlighting. The Tk cases run
+# the same tk_highlight / tk_pygments calls as system_0's highlight_code,
+# system_1's highlight_code_dark, system_25's apply_syntax_single and
+# ide_3's highlight_code on generated Python and C files, typing one
+# character at a time; a keystroke is timed until Tk is idle again.
+#
+#   python highlight_bench.py             tokenizer and Tk, 10^3 .. 10^5 lines
+#   python highlight_bench.py tokens      tokenizer only, no Tk needed
+#   python highlight_bench.py tk 4        Tk only, 10^3 .. 10^4 lines
+#
+# Without $DISPLAY the Tk cases start Xvfb and run on that.
+
+keystrokes = 200
+
+# what gets typed, quotes and "#" included so states do change
+typed = 'abcxyz_ 1=(#"'
+
+xvfb_display = ":99"
+
+dark_colors = {
+    "kw": "#1fc7f5",
+    "var": "#ecb696",
+    "eq": "white",
+    "num": "#15d2bb",
+    "str": "#9ddba0",
+    "call": "gold",
+}
+
+ide_3_colors = {
+    "kw": "yellow",
+    "var": "cyan",
+    "eq": "gold",
+    "num": "light grey",
+    "str": "orange",
+    "call": "magenta",
+}
+
+python_block = '''\
+def {name}(a, b=1):
+    """Adds up the {name} things."""
+    total = a + b * {i}
+    for k in range(10):
+        if k % 3 == 0:
+            total += k  # every third one
+    return str(total) + "{name}"
+
+'''
+
+c_block = """\
+/* {name}: adds up
+   every third value */
+static int {name}(int a, int b)
+{{
+    int total = a + b * {i};
+    for (int k = 0; k < 10; k++)
+        if (k % 3 == 0) total += k; // every third one
+    printf("%d {name}\\n", total);
+    return total;
+}}
+
+"""
+
+
+def generate(block, header, lines):
+    parts = [header]
+    count = header.count("\n")
+    i = 0
+
+    while count < lines:
+        parts.append(block.format(name=f"f{i}", i=i))
+        count += block.count("\n")
+        i += 1
+
+    return "\n".join("".join(parts).split("\n")[:lines])
+
+
+def python_source(lines):
+    return generate(python_block, "import os\nimport sys\n\n", lines)
+
+
+def c_source(lines):
+    return generate(c_block, "#include <stdio.h>\n#define LIMIT 10\n\n", lines)
+
+
+sources = [("py", python_source), ("c", c_source)]
+
+
+# nearest-rank percentile of times in seconds, as milliseconds
+def percentile(times, p):
+    if not times:
+        return None
+    ordered = sorted(times)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] * 1000
+
+
+def report(name, lines, full, times):
+    cells = [f"{name:<38}", f"{lines:>8}", f"{full:>9.4f}"]
+
+    for p in (50, 95, 99):
+        value = percentile(times, p)
+        cells.append(f"{'-':>8}" if value is None else f"{value:>8.2f}")
+
+    print(" ".join(cells))
+
+
+def header():
+    print(
+        f"{'Case':<38} {'Lines':>8} {'Full s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    print("-" * 84)
+
+
+# Tokenizer alone: one pass over the file, then keystrokes that re-tokenize
+# the edited line and what follows it until the state is the old one
+# again, which is the work tk_highlight.watch does per pass.
+def token_keystrokes(lines, pack):
+    states = []
+    state = None
+    for line in lines:
+        _, state = syntax_tokens.tokenize_line(line, state, pack)
+        states.append(state)
+
+    times = []
+    for _ in range(keystrokes):
+        i = random.randrange(len(lines))
+        col = random.randint(0, len(lines[i]))
+
+        start = time.perf_counter()
+        lines[i] = lines[i][:col] + random.choice(typed) + lines[i][col:]
+        state = states[i - 1] if i else None
+
+        while i < len(lines):
+            _, state = syntax_tokens.tokenize_line(lines[i], state, pack)
+            if state == states[i]:
+                break
+            states[i] = state
+            i += 1
+
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def token_cases(sizes):
+    header()
+
+    for ext, make in sources:
+        pack = syntax_tokens.for_filename("x." + ext)
+
+        for n in sizes:
+            text = make(n)
+
+            syntax_tokens.cache_clear()
+            start = time.perf_counter()
+            for _ in syntax_tokens.tokenize(text, pack):
+                pass
+            full = time.perf_counter() - start
+
+            times = token_keystrokes(text.split("\n"), pack)
+            report(f"tokenize ({ext})", n, full, times)
+
+    stats = syntax_tokens.cache_stats()
+    print(
+        f"\ntoken cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['hit_rate']:.0%} hit rate, {stats['lines']} lines"
+    )
+
+
+# Starts Xvfb when there is no display; returns its process, None if a
+# display was there already, or False when there is none to be had.
+def start_display():
+    if os.environ.get("DISPLAY"):
+        return None
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return False
+
+    proc = subprocess.Popen(
+        [xvfb, xvfb_display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.environ["DISPLAY"] = xvfb_display
+    time.sleep(1)
+
+    if proc.poll() is not None:
+        return False
+
+    return proc
+
+
+def idle(root):
+    root.update()
+    root.update()
+
+
+def until_done(root, widget, running):
+    while str(widget) in running:
+        root.update()
+        time.sleep(0.001)
+
+
+# Each Tk case: (name, language pack, pygments only, full document pass,
+# keystroke handler or None). The full pass gets (root, widget, pack),
+# the handler is called after each typed character.
+def tk_case_list():
+    import tk_highlight
+    import tk_pygments
+
+    # watch sees the edit through the widget command by itself
+    def typing(root, widget, pack):
+        pass
+
+    def watched(root, widget, pack):
+        tk_highlight.watch(root, widget, pack, trailing="trail_ws")
+        idle(root)
+
+    def visible(root, widget, pack):
+        tk_highlight.highlight_visible(widget, pack, dark_colors)
+
+    def whole(root, widget, pack):
+        tk_highlight.highlight_lines(widget, 1, None, pack, dark_colors)
+
+    def pygments_all(root, widget, pack):
+        tk_pygments.highlight_all(widget, "one-dark")
+
+    def pygments_changes(root, widget, pack):
+        tk_pygments.highlight_changes(widget, "one-dark")
+
+    def background(root, widget, pack):
+        tk_highlight.highlight_async(root, widget, pack, ide_3_colors)
+        until_done(root, widget, tk_highlight._running)
+
+    python_cpp = syntax_tokens.combine("python", "cpp")
+    python_c = syntax_tokens.combine("python", "c")
+    python = syntax_tokens.languages["python"]
+
+    return [
+        ("highlight_code (system_0)", python_cpp, False, watched, typing),
+        ("highlight_code_dark (system_1)", python_c, False, visible, visible),
+        ("highlight_code (system_12)", python_c, False, whole, None),
+        ("apply_syntax_single (system_25)", None, True, pygments_all, pygments_changes),
+        ("highlight_code (ide_3)", python, False, background, None),
+    ]
+
+
+def tk_cases(sizes):
+    import tkinter as tk
+
+    import tk_highlight
+
+    # time the pass itself, not the typing pause it waits for
+    tk_highlight.debounce_ms = 0
+
+    header()
+
+    root = tk.Tk()
+    root.geometry("900x700")
+
+    for name, pack, python_only, full_pass, keystroke in tk_case_list():
+        for ext, make in sources:
+            if python_only and ext != "py":
+                continue
+
+            for n in sizes:
+                widget = tk.Text(root, height=40, width=100, undo=True)
+                widget.pack(fill="both", expand=True)
+                widget.insert("1.0", make(n))
+                idle(root)
+
+                start = time.perf_counter()
+                full_pass(root, widget, pack)
+                idle(root)
+                full = time.perf_counter() - start
+
+                times = []
+                for _ in range(keystrokes if keystroke else 0):
+                    top = int(widget.index("@0,0").split(".")[0])
+                    line = min(random.randrange(top, top + 40), n)
+                    col = random.randint(0, len(widget.get(f"{line}.0", f"{line}.end")))
+
+                    start = time.perf_counter()
+                    widget.insert(f"{line}.{col}", random.choice(typed))
+                    keystroke(root, widget, pack)
+                    idle(root)
+                    times.append(time.perf_counter() - start)
+
+                    widget.yview_scroll(random.randrange(-20, 21), "units")
+                    idle(root)
+
+                report(f"{name} ({ext})", n, full, times)
+                widget.destroy()
+
+    root.destroy()
+
+
+def main():
+    modes = ("tokens", "tk")
+    args = sys.argv[1:]
+    mode = args.pop(0) if args and args[0] in modes else None
+    top = int(args[0]) if args else 5
+    sizes = [10**e for e in range(3, top + 1)]
+
+    random.seed(0)
+
+    if mode in (None, "tokens"):
+        token_cases(sizes)
+        print()
+
+    if mode in (None, "tk"):
+        display = start_display()
+        if display is False:
+            print("no $DISPLAY and no Xvfb, skipping the Tk cases")
+            return
+
+        try:
+            tk_cases(sizes)
+        finally:
+            if display is not None:
+                display.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,7 @@ from tkinter import (
 )
 
 import math
-import re
-import os
-import io
-import subprocess
-import sys
-import keyword
 import threading
-import tempfile
 
 from pypinyin import pinyin, Style
 from deep_translator import GoogleTranslator
@@ -20,6 +13,13 @@ from deep_translator import GoogleTranslator
 
 from transliterate import translit
 
+import build_cache
+import output_sink
+import python_worker
+import syntax_tokens
+import tk_highlight
+import ui_queue
+
 
 def capitalize_left():
     cursor = editor.index("insert")
@@ -81,44 +81,25 @@ def expand_window():
 
 
 def compile_exe_c():
-    def task():
-        try:
-            code = editor.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=".c",
-                mode="w",
-                encoding="utf-8"
-            )
-
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
+    code = editor.get("1.0", "end-1c")
 
-            try:
-                c = subprocess.run(["gcc", f.name, "-o", exe], capture_output=True, text=True)
+    def run(exe):
+        output_sink.stream(root, show_output(""), [exe])
 
-                if c.returncode != 0:
-                    show_output(c.stderr)
-                    return
-
-                r = subprocess.run([exe], capture_output=True, text=True)
-
-                show_output(r.stdout + r.stderr)
-
-            finally:
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
-
-                if os.path.exists(exe):
-                    os.unlink(exe)
+    def task():
+        try:
+            exe, errors = build_cache.build(code, "c")
 
         except Exception as e:
-            show_output(str(e))
+            ui_queue.post(show_output, str(e))
+            return
 
-    threading.Thread(target=task, daemon=True).start()    
+        if exe is None:
+            ui_queue.post(show_output, errors)
+        else:
+            ui_queue.post(run, exe)
+
+    threading.Thread(target=task, daemon=True).start()
 
 
 
@@ -126,19 +107,8 @@ def run_python():
     current_widget = root.focus_get()
     code = current_widget.get("1.0", tk.END)
 
-    output = io.StringIO()
-    sys.stdout = output
-
-    try:
-        exec(code)
-
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
-
-    finally:
-        sys.stdout = sys.__stdout__
-
-        show_output(output.getvalue())
+    # output streams into the window while the code runs
+    python_worker.run(root, show_output(""), code)
         
 
 
@@ -213,57 +183,24 @@ def show_output(result):
         
     exit_button.pack(side="left")
 
+    return result_text
+
 
 def highlight_code(event=None):
-    editor.tag_remove("kw", "1.0", "end")
-    editor.tag_remove("var", "1.0", "end")
-    editor.tag_remove("eq", "1.0", "end")
-    editor.tag_remove("num", "1.0", "end")
-    editor.tag_remove("str", "1.0", "end")
-    editor.tag_remove("call", "1.0", "end")
-
-    text = editor.get("1.0", "end-1c")
-
-    for k in keyword.kwlist:
-        start = "1.0"
-        while True:
-            pos = editor.search(rf"\y{k}\y", start, stopindex="end", regexp=True)
-            if not pos:
-                break
-            end = f"{pos}+{len(k)}c"
-            editor.tag_add("kw", pos, end)
-            start = end
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        editor.tag_add("var", start, end)
-
-    for m in re.finditer(r"=", text):
-        p = f"1.0+{m.start()}c"
-        editor.tag_add("eq", p, f"{p}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        editor.tag_add("num", start, end)
-
-    for m in re.finditer(r'".*?"|\'.*?\'', text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        editor.tag_add("str", start, end)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        editor.tag_add("call", start, end)
-
-    editor.tag_config("kw", foreground="red")
-    editor.tag_config("var", foreground="#8B5A2B")
-    editor.tag_config("eq", foreground="#333333")
-    editor.tag_config("num", foreground="blue")
-    editor.tag_config("str", foreground="#E67300")
-    editor.tag_config("call", foreground="green")
+    tk_highlight.highlight_lines(
+        editor,
+        1,
+        None,
+        syntax_tokens.languages["python"],
+        {
+            "kw": "red",
+            "var": "#8B5A2B",
+            "eq": "#333333",
+            "num": "blue",
+            "str": "#E67300",
+            "call": "green",
+        },
+    )
 
 root = tk.Tk()
 root.geometry("460x800")
@@ -474,4 +411,8 @@ editor.focus_set()
 
 
 
+python_worker.start()
+
+ui_queue.start(root)
+
 root.mainloop()
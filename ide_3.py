@@ -1,18 +1,15 @@
 # Awesome Tkinter GUI app 
 
 
-import io
 from io import BytesIO
 
 import os
 import random
 import re
 import subprocess
-import sys
 import tempfile
 import threading
 import traceback
-import keyword
 import urllib.parse
 
 import webbrowser
@@ -50,103 +47,15 @@ import black
 # this comes with Python3 but is technically 3rd party
 from jnius import autoclass
 
-cpp_keywords = [
-    "alignas",
-    "alignof",
-    "and",
-    "and_eq",
-    "asm",
-    "auto",
-    "bitand",
-    "bitor",
-    "bool",
-    "break",
-    "case",
-    "catch",
-    "char",
-    "char8_t",
-    "char16_t",
-    "char32_t",
-    "class",
-    "compl",
-    "const",
-    "consteval",
-    "constexpr",
-    "const_cast",
-    "continue",
-    "decltype",
-    "default",
-    "delete",
-    "do",
-    "double",
-    "dynamic_cast",
-    "else",
-    "enum",
-    "explicit",
-    "export",
-    "extern",
-    "false",
-    "float",
-    "for",
-    "friend",
-    "goto",
-    "if",
-    "inline",
-    "int",
-    "long",
-    "mutable",
-    "namespace",
-    "new",
-    "noexcept",
-    "not",
-    "not_eq",
-    "nullptr",
-    "operator",
-    "or",
-    "or_eq",
-    "private",
-    "protected",
-    "public",
-    "register",
-    "reinterpret_cast",
-    "return",
-    "short",
-    "signed",
-    "sizeof",
-    "static",
-    "static_assert",
-    "static_cast",
-    "struct",
-    "switch",
-    "template",
-    "this",
-    "thread_local",
-    "throw",
-    "true",
-    "try",
-    "typedef",
-    "typeid",
-    "typename",
-    "union",
-    "unsigned",
-    "using",
-    "virtual",
-    "void",
-    "volatile",
-    "wchar_t",
-    "while",
-    "xor",
-    "xor_eq",
-    #python
-    "print",
-    "(",
-    ")"
-    "+",
-    "-",
-    "/",
-    "*"
-    
-]
+import build_cache
+import lint_service
+import output_sink
+import python_worker
+import syntax_tokens
+import tk_highlight
+import ui_queue
+
+highlight_language = syntax_tokens.languages["python"]
 
 
 
@@ -637,31 +546,25 @@ def get_current_widget():
 
 
 def run_flake8():
-    def task():
-        try:
-            code = top_window.get("1.0", "end-1c")
+    code = top_window.get("1.0", "end-1c")
 
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".py", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            result = subprocess.run(["flake8", f.name], capture_output=True, text=True)
+    def show(diagnostics):
+        global last_flake8
 
-            bottom_window.delete("1.0", "end")
-
-            if result.stdout.strip():
-                bottom_window.insert("end", result.stdout)
-            elif result.stderr.strip():
-                bottom_window.insert("end", result.stderr)
-            else:
-                bottom_window.insert("end", "No issues found")
-
-            os.unlink(f.name)
+        text = lint_service.flake8_lines(diagnostics)
+        last_flake8 = (text, diagnostics)
+        write_output(text)
 
+    def task():
+        try:
+            diagnostics = lint_service.check(code)
         except:
-            pass
+            return
+
+        if diagnostics:
+            ui_queue.post(show, diagnostics)
+        else:
+            ui_queue.post(write_output, "No issues found")
 
     threading.Thread(target=task, daemon=True).start()
 
@@ -669,91 +572,45 @@ def run_flake8():
 def run_python():
     current_widget = root.focus_get()
     code = current_widget.get(1.0, tk.END)
-    output = io.StringIO()
-    sys.stdout = output
-    try:
-        exec(code)
+    bottom_window.delete(1.0, tk.END)
+    python_worker.run(root, bottom_window, code)
 
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
 
-    finally:
-        sys.stdout = sys.__stdout__
-        result = output.getvalue()
-        bottom_window.delete(1.0, tk.END)
-        bottom_window.insert(1.0, result)
+def stream_output(exe):
+    clear_output()
+    output_sink.stream(root, bottom_window, [exe])
 
 
 def compile_run_c():
+    code = top_window.get("1.0", "end-1c")
+
     def task():
         try:
-            code = top_window.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".c", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
-
-            try:
-                c = subprocess.run(
-                    ["gcc", f.name, "-o", exe], capture_output=True, text=True
-                )
-
-                if c.returncode != 0:
-                    write_output(c.stderr)
-                    return
-
-                r = subprocess.run([exe], capture_output=True, text=True)
-                write_output(r.stdout + r.stderr)
-
-            finally:
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
-                if os.path.exists(exe):
-                    os.unlink(exe)
-
+            exe, errors = build_cache.build(code, "c")
         except:
-            pass
+            return
+
+        if exe is None:
+            ui_queue.post(write_output, errors)
+        else:
+            ui_queue.post(stream_output, exe)
 
     threading.Thread(target=task, daemon=True).start()
 
 
 def compile_run_cpp():
+    code = top_window.get("1.0", "end-1c")
+
     def task():
         try:
-            code = top_window.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".cpp", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
-
-            try:
-                c = subprocess.run(
-                    ["g++", f.name, "-o", exe], capture_output=True, text=True
-                )
-
-                if c.returncode != 0:
-                    write_output(c.stderr)
-                    return
-
-                r = subprocess.run([exe], capture_output=True, text=True)
-                write_output(r.stdout + r.stderr)
-
-            finally:
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
-                if os.path.exists(exe):
-                    os.unlink(exe)
-
+            exe, errors = build_cache.build(code, "c++")
         except:
-            pass
+            return
+
+        if exe is None:
+            ui_queue.post(write_output, errors)
+        else:
+            ui_queue.post(stream_output, exe)
 
     threading.Thread(target=task, daemon=True).start()
 
@@ -815,8 +672,8 @@ def run_command():
     cmd = current_window.get("insert linestart", "insert lineend").strip()
     if not cmd:
         return
-    r = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    write_output(r.stdout + r.stderr)
+    clear_output()
+    output_sink.stream(root, bottom_window, cmd, shell=True)
 
 
 """
@@ -826,63 +683,38 @@ cpp_exe_path = None
 
 
 def compile_cpp():
+    code = top_window.get("1.0", "end-1c")
+
     def task():
         global cpp_exe_path
         try:
-            code = top_window.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".cpp", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
-
-            c = subprocess.run(
-                ["g++", f.name, "-o", exe], capture_output=True, text=True
-            )
-
-            if c.returncode != 0:
-                write_output(c.stderr)
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
-                return
+            exe, errors = build_cache.build(code, "c++")
+        except:
+            return
 
-            cpp_exe_path = exe
-            write_output("Compilation successful")
+        if exe is None:
+            ui_queue.post(write_output, errors)
+            return
 
-            if os.path.exists(f.name):
-                os.unlink(f.name)
-
-        except:
-            pass
+        cpp_exe_path = exe
+        ui_queue.post(write_output, "Compilation successful")
 
     threading.Thread(target=task, daemon=True).start()
 
 
 def exe_cpp():
-    def task():
-        global cpp_exe_path
-        try:
-            if not cpp_exe_path or not os.path.exists(cpp_exe_path):
-                write_output("No compiled executable found")
-                return
-
-            r = subprocess.run([cpp_exe_path], capture_output=True, text=True)
-            write_output(r.stdout + r.stderr)
-
-        except:
-            pass
+    if not cpp_exe_path or not os.path.exists(cpp_exe_path):
+        write_output("No compiled executable found")
+        return
 
-    threading.Thread(target=task, daemon=True).start()
+    stream_output(cpp_exe_path)
 
 
 def run_cpplint():
+    code = top_window.get("1.0", "end-1c")
+
     def task():
         try:
-            code = top_window.get("1.0", "end-1c")
-
             f = tempfile.NamedTemporaryFile(
                 delete=False, suffix=".cpp", mode="w", encoding="utf-8"
             )
@@ -891,20 +723,15 @@ def run_cpplint():
 
             result = subprocess.run(["cpplint", f.name], capture_output=True, text=True)
 
-            bottom_window.delete("1.0", "end")
-
-            output = result.stdout.strip() + "\n" + result.stderr.strip()
-            output = output.strip()
-
-            if output:
-                bottom_window.insert("end", output)
-            else:
-                bottom_window.insert("end", "No issues found")
-
             os.unlink(f.name)
 
         except:
-            pass
+            return
+
+        output = result.stdout.strip() + "\n" + result.stderr.strip()
+        output = output.strip()
+
+        ui_queue.post(write_output, output or "No issues found")
 
     threading.Thread(target=task, daemon=True).start()
 
@@ -1077,25 +904,31 @@ def remove_highlights():
 
 
 
-def format_flake8():
+# the text and diagnostics of the last run_flake8, so formatting its
+# output uses them as they are; anything else in the window is flake8
+# output pasted in and parsed back
+last_flake8 = None
+
+
+def format_flake8(current_window=None, diagnostics=None):
     try:
-        current_window = root.focus_get()
+        if current_window is None:
+            current_window = root.focus_get()
 
-        text = current_window.get("1.0", "end")
+        text = current_window.get("1.0", "end-1c")
 
-        lines = text.splitlines()
+        if diagnostics is None and last_flake8 and last_flake8[0] == text:
+            diagnostics = last_flake8[1]
+        elif diagnostics is None:
+            diagnostics = lint_service.parse_flake8(text)
 
         grouped = {}
+        filename = "stdin"
 
-        for line in lines:
-            m = re.search(r"(.+?):(\d+):(\d+):\s+([A-Z]\d+)\s+(.*)", line)
-
-            if not m:
-                continue
-
-            filename = m.group(1)
-            line_number = int(m.group(2))
-            message = f"{m.group(4)} {m.group(5)}"
+        for d in diagnostics:
+            filename = d.get("file", filename)
+            line_number = d["line"]
+            message = f"{d['code']} {d['message']}"
 
             grouped.setdefault(line_number, []).append(message)
 
@@ -1320,16 +1153,25 @@ def remove_empty_lines():
 
 def format_python_code():
     current_widget = root.focus_get()
+    input_code = current_widget.get("1.0", "end-1c")
 
-    try:
-        input_code = current_widget.get("1.0", "end-1c")
-        reformatted_code = black.format_str(input_code, mode=black.FileMode())
+    def replace(reformatted_code):
+        # typed into while black ran: keep the typing, skip the format
+        if current_widget.get("1.0", "end-1c") != input_code:
+            return
 
         current_widget.delete("1.0", "end")
         current_widget.insert("1.0", reformatted_code)
 
-    except:
-        pass
+    def background_work():
+        try:
+            reformatted_code = black.format_str(input_code, mode=black.FileMode())
+        except:
+            return
+
+        ui_queue.post(replace, reformatted_code)
+
+    threading.Thread(target=background_work, daemon=True).start()
 
 
 def indent_all():
@@ -1549,55 +1391,19 @@ def alphabetize():
 
 
 def highlight_code(event=None):
-    top_window.tag_remove("kw", "1.0", "end")
-    top_window.tag_remove("var", "1.0", "end")
-    top_window.tag_remove("eq", "1.0", "end")
-    top_window.tag_remove("num", "1.0", "end")
-    top_window.tag_remove("str", "1.0", "end")
-    top_window.tag_remove("call", "1.0", "end")
-
-    text = top_window.get("1.0", "end-1c")
-
-    for k in keyword.kwlist:
-        start = "1.0"
-        while True:
-            pos = top_window.search(rf"\y{k}\y", start, stopindex="end", regexp=True)
-            if not pos:
-                break
-            end = f"{pos}+{len(k)}c"
-            top_window.tag_add("kw", pos, end)
-            start = end
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        top_window.tag_add("var", start, end)
-
-    for m in re.finditer(r"=", text):
-        p = f"1.0+{m.start()}c"
-        top_window.tag_add("eq", p, f"{p}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        top_window.tag_add("num", start, end)
-
-    for m in re.finditer(r'".*?"|\'.*?\'', text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        top_window.tag_add("str", start, end)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        top_window.tag_add("call", start, end)
-
-    top_window.tag_config("kw", foreground="yellow")
-    top_window.tag_config("var", foreground="cyan")
-    top_window.tag_config("eq", foreground="gold")
-    top_window.tag_config("num", foreground="light grey")
-    top_window.tag_config("str", foreground="orange")
-    top_window.tag_config("call", foreground="magenta")
+    tk_highlight.highlight_async(
+        root,
+        top_window,
+        highlight_language,
+        {
+            "kw": "yellow",
+            "var": "cyan",
+            "eq": "gold",
+            "num": "light grey",
+            "str": "orange",
+            "call": "magenta",
+        },
+    )
     
 
 
@@ -1787,6 +1593,8 @@ dev_menu.add_command(label="Unix Command", command=run_command)
 
 dev_menu.add_command(label="Run Python", command=run_python)
 
+dev_menu.add_command(label="Stop Python", command=python_worker.cancel)
+
 dev_menu.add_command(label="Compile & Run C", command=compile_run_c)
 dev_menu.add_command(label="Compile & Run C++", command=compile_run_cpp)
 
@@ -1832,6 +1640,9 @@ top_window.bind("<Return>", auto_indent)
 
 bottom_window.bind("<Button-1>", goto_line_selected)
 
+python_worker.start()
+
+ui_queue.start(root)
 
 root.mainloop()
 
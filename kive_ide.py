@@ -1,6 +1,4 @@
-import os
 import io
-import tempfile
 import threading
 import traceback
 import contextlib
@@ -21,6 +19,8 @@ from kivy.clock import Clock
 
 from pygments.styles import STYLE_MAP
 
+import build_cache
+
 
 editor_top = None
 editor_bottom = None
@@ -117,36 +117,22 @@ def run_python(source):
 
 def run_compiled(source, language):
 
-    ext = "c" if language == "C" else "cpp"
-    compiler = "gcc" if language == "C" else "g++"
-
     try:
-        with tempfile.TemporaryDirectory() as folder:
-
-            source_file = os.path.join(folder, "program." + ext)
-            executable = os.path.join(folder, "program")
-
-            with open(source_file, "w", encoding="utf-8") as f:
-                f.write(source)
-
-            compile_result = subprocess.run(
-                [compiler, source_file, "-o", executable],
-                capture_output=True,
-                text=True
-            )
-
-            if compile_result.returncode != 0:
-                return compile_result.stderr
+        executable, errors = build_cache.build(
+            source,
+            "c" if language == "C" else "c++"
+        )
 
-            os.chmod(executable, 0o755)
+        if executable is None:
+            return errors
 
-            result = subprocess.run(
-                [executable],
-                capture_output=True,
-                text=True
-            )
+        result = subprocess.run(
+            [executable],
+            capture_output=True,
+            text=True
+        )
 
-            return result.stdout + result.stderr
+        return result.stdout + result.stderr
 
     except Exception:
         return traceback.format_exc()
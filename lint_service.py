@@ -0,0 +1,247 @@
+import ast
+import re
+import tokenize
+from functools import lru_cache
+
+
+# flake8's checks (pyflakes and pycodestyle with flake8's defaults) run
+# in-process on the buffer text, instead of writing a temp file and
+# starting flake8 for every run. Diagnostics come back as dicts:
+#
+#   {"line": 3, "col": 1, "code": "F401", "message": "'os' imported but unused"}
+#
+# pycodestyle runs per top-level block (a statement and the blank lines
+# and comments above it) together with the block before it, which is
+# all the context most of its checks look back at. The rest is file-wide
+# state: the indent character E101 compares against and E402's "code
+# seen yet" flag. That state is carried from block to block. Results are
+# cached on the two blocks' text and the state, so an edit only re-checks
+# the changed block and the ones below it whose result can change.
+#
+# pyflakes needs the whole module (unused imports, undefined names), so
+# its result is cached on the whole text.
+
+# blocks kept in the pycodestyle cache
+cache_size = 4096
+
+max_line_length = 79
+
+# pyflakes message class -> flake8 code
+_pyflakes_codes = {
+    "UnusedImport": "F401",
+    "ImportShadowedByLoopVar": "F402",
+    "ImportStarUsed": "F403",
+    "LateFutureImport": "F404",
+    "ImportStarUsage": "F405",
+    "ImportStarNotPermitted": "F406",
+    "FutureFeatureNotDefined": "F407",
+    "PercentFormatInvalidFormat": "F501",
+    "PercentFormatExpectedMapping": "F502",
+    "PercentFormatExpectedSequence": "F503",
+    "PercentFormatExtraNamedArguments": "F504",
+    "PercentFormatMissingArgument": "F505",
+    "PercentFormatMixedPositionalAndNamed": "F506",
+    "PercentFormatPositionalCountMismatch": "F507",
+    "PercentFormatStarRequiresSequence": "F508",
+    "PercentFormatUnsupportedFormatCharacter": "F509",
+    "StringDotFormatInvalidFormat": "F521",
+    "StringDotFormatExtraNamedArguments": "F522",
+    "StringDotFormatExtraPositionalArguments": "F523",
+    "StringDotFormatMissingArgument": "F524",
+    "StringDotFormatMixingAutomatic": "F525",
+    "FStringMissingPlaceholders": "F541",
+    "MultiValueRepeatedKeyLiteral": "F601",
+    "MultiValueRepeatedKeyVariable": "F602",
+    "TooManyExpressionsInStarredAssignment": "F621",
+    "TwoStarredExpressions": "F622",
+    "AssertTuple": "F631",
+    "IsLiteral": "F632",
+    "InvalidPrintSyntax": "F633",
+    "IfTuple": "F634",
+    "BreakOutsideLoop": "F701",
+    "ContinueOutsideLoop": "F702",
+    "YieldOutsideFunction": "F704",
+    "ReturnOutsideFunction": "F706",
+    "DefaultExceptNotLast": "F707",
+    "DoctestSyntaxError": "F721",
+    "ForwardAnnotationSyntaxError": "F722",
+    "RedefinedWhileUnused": "F811",
+    "UndefinedName": "F821",
+    "UndefinedExport": "F822",
+    "UndefinedLocal": "F823",
+    "DuplicateArgument": "F831",
+    "UnusedVariable": "F841",
+    "UnusedAnnotation": "F842",
+    "RaiseNotImplemented": "F901",
+}
+
+_flake8_line = re.compile(r"(.+?):(\d+):(\d+):\s+([A-Z]\d+)\s+(.*)")
+
+
+def check(code):
+    found = list(_flakes(code))
+    lines = code.splitlines(keepends=True)
+    starts = (_blocks(lines) if _resumable() else [0]) + [len(lines)]
+    previous = ""
+    # file-wide checker state at the end of each block; a block's check
+    # starts from the state before the block above it
+    states = [(None, ()), (None, ())]
+
+    for a, b in zip(starts, starts[1:]):
+        block = "".join(lines[a:b])
+        diagnostics, state = _style(previous, block, states[-2])
+
+        for line, col, diag_code, message in diagnostics:
+            found.append((a + line, col, diag_code, message))
+
+        previous = block
+        states.append(state)
+
+    return [
+        {"line": line, "col": col, "code": diag_code, "message": message}
+        for line, col, diag_code, message in sorted(found)
+    ]
+
+
+# Line indexes where top-level blocks start. Blocks break only between
+# complete statements, so each one tokenizes on its own; when the text
+# does not tokenize it is all one block.
+def _blocks(lines):
+    starts = [0]
+    after = 0
+    depth = 0
+
+    try:
+        for tok in tokenize.generate_tokens(iter(lines).__next__):
+            if tok.type == tokenize.INDENT:
+                depth += 1
+            elif tok.type == tokenize.DEDENT:
+                depth -= 1
+            elif tok.type == tokenize.NEWLINE:
+                after = tok.end[0]
+            elif tok.type not in (tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER):
+                if depth == 0 and tok.start[1] == 0 and after > starts[-1]:
+                    starts.append(after)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return [0]
+
+    return starts
+
+
+@lru_cache(maxsize=8)
+def _flakes(code):
+    from pyflakes import checker
+
+    try:
+        tree = ast.parse(code, "stdin")
+    except SyntaxError as e:
+        return ((e.lineno or 1, e.offset or 1, "E999", f"SyntaxError: {e.msg}"),)
+
+    found = []
+    for m in checker.Checker(tree, "stdin").messages:
+        found.append(
+            (
+                m.lineno,
+                m.col + 1,
+                # F999: a message flake8 has no code for
+                _pyflakes_codes.get(type(m).__name__, "F999"),
+                m.message % m.message_args,
+            )
+        )
+
+    return tuple(found)
+
+
+# pycodestyle diagnostics for block, with line numbers counted from the
+# block's first line, and the file-wide state after it. previous is the
+# block above it, checked along with it only for context, starting from
+# state: (indent character, plugin checker states).
+@lru_cache(maxsize=cache_size)
+def _style(previous, block, state):
+    import pycodestyle
+
+    found = []
+    skip = previous.count("\n")
+    indent_char, checker_states = state
+
+    class Report(pycodestyle.BaseReport):
+        def error(self, line_number, offset, text, check):
+            code = super().error(line_number, offset, text, check)
+            if code and line_number > skip:
+                found.append((line_number - skip, offset + 1, code, text[5:]))
+
+    class Checker(pycodestyle.Checker):
+        def readline(self):
+            # check_all() starts every run with no indent character
+            if self.line_number == 0 and self.indent_char is None:
+                self.indent_char = indent_char
+            return super().readline()
+
+    options = _style_options()
+    lines = (previous + block).splitlines(keepends=True)
+
+    checker = Checker(lines=lines, options=options, report=Report(options))
+    for name, values in checker_states:
+        checker._checker_states[name] = dict(values)
+    checker.check_all()
+
+    checker_states = tuple(
+        (name, tuple(sorted(values.items())))
+        for name, values in sorted(checker._checker_states.items())
+    )
+    return tuple(found), (checker.indent_char, checker_states)
+
+
+# Carrying state across blocks relies on pycodestyle internals
+# (Checker._checker_states, indent_char, readline). Without them the
+# text is checked as one block, which is always right, just not
+# incremental.
+@lru_cache(maxsize=None)
+def _resumable():
+    import pycodestyle
+
+    checker = pycodestyle.Checker(lines=[], options=_style_options())
+    return (
+        isinstance(getattr(checker, "_checker_states", None), dict)
+        and hasattr(checker, "indent_char")
+        and hasattr(checker, "readline")
+    )
+
+
+@lru_cache(maxsize=None)
+def _style_options():
+    import pycodestyle
+
+    style = pycodestyle.StyleGuide(quiet=True, max_line_length=max_line_length)
+    return style.options
+
+
+def cache_clear():
+    _flakes.cache_clear()
+    _style.cache_clear()
+
+
+# "stdin:3:1: F401 'os' imported but unused" lines, as flake8 prints them
+def flake8_lines(diagnostics, name="stdin"):
+    return "".join(
+        f"{name}:{d['line']}:{d['col']}: {d['code']} {d['message']}\n"
+        for d in diagnostics
+    )
+
+
+# Diagnostics back out of flake8 output pasted into a widget
+def parse_flake8(text):
+    diagnostics = []
+
+    for m in _flake8_line.finditer(text):
+        diagnostics.append(
+            {
+                "file": m.group(1),
+                "line": int(m.group(2)),
+                "col": int(m.group(3)),
+                "code": m.group(4),
+                "message": m.group(5),
+            }
+        )
+
+    return diagnostics
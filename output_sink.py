@@ -0,0 +1,128 @@
+import codecs
+import collections
+import itertools
+import os
+import subprocess
+import threading
+import tkinter as tk
+
+
+# Streams a child process's output (stderr merged into stdout) into a Tk
+# Text widget. A reader thread takes the pipe in read_size pieces as fast
+# as the child writes; the Tk main thread inserts whatever came in every
+# poll_ms with a single insert. Neither side holds more than max_chars:
+# text the widget has not caught up with is dropped from the front (and
+# a note says how much), and the streamed region of the widget is cut
+# from the top once it is longer than that.
+
+poll_ms = 50
+read_size = 65536
+max_chars = 500000
+
+_marks = itertools.count()
+
+
+def stream(root, widget, args, shell=False, on_done=None):
+    proc = subprocess.Popen(
+        args,
+        shell=shell,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+    lock = threading.Lock()
+    pending = collections.deque()
+    size = 0
+    dropped = 0
+    done = False
+
+    def read():
+        nonlocal size, dropped, done
+
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        fd = proc.stdout.fileno()
+
+        while True:
+            data = os.read(fd, read_size)
+            text = decoder.decode(data, not data)
+
+            with lock:
+                if text:
+                    pending.append(text)
+                    size += len(text)
+
+                while size > max_chars:
+                    extra = size - max_chars
+                    first = pending[0]
+
+                    if len(first) <= extra:
+                        pending.popleft()
+                        extra = len(first)
+                    else:
+                        pending[0] = first[extra:]
+
+                    size -= extra
+                    dropped += extra
+
+            if not data:
+                break
+
+        proc.stdout.close()
+        proc.wait()
+
+        with lock:
+            done = True
+
+    mark = f"sink_{next(_marks)}"
+    shown = 0
+
+    def drain():
+        nonlocal size, dropped, shown
+
+        with lock:
+            text = "".join(pending)
+            pending.clear()
+            size = 0
+            skipped, dropped = dropped, 0
+            finished = done
+
+        if skipped:
+            # room for the note (well under 50 characters) is made in the
+            # text, not by trimming the widget, which would cut the note
+            keep = max(max_chars - 50, 0)
+            cut = max(len(text) - keep, 0)
+            note = f"\n[... {skipped + cut} characters skipped ...]\n"
+            text = note + text[cut:]
+
+        try:
+            if text:
+                widget.insert("end", text)
+                shown += len(text)
+
+                if shown > max_chars:
+                    widget.delete(mark, f"{mark} + {shown - max_chars} chars")
+                    shown = max_chars
+
+                widget.see("end")
+
+            if finished:
+                widget.mark_unset(mark)
+
+        except tk.TclError:
+            # the widget is gone, so is the point of running on
+            proc.kill()
+            return
+
+        if not finished:
+            root.after(poll_ms, drain)
+        elif on_done is not None:
+            on_done(proc.returncode)
+
+    widget.mark_set(mark, "end-1c")
+    widget.mark_gravity(mark, "left")
+
+    threading.Thread(target=read, daemon=True).start()
+    root.after(poll_ms, drain)
+
+    return proc
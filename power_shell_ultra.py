@@ -25,11 +25,6 @@ from prompt_toolkit.styles import Style, merge_styles
 from prompt_toolkit.lexers import PygmentsLexer
 from pygments.lexers import (
     BashLexer,
-    CLexer,
-    RustLexer,
-    CppLexer,
-    GoLexer,
-    PythonLexer,
     HtmlLexer,
     JavascriptLexer,
     CssLexer,
@@ -39,6 +34,9 @@ from pygments.lexers import (
 from pygments.styles import get_style_by_name
 from prompt_toolkit.styles.pygments import style_from_pygments_cls
 
+import syntax_tokens
+import term_highlight
+
 # -----------------------
 # Global variables
 # -----------------------
@@ -185,16 +183,8 @@ def get_lexer():
         return None
     if current_file.endswith(".sh"):
         return PygmentsLexer(BashLexer)
-    if current_file.endswith(".c"):
-        return PygmentsLexer(CLexer)
-    if current_file.endswith(".cpp"):
-        return PygmentsLexer(CppLexer)
-    if current_file.endswith(".py"):
-        return PygmentsLexer(PythonLexer)
-    if current_file.endswith(".rs"):
-        return PygmentsLexer(RustLexer)
-    if current_file.endswith(".go"):
-        return PygmentsLexer(GoLexer)
+    if current_file.endswith((".c", ".cpp", ".py", ".rs", ".go")):
+        return term_highlight.prompt_lexer(syntax_tokens.for_filename(current_file))
     if current_file.endswith(".html"):
         return PygmentsLexer(HtmlLexer)
     if current_file.endswith(".js"):
@@ -0,0 +1,134 @@
+import math
+from functools import lru_cache
+
+
+euler_gamma = 0.5772156649015329
+
+# li(2), the offset between li(x) and Li(x)
+li_2 = 1.0451637801174928
+
+max_terms = 400
+
+
+@lru_cache(maxsize=None)
+def zeta(s):
+    # direct sum plus Euler-Maclaurin tail, good to double precision for s >= 2
+    n = 20
+    total = sum(k ** -s for k in range(1, n))
+
+    total += n ** (1 - s) / (s - 1) + n**-s / 2
+    total += s * n ** (-s - 1) / 12
+    total -= s * (s + 1) * (s + 2) * n ** (-s - 3) / 720
+    total += s * (s + 1) * (s + 2) * (s + 3) * (s + 4) * n ** (-s - 5) / 30240
+    total -= math.prod(range(s, s + 7)) * n ** (-s - 7) / 1209600
+
+    return total
+
+
+# Ramanujan's series for the logarithmic integral, x > 1
+@lru_cache(maxsize=4096)
+def li(x):
+    if x == 1:
+        return -math.inf
+
+    L = math.log(x)
+
+    if x < 1:
+        total = 0.0
+        term = 1.0
+        for n in range(1, max_terms):
+            term *= L / n
+            total += term / n
+            if abs(term) < 1e-17 * abs(total):
+                break
+        return euler_gamma + math.log(-L) + total
+
+    total = 0.0
+    inner = 0.0
+    term = -2.0
+
+    for n in range(1, max_terms):
+        term *= -L / (n * 2)
+        if n % 2:
+            inner += 1 / n
+
+        step = term * inner
+        total += step
+
+        if abs(step) < 1e-17 * abs(total):
+            break
+
+    return euler_gamma + math.log(L) + math.sqrt(x) * total
+
+
+def offset_li(x):
+    return li(x) - li_2
+
+
+# Riemann R(x) by the Gram series
+@lru_cache(maxsize=4096)
+def riemann_r(x):
+    L = math.log(x)
+
+    total = 1.0
+    term = 1.0
+
+    for k in range(1, max_terms):
+        term *= L / k
+        step = term / (k * zeta(k + 1))
+        total += step
+
+        if abs(step) < 1e-17 * abs(total):
+            break
+
+    return total
+
+
+# NumPy versions for a whole array of x > 1 at once. The series run for
+# the number of terms the largest x needs; without NumPy they fall back
+# to the memoized scalar functions.
+def li_many(xs):
+    try:
+        import numpy as np
+    except ImportError:
+        return [li(x) for x in xs]
+
+    x = np.asarray(xs, dtype=np.float64)
+    L = np.log(x)
+    terms = _terms_needed(float(L.max()))
+
+    total = np.zeros_like(L)
+    term = np.full_like(L, -2.0)
+    inner = 0.0
+
+    for n in range(1, terms):
+        term *= -L / (n * 2)
+        if n % 2:
+            inner += 1 / n
+        total += term * inner
+
+    return euler_gamma + np.log(L) + np.sqrt(x) * total
+
+
+def riemann_r_many(xs):
+    try:
+        import numpy as np
+    except ImportError:
+        return [riemann_r(x) for x in xs]
+
+    L = np.log(np.asarray(xs, dtype=np.float64))
+    terms = _terms_needed(float(L.max()))
+
+    total = np.ones_like(L)
+    term = np.ones_like(L)
+
+    for k in range(1, terms):
+        term *= L / k
+        total += term / (k * zeta(k + 1))
+
+    return total
+
+
+def _terms_needed(L):
+    # L**n / n! stops mattering well after n passes e * L
+    return min(max_terms, int(3 * L) + 40)
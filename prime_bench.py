@@ -0,0 +1,240 @@
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import arith_sieve
+import prime_analytic
+import prime_bitset
+import prime_count
+import prime_factor
+import prime_sieve
+import prime_stream
+
+
+# Headless timings for the number-theory tools behind system_1.py and
+# system_25.py. Every case runs in a forked child so the reported peak
+# memory belongs to that case alone.
+#
+#   python prime_bench.py            ranges 10^4 .. 10^8
+#   python prime_bench.py 6          ranges 10^4 .. 10^6
+
+# the old trial-division code is quadratic-ish, don't wait for it past this
+legacy_limit = 10**6
+
+
+# what system_1/system_25 used before the sieve, kept as the baseline
+def legacy_is_prime(n):
+    if n < 2:
+        return False
+    i = 2
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 1
+    return True
+
+
+def legacy_li_approx(x):
+    steps = 1000
+    total = 0.0
+    dx = max(x - 2.0, 0.0) / steps
+
+    for i in range(1, steps):
+        t = 2.0 + i * dx
+        if t > 1:
+            total += dx / math.log(t)
+
+    return total
+
+
+def legacy_analyze(n):
+    return sum(1 for k in range(1, n + 1) if legacy_is_prime(k))
+
+
+def list_primes(n):
+    return sum(1 for _ in prime_stream.listing_chunks(0, n, threading.Event()))
+
+
+def check_primes(n):
+    # same per-number work check_if_prime does, over a window below n
+    window = range(max(n - 10000, 2), n + 1)
+    return sum(1 for k in window if prime_factor.is_prime(k))
+
+
+def li_values(n):
+    prime_analytic.li.cache_clear()
+    prime_analytic.riemann_r.cache_clear()
+    xs = range(2, 2002)
+    return sum(prime_analytic.li(x) + prime_analytic.riemann_r(x) for x in xs)
+
+
+def legacy_li_values(n):
+    return sum(legacy_li_approx(x) for x in range(2, 2002))
+
+
+def gap_stats(n):
+    return prime_sieve.prime_stats(n, gaps=True)
+
+
+def theta_stats(n):
+    return prime_sieve.parallel_stats(1, n)
+
+
+def bitset_cold(n):
+    prime_bitset._close()
+    if os.path.exists(prime_bitset.bits_path):
+        os.remove(prime_bitset.bits_path)
+    build_bits(n)
+    return prime_bitset.count_between(1, n)
+
+
+def build_bits(n):
+    # the editors let the build run in the background, here we time it
+    prime_bitset.ensure(n, wait=True)
+
+
+def bitset_warm(n):
+    return prime_bitset.count_between(1, n)
+
+
+# (name, timed function, largest n or None, untimed setup or None)
+cases = [
+    ("legacy is_prime scan", legacy_analyze, legacy_limit, None),
+    ("legacy li_approx x2000", legacy_li_values, 10**4, None),
+    ("prime_stats (analyze)", prime_sieve.prime_stats, None, None),
+    ("prime_stats gaps=True", gap_stats, None, None),
+    ("parallel_stats (θ)", theta_stats, None, None),
+    ("bitset build", bitset_cold, None, None),
+    ("bitset count (warm)", bitset_warm, None, build_bits),
+    ("list_primes chunks", list_primes, None, build_bits),
+    ("is_prime x10000 (MR)", check_primes, None, None),
+    ("prime_pi (Lucy)", prime_count.prime_pi, None, None),
+    ("li + R x2000", li_values, 10**4, None),
+    ("mertens", arith_sieve.mertens, None, None),
+]
+
+
+# Times func(n) in a forked child so every case starts from the same
+# memory, and returns (seconds, peak MB of that child, setup included).
+# A case that raises only fails itself: the child always leaves through
+# os._exit, never back into main(), and sends the error back.
+def run_case(func, n, setup=None):
+    read, write = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        status = 1
+
+        try:
+            os.close(read)
+            if setup is not None:
+                setup(n)
+
+            start = time.perf_counter()
+            func(n)
+            elapsed = time.perf_counter() - start
+
+            os.write(write, f"ok {elapsed}".encode())
+            status = 0
+
+        except BaseException as e:
+            os.write(write, f"error {type(e).__name__}: {e}".encode())
+
+        finally:
+            os._exit(status)
+
+    os.close(write)
+    parts = []
+    while True:
+        data = os.read(read, 4096)
+        if not data:
+            break
+        parts.append(data)
+    os.close(read)
+
+    # the rusage of this one child: its own peak RSS (KiB on Linux), not
+    # a difference against the maxrss it inherited from us
+    _, _, usage = os.wait4(pid, 0)
+
+    data = b"".join(parts).decode()
+    if not data.startswith("ok "):
+        raise RuntimeError(data[len("error ") :] or "no result")
+
+    _, elapsed = data.split()
+    return float(elapsed), usage.ru_maxrss / 1024
+
+
+def rust_cases():
+    rustc = shutil.which("rustc")
+    if rustc is None:
+        print("rustc not found, skipping Rust programs")
+        return
+
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # both programs have their range hard-coded in main(), so n is
+        # the same on every run and can't be compared with the rows above
+        for name, n in (("primes_data.rs", 10000), ("primes_amount.rs", 100)):
+            exe = os.path.join(tmp, name[:-3])
+            build = subprocess.run(
+                [rustc, "-O", os.path.join(here, name), "-o", exe],
+                capture_output=True,
+                text=True,
+            )
+
+            if build.returncode != 0:
+                print(f"{name:<28} build failed")
+                continue
+
+            start = time.perf_counter()
+            subprocess.run([exe], capture_output=True)
+            elapsed = time.perf_counter() - start
+
+            label = f"{name} (fixed n)"
+            print(f"{label:<28} {n:>12} {elapsed:>10.4f} {n / elapsed:>14.0f}")
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    # keep the real ~/.prime_bits out of this
+    bench_dir = tempfile.mkdtemp()
+    prime_bitset.bits_path = os.path.join(bench_dir, "prime_bits")
+    prime_bitset.min_limit = 1
+
+    print(f"{'Routine':<28} {'n':>12} {'Seconds':>10} {'n/s':>14} {'Peak MB':>9}")
+    print("-" * 77)
+
+    try:
+        for name, func, limit, setup in cases:
+            for e in range(4, top + 1):
+                n = 10**e
+                if limit and n > limit:
+                    break
+
+                try:
+                    elapsed, peak = run_case(func, n, setup)
+                except RuntimeError as e:
+                    print(f"{name:<28} {n:>12} {'failed':>10}  {e}")
+                    continue
+
+                rate = n / elapsed if elapsed else float("inf")
+                print(f"{name:<28} {n:>12} {elapsed:>10.4f} {rate:>14.0f} {peak:>9.1f}")
+
+        print()
+        print(f"{'Rust (rustc -O)':<28} {'n':>12} {'Seconds':>10} {'n/s':>14}")
+        print("-" * 67)
+        rust_cases()
+
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
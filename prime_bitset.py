@@ -0,0 +1,273 @@
+import mmap
+import os
+import shutil
+import threading
+
+import prime_sieve
+
+
+# Odd-only prime bitset kept on disk: bit i is set when 2*i + 1 is prime.
+# The first 8 bytes hold the largest number the bits cover.
+bits_path = os.path.expanduser("~/.prime_bits")
+
+header_size = 8
+
+# don't grow the file past 2**32 (256 MiB), callers fall back to the sieve
+max_limit = 1 << 32
+
+# smallest file we ever build, 1 MiB of bits
+min_limit = 1 << 24
+
+_bits = None
+_limit = 0
+_file = None
+_stat = None
+
+# thread growing the file in the background, ensure() never sieves on
+# the caller's thread unless asked to wait
+_builder = None
+
+# held while the mapping is read or swapped, so a listing streaming from
+# a worker thread never reads a mapping ensure() has just closed
+_lock = threading.RLock()
+
+_pack = bytes.maketrans(b"\x00\x01", b"01")
+
+# _planes[k] maps a byte to its bit k as a 0/1 flag
+_planes = [bytes(b >> k & 1 for b in range(256)) for k in range(8)]
+
+
+def _close():
+    global _bits, _limit, _file, _stat
+
+    if _bits is not None:
+        try:
+            _bits.close()
+        except BufferError:
+            # a view into it is still alive, the map goes when that does
+            pass
+        _file.close()
+
+    _bits = None
+    _limit = 0
+    _file = None
+    _stat = None
+
+
+def _open():
+    global _bits, _limit, _file, _stat
+
+    try:
+        st = os.stat(bits_path)
+    except OSError:
+        _close()
+        return
+
+    stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+    if _bits is not None and stat == _stat:
+        return
+
+    _close()
+
+    try:
+        f = open(bits_path, "rb")
+    except OSError:
+        return
+
+    try:
+        bits = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        f.close()
+        return
+
+    _file = f
+    _bits = bits
+    _limit = int.from_bytes(bits[:header_size], "little")
+    _stat = stat
+
+
+# Runs without _lock and never touches the mapping: the old bits are
+# copied from the file itself, only what is missing is sieved, then the
+# new file is swapped in atomically so other editors that still have
+# the old one mapped keep working.
+def _build(path, limit):
+    try:
+        old = open(path, "rb")
+    except OSError:
+        old = None
+    else:
+        if int.from_bytes(old.read(header_size), "little") >= limit:
+            old.close()
+            return
+
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    with open(tmp, "wb") as out:
+        out.write(limit.to_bytes(header_size, "little"))
+        done = 0
+
+        if old is not None:
+            with old:
+                shutil.copyfileobj(old, out)
+            done = (out.tell() - header_size) * 8
+
+        for low, seg in prime_sieve.odd_segments(2 * done + 1, limit):
+            pad = -len(seg) % 8
+            if pad:
+                seg += bytes(pad)
+
+            bits = int(seg[::-1].translate(_pack), 2)
+            out.write(bits.to_bytes(len(seg) // 8, "little"))
+
+    os.replace(tmp, path)
+
+
+# True once the file covers limit. Otherwise a background build is
+# started and False returned, so callers fall back to prime_sieve until
+# it is done. wait=True builds on this thread instead (bench, tests).
+def ensure(limit, wait=False):
+    global _builder
+
+    with _lock:
+        if limit <= _limit:
+            return True
+
+        if limit > max_limit:
+            return False
+
+        # another editor, or the builder, may already have grown the file
+        _open()
+        if limit <= _limit:
+            return True
+
+        builder = _builder
+        path = bits_path
+        limit = min(max(limit, 2 * _limit, min_limit), max_limit)
+        limit = (limit + 16) // 16 * 16 - 1
+
+        if not wait:
+            if builder is None or not builder.is_alive():
+                _builder = threading.Thread(
+                    target=_build, args=(path, limit), daemon=True
+                )
+                _builder.start()
+            return False
+
+    if builder is not None:
+        builder.join()
+
+    _build(path, limit)
+
+    with _lock:
+        _open()
+        return limit <= _limit
+
+
+def is_prime(n):
+    if n < 3:
+        return n == 2
+    if n % 2 == 0:
+        return False
+
+    with _lock:
+        if not ensure(n):
+            return None
+
+        i = n // 2
+        return bool(_bits[header_size + (i >> 3)] >> (i & 7) & 1)
+
+
+# zero-copy bytes holding bits i..j-1, callers hold _lock and have
+# ensure()d end
+def _view(i, j):
+    return memoryview(_bits)[header_size + (i >> 3) : header_size + ((j + 7) >> 3)]
+
+
+def _flag_slice(start, end):
+    i = start // 2
+    j = end // 2
+
+    # one copy of the packed bytes (1/8 of the flags), the view is gone
+    # before we return, then bit k of every byte lands on flags[k::8]
+    with _view(i, j) as data:
+        packed = bytes(data)
+
+    flags = bytearray(8 * len(packed))
+    for k, plane in enumerate(_planes):
+        flags[k::8] = packed.translate(plane)
+
+    # trimming a bytearray in place doesn't copy it
+    del flags[: i & 7]
+    del flags[j - i :]
+    return flags
+
+
+def _bit_slice(start, end):
+    i = start // 2
+    j = end // 2
+
+    with _view(i, j) as data:
+        bits = int.from_bytes(data, "little") >> (i & 7)
+
+    return bits & ((1 << (j - i)) - 1), j - i
+
+
+# Same (low, flags) chunks as prime_sieve.odd_segments, read from the file.
+def odd_segments(start, end, size=prime_sieve.segment_size):
+    low = max(start, 1) | 1
+
+    if low > end:
+        return
+
+    if not ensure(end):
+        yield from prime_sieve.odd_segments(start, end, size)
+        return
+
+    while low <= end:
+        high = min(low + 2 * size - 2, end if end % 2 else end - 1)
+
+        # the lock is not held between segments, so the file may have
+        # been swapped for a bigger one meanwhile
+        with _lock:
+            ensure(high)
+            seg = _flag_slice(low, high + 1)
+
+        yield low, seg
+
+        low = high + 2
+
+
+def count_between(start, end):
+    if end < 2 or start > end:
+        return 0
+
+    count = 1 if start <= 2 <= end else 0
+
+    if not ensure(end):
+        for low, seg in prime_sieve.odd_segments(max(start, 3), end):
+            count += seg.count(1)
+        return count
+
+    low = max(start, 3) | 1
+
+    while low <= end:
+        high = min(low + 2 * 8 * prime_sieve.segment_size, end + 1)
+
+        with _lock:
+            ensure(end)
+            count += _bit_slice(low, high)[0].bit_count()
+
+        low = high | 1
+
+    return count
+
+
+def primes_between(start, end):
+    if start <= 2 <= end:
+        yield 2
+
+    for low, seg in odd_segments(max(start, 3), end):
+        i = seg.find(1)
+        while i >= 0:
+            yield low + 2 * i
+            i = seg.find(1, i + 1)
@@ -0,0 +1,123 @@
+import math
+
+import prime_factor
+
+
+# above this analyze() only counts, gap statistics need the sieve and
+# would keep the worker thread (and the GIL) busy for too long
+sieve_limit = 10**7
+
+
+# Lucy_Hedgehog's prime counting, O(x^(3/4)).
+# small[v] and large[i] hold the count of survivors <= v and <= x // i
+# after sieving by every prime below p.
+def _lucy(x):
+    r = math.isqrt(x)
+
+    small = [max(v - 1, 0) for v in range(r + 1)]
+    large = [0] + [x // i - 1 for i in range(1, r + 1)]
+
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue
+
+        sp = small[p - 1]
+        p2 = p * p
+        lim = min(r, x // p2)
+        inner = min(lim, r // p)
+
+        for i in range(1, inner + 1):
+            large[i] -= large[i * p] - sp
+
+        for i in range(inner + 1, lim + 1):
+            large[i] -= small[x // (i * p)] - sp
+
+        for v in range(r, p2 - 1, -1):
+            small[v] -= small[v // p] - sp
+
+    return large[1]
+
+
+# Same recurrence with every inner loop done as one NumPy slice update.
+# All right-hand sides read values from before the update, which is
+# exactly what the descending scalar loops above rely on.
+def _lucy_numpy(x, np):
+    r = math.isqrt(x)
+
+    small = np.arange(-1, r, dtype=np.int64)
+    small[0] = 0
+
+    large = np.zeros(r + 1, dtype=np.int64)
+    large[1:] = x // np.arange(1, r + 1, dtype=np.int64) - 1
+
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue
+
+        sp = small[p - 1]
+        p2 = p * p
+        lim = min(r, x // p2)
+        inner = min(lim, r // p)
+
+        update = np.empty(lim, dtype=np.int64)
+        update[:inner] = large[p : inner * p + 1 : p]
+
+        d = np.arange(inner + 1, lim + 1, dtype=np.int64) * p
+        update[inner:] = small[x // d]
+
+        large[1 : lim + 1] -= update - sp
+
+        if p2 <= r:
+            q = np.repeat(small[p : r // p + 1], p)[: r - p2 + 1]
+            small[p2:] -= q - sp
+
+    return int(large[1])
+
+
+def prime_pi(x):
+    if x < 2:
+        return 0
+
+    try:
+        import numpy
+    except ImportError:
+        return _lucy(x)
+
+    return _lucy_numpy(x, numpy)
+
+
+def last_prime(x):
+    n = x
+    while n >= 2 and not prime_factor.is_prime(n):
+        n -= 1
+    return n if n >= 2 else 0
+
+
+# prime_sieve.prime_stats-shaped result from counting alone.
+# max_gap and twin are None because they need the full enumeration.
+def count_stats(end, start=1):
+    count = prime_pi(end) - prime_pi(start - 1)
+
+    stats = {
+        "count": count,
+        "first": 0,
+        "last": 0,
+        "gap_sum": 0,
+        "gap_count": 0,
+        "max_gap": None,
+        "twin": None,
+    }
+
+    if count:
+        n = max(start, 2)
+        while not prime_factor.is_prime(n):
+            n += 1
+
+        stats["first"] = n
+        stats["last"] = last_prime(end)
+
+    if count > 1:
+        stats["gap_sum"] = stats["last"] - stats["first"]
+        stats["gap_count"] = count - 1
+
+    return stats
@@ -0,0 +1,177 @@
+import math
+import random
+
+
+small_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]
+
+# these bases make Miller-Rabin exact for every n < 3.3 * 10**24
+mr_bases = small_primes[:13]
+mr_limit = 3317044064679887385961981
+
+
+def _strong_probable_prime(n, a, d, s):
+    x = pow(a, d, n)
+
+    if x == 1 or x == n - 1:
+        return True
+
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+
+    return False
+
+
+def _jacobi(a, n):
+    a %= n
+    result = 1
+
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+
+    return result if n == 1 else 0
+
+
+# strong Lucas test with Selfridge's parameters (method A)
+def _strong_lucas(n):
+    r = math.isqrt(n)
+    if r * r == n:
+        return False
+
+    d = 5
+    while True:
+        j = _jacobi(d, n)
+        if j == -1:
+            break
+        if j == 0 and abs(d) != n:
+            return False
+        d = -d - 2 if d > 0 else -d + 2
+
+    p = 1
+    q = (1 - d) // 4
+
+    k = n + 1
+    s = (k & -k).bit_length() - 1
+    k >>= s
+
+    u, v, qk = 1, p, q % n
+    half = (n + 1) // 2
+
+    for bit in bin(k)[3:]:
+        u, v = u * v % n, (v * v - 2 * qk) % n
+        qk = qk * qk % n
+
+        if bit == "1":
+            u, v = (p * u + v) * half % n, (d * u + p * v) * half % n
+            qk = qk * q % n
+
+    if u == 0 or v == 0:
+        return True
+
+    for _ in range(s - 1):
+        v = (v * v - 2 * qk) % n
+        if v == 0:
+            return True
+        qk = qk * qk % n
+
+    return False
+
+
+def is_prime(n):
+    if n < 2:
+        return False
+
+    for p in small_primes:
+        if n % p == 0:
+            return n == p
+
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    if n < mr_limit:
+        return all(_strong_probable_prime(n, a, d, s) for a in mr_bases)
+
+    # Baillie-PSW: no known counterexample
+    return _strong_probable_prime(n, 2, d, s) and _strong_lucas(n)
+
+
+# Brent's variant of Pollard rho, returns a non-trivial factor of an
+# odd composite n
+def _brent(n):
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        m = 128
+        g = r = q = 1
+
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+
+            r *= 2
+
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+
+
+def factorize(n):
+    factors = {}
+
+    if n < 2:
+        return factors
+
+    for p in small_primes:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    stack = [n] if n > 1 else []
+
+    while stack:
+        m = stack.pop()
+
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+
+        r = math.isqrt(m)
+        if r * r == m:
+            stack += [r, r]
+            continue
+
+        f = _brent(m)
+        stack += [f, m // f]
+
+    return dict(sorted(factors.items()))
+
+
+def format_factors(factors):
+    return " × ".join(
+        str(p) if e == 1 else f"{p}^{e}" for p, e in factors.items()
+    )
@@ -0,0 +1,318 @@
+import itertools
+import math
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+
+# odd numbers per segment, 256 KiB of flags fits in L2 cache
+segment_size = 1 << 18
+
+
+def small_primes(limit):
+    if limit < 2:
+        return []
+
+    flags = bytearray([1]) * (limit + 1)
+    flags[0] = flags[1] = 0
+
+    for i in range(2, math.isqrt(limit) + 1):
+        if flags[i]:
+            flags[i * i :: i] = bytes(len(range(i * i, limit + 1, i)))
+
+    return [i for i, f in enumerate(flags) if f]
+
+
+# Yields (low, flags) where flags[i] == 1 means low + 2*i is prime.
+# low is always odd, so 2 has to be handled by the caller.
+def odd_segments(start, end, size=segment_size):
+    low = max(start, 1) | 1
+
+    if low > end:
+        return
+
+    base = small_primes(math.isqrt(end))[1:]
+
+    while low <= end:
+        high = min(low + 2 * size - 2, end | 1)
+        if high > end:
+            high -= 2
+
+        n = (high - low) // 2 + 1
+        seg = bytearray([1]) * n
+
+        for p in base:
+            pp = p * p
+            if pp > high:
+                break
+
+            m = max(pp, (low + p - 1) // p * p)
+            if m % 2 == 0:
+                m += p
+
+            i = (m - low) // 2
+            if i < n:
+                seg[i::p] = bytes(len(range(i, n, p)))
+
+        if low == 1:
+            seg[0] = 0
+
+        yield low, seg
+
+        low = high + 2
+
+
+# (name, odd-index offsets) of the constellations gap_stats counts
+constellations = [
+    ("cousin", (0, 2)),
+    ("sexy", (0, 3)),
+    ("triplet", (0, 1, 3)),
+    ("triplet", (0, 2, 3)),
+]
+
+
+def _new_gaps():
+    gaps = {"histogram": {}, "records": [], "record": 0, "tail": b""}
+    for name, _ in constellations:
+        gaps[name] = 0
+    return gaps
+
+
+# Constellations are found with shifted ANDs over the flag bytes. The
+# last 3 flags of the previous segment are prepended so patterns that
+# straddle a boundary are seen, and only matches ending in the current
+# segment are counted.
+def _segment_constellations(gaps, seg):
+    ext = gaps["tail"] + seg
+    t = len(gaps["tail"])
+    bits = int.from_bytes(ext, "little")
+
+    for name, offsets in constellations:
+        match = bits
+        for d in offsets[1:]:
+            match &= bits >> (8 * d)
+        gaps[name] += (match >> (8 * max(t - offsets[-1], 0))).bit_count()
+
+    gaps["tail"] = bytes(ext[-3:])
+
+
+def _add_gap(gaps, p, gap, count=1):
+    hist = gaps["histogram"]
+    hist[gap] = hist.get(gap, 0) + count
+
+    if p is not None and gap > gaps["record"]:
+        gaps["records"].append((p, gap))
+        gaps["record"] = gap
+
+
+def _segment_gaps(gaps, low, seg, first, last):
+    if last <= first:
+        return
+
+    try:
+        import numpy as np
+    except ImportError:
+        runs = Counter(map(len, seg[first + 1 : last].split(b"\x01")))
+        for run, count in runs.items():
+            _add_gap(gaps, None, 2 * (run + 1), count)
+    else:
+        idx = np.flatnonzero(np.frombuffer(seg, dtype=np.uint8))
+        counts = np.bincount(np.diff(idx))
+        for d in np.flatnonzero(counts):
+            _add_gap(gaps, None, 2 * int(d), int(counts[d]))
+
+    # record (maximal) gaps: jump straight to the next zero run longer
+    # than the current record with bytes.find
+    pos = first + 1
+    while True:
+        k = seg.find(bytes(gaps["record"] // 2), pos, last)
+        if k < 0:
+            break
+
+        run = seg.find(1, k) - k
+        gaps["records"].append((low + 2 * (k - 1), 2 * (run + 1)))
+        gaps["record"] = 2 * (run + 1)
+        pos = k + run + 1
+
+
+# Count, gaps and twins for [start, end] in one streaming pass.
+# Everything is done with bytes.count / find so no Python loop
+# ever runs once per prime. segments can be any odd_segments-like
+# source, e.g. prime_bitset.odd_segments. With theta=True the
+# Chebyshev sum of log(p) is added as well (None otherwise). With
+# gaps=True the same pass also fills stats["gaps"] with the full gap
+# histogram, the record gaps as (prime, gap) and constellation counts.
+def prime_stats(end, start=1, segments=odd_segments, theta=False, gaps=False):
+    stats = {
+        "count": 0,
+        "first": 0,
+        "last": 0,
+        "gap_sum": 0,
+        "gap_count": 0,
+        "max_gap": 0,
+        "twin": 0,
+        "theta": None,
+        "gaps": None,
+    }
+
+    logs = []
+    gap_data = _new_gaps() if gaps else None
+
+    if start <= 2 <= end:
+        stats["count"] = 1
+        stats["first"] = stats["last"] = 2
+        logs.append(math.log(2))
+
+    # longest run of zero flags seen between two primes
+    run = 0
+
+    for low, seg in segments(max(start, 3), end):
+        if gaps:
+            _segment_constellations(gap_data, seg)
+
+        first = seg.find(1)
+        if first < 0:
+            continue
+
+        last = seg.rfind(1)
+        p_first = low + 2 * first
+
+        if stats["last"]:
+            gap = p_first - stats["last"]
+            stats["max_gap"] = max(stats["max_gap"], gap)
+            if gap == 2:
+                stats["twin"] += 1
+            if gaps:
+                _add_gap(gap_data, stats["last"], gap)
+        else:
+            stats["first"] = p_first
+
+        if gaps:
+            _segment_gaps(gap_data, low, seg, first, last)
+
+        stats["count"] += seg.count(1)
+
+        if last > first:
+            while seg.find(bytes(run + 1), first, last + 1) >= 0:
+                run += 1
+            stats["max_gap"] = max(stats["max_gap"], 2 * (run + 1))
+
+        bits = int.from_bytes(seg, "little")
+        stats["twin"] += (bits & (bits >> 8)).bit_count()
+
+        if theta:
+            primes = itertools.compress(range(low, low + 2 * len(seg), 2), seg)
+            logs.append(math.fsum(map(math.log, primes)))
+
+        stats["last"] = low + 2 * last
+
+    if stats["count"] > 1:
+        stats["gap_sum"] = stats["last"] - stats["first"]
+        stats["gap_count"] = stats["count"] - 1
+
+    if theta:
+        stats["theta"] = math.fsum(logs)
+
+    if gaps:
+        del gap_data["record"], gap_data["tail"]
+        gap_data["histogram"] = dict(sorted(gap_data["histogram"].items()))
+        stats["gaps"] = gap_data
+
+    return stats
+
+
+# Combine prime_stats results of consecutive, non-overlapping ranges.
+def merge_stats(parts):
+    stats = {
+        "count": 0,
+        "first": 0,
+        "last": 0,
+        "gap_sum": 0,
+        "gap_count": 0,
+        "max_gap": 0,
+        "twin": 0,
+        "theta": None,
+        "gaps": None,
+    }
+
+    for part in parts:
+        if not part["count"]:
+            continue
+
+        if stats["last"]:
+            gap = part["first"] - stats["last"]
+            stats["max_gap"] = max(stats["max_gap"], gap)
+            if gap == 2:
+                stats["twin"] += 1
+        else:
+            stats["first"] = part["first"]
+
+        stats["count"] += part["count"]
+        stats["max_gap"] = max(stats["max_gap"], part["max_gap"])
+        stats["twin"] += part["twin"]
+        stats["last"] = part["last"]
+
+    if stats["count"] > 1:
+        stats["gap_sum"] = stats["last"] - stats["first"]
+        stats["gap_count"] = stats["count"] - 1
+
+    if parts and all(part["theta"] is not None for part in parts):
+        stats["theta"] = math.fsum(part["theta"] for part in parts)
+
+    return stats
+
+
+# smaller ranges are not worth starting processes for
+parallel_min = 10**7
+
+
+def _range_stats(start, end):
+    return prime_stats(end, start, theta=True)
+
+
+# prime_stats(theta=True) spread over a process pool. Each worker sieves
+# its own slice of [start, end]; only the small stats dicts come back.
+def parallel_stats(start, end, workers=None):
+    workers = workers or os.cpu_count() or 1
+
+    # the editors build Tk at import time, so a spawned child would open
+    # a second window; only fork is safe here
+    if "fork" not in multiprocessing.get_all_start_methods():
+        workers = 1
+
+    if workers == 1 or end - start < parallel_min:
+        return _range_stats(start, end)
+
+    chunks = 4 * workers
+    step = (end - start + chunks) // chunks
+    lows = list(range(start, end + 1, step))
+    highs = [min(low + step - 1, end) for low in lows]
+
+    context = multiprocessing.get_context("fork")
+
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        parts = list(pool.map(_range_stats, lows, highs))
+
+    return merge_stats(parts)
+
+
+def format_gaps(gaps, columns=3):
+    lines = []
+    lines.append(f"Cousin Primes: {gaps['cousin']}")
+    lines.append(f"Sexy Primes: {gaps['sexy']}")
+    lines.append(f"Prime Triplets: {gaps['triplet']}")
+    lines.append("")
+
+    lines.append("Gap Histogram:")
+    cells = [f"{gap:>4}:{count:>8}" for gap, count in gaps["histogram"].items()]
+    for i in range(0, len(cells), columns):
+        lines.append("  ".join(cells[i : i + columns]))
+    lines.append("")
+
+    lines.append("Record Gaps:")
+    lines.append(f"{'After':>12} {'Gap':>6}")
+    for p, gap in gaps["records"]:
+        lines.append(f"{p:>12} {gap:>6}")
+
+    return "\n".join(lines)
@@ -0,0 +1,145 @@
+import itertools
+import math
+import queue
+import threading
+
+import prime_bitset
+
+
+# primes per chunk handed from the worker to the Tk main thread
+batch_size = 2000
+
+# the main thread drains the queue this often, at most chunks_per_poll
+# chunks at a time so typing keeps working while a list is streaming
+poll_ms = 30
+chunks_per_poll = 4
+
+# chunks the worker may get ahead of the main thread by
+max_chunks = 64
+
+# past this many (estimated) primes, offer a file instead of the widget
+file_limit = 200000
+
+_cancel = threading.Event()
+_marks = itertools.count()
+
+
+def estimate_count(start, end):
+    if end < 3:
+        return int(start <= 2 <= end)
+
+    low = max(start, 3)
+    return max(0, int(end / math.log(end) - low / math.log(low)))
+
+
+# (fraction done, text) chunks of the "Primes = ['2', '3', ...]" listing
+def listing_chunks(start, end, cancel):
+    span = max(end - start, 1)
+    batch = []
+    sep = ""
+
+    yield 0, "\nPrimes = ["
+
+    for p in prime_bitset.primes_between(start, end):
+        batch.append(f"'{p}'")
+
+        if len(batch) == batch_size:
+            if cancel.is_set():
+                return
+            yield (p - start) / span, sep + ", ".join(batch)
+            batch = []
+            sep = ", "
+
+    yield 1, (sep + ", ".join(batch) if batch else "") + "]\n"
+
+
+def stop_primes():
+    _cancel.set()
+
+
+# Runs make_chunks(cancel) in a worker thread. The worker only fills a
+# queue of (fraction done, text), at most max_chunks deep, so it waits
+# for the widget instead of holding the whole listing; the Tk main
+# thread drains it with root.after, shows progress in the title bar and
+# stops early when stop_primes() is called. With a path the text goes
+# straight to that file and the widget only gets a note.
+def stream_text(root, widget, make_chunks, path=None, label="Primes"):
+    global _cancel
+
+    _cancel.set()
+    cancel = _cancel = threading.Event()
+
+    chunks = queue.Queue(max_chunks)
+    title = root.title()
+    mark = f"stream_{next(_marks)}"
+
+    def work():
+        try:
+            if path is None:
+                for item in make_chunks(cancel):
+                    chunks.put(item)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    for done, text in make_chunks(cancel):
+                        f.write(text)
+
+                        # progress only, the file need not wait for it
+                        try:
+                            chunks.put_nowait((done, None))
+                        except queue.Full:
+                            pass
+
+        except Exception as e:
+            chunks.put((None, f"\n{type(e).__name__}: {e}\n"))
+
+        chunks.put(None)
+
+    def finish():
+        root.title(title)
+
+        if path is None:
+            if cancel.is_set():
+                widget.insert(mark, f" ({label} stopped)\n")
+            widget.mark_unset(mark)
+        else:
+            note = "stopped" if cancel.is_set() else "written to"
+            widget.insert("insert", f"\n{label} {note} {path}\n")
+
+    def drain():
+        last = None
+
+        for _ in range(chunks_per_poll):
+            try:
+                item = chunks.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                finish()
+                return
+
+            done, text = item
+
+            if done is not None:
+                last = done
+
+            # in file mode only error messages carry text
+            if text and not cancel.is_set():
+                widget.insert(mark if path is None else "insert", text)
+
+        if last is not None:
+            root.title(f"{label} {int(100 * last)}%")
+
+        root.after(poll_ms, drain)
+
+    widget.mark_set(mark, "insert")
+    widget.mark_gravity(mark, "right")
+
+    threading.Thread(target=work, daemon=True).start()
+    root.after(poll_ms, drain)
+
+
+def stream_primes(root, widget, start, end, path=None):
+    stream_text(
+        root, widget, lambda cancel: listing_chunks(start, end, cancel), path
+    )
@@ -0,0 +1,267 @@
+import atexit
+import codecs
+import io
+import json
+import linecache
+import os
+import queue
+import subprocess
+import sys
+import threading
+import traceback
+
+
+# Runs the editors' Python code in a separate, already started
+# interpreter instead of exec() on the Tk main thread. The worker reads
+# one JSON request per line on stdin, runs the code in fresh globals and
+# writes whatever it prints straight to its stdout (stderr goes there
+# too), then the _done marker. The IDE side reads that pipe in a thread
+# and the Tk main thread inserts what came in every poll_ms. A worker
+# left with threads still running after a run exits instead, with
+# status 0, and the next run gets a fresh one.
+
+poll_ms = 30
+
+# ends the output of every run; never printed by normal code
+_done = "\x00\x00python_worker done\x00\x00\n"
+
+_proc = None
+
+# cancel event of the run being shown, None when there is none
+_running = None
+
+
+# Starts the worker unless one is alive already. The IDEs call this at
+# launch so the first run does not wait for interpreter startup.
+def start():
+    global _proc
+
+    if _proc is None or _proc.poll() is not None:
+        _proc = subprocess.Popen(
+            [sys.executable, "-u", os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=dict(os.environ, PYTHONIOENCODING="utf-8"),
+        )
+
+    return _proc
+
+
+def stop():
+    global _proc
+
+    if _proc is not None and _proc.poll() is None:
+        _proc.kill()
+        _proc.wait()
+
+    _proc = None
+
+
+def restart():
+    stop()
+    start()
+
+
+# Stops the code that is running; the worker goes with it and a fresh
+# one is started once the run has been wrapped up
+def cancel():
+    if _running is not None:
+        _running.set()
+        stop()
+
+
+atexit.register(stop)
+
+
+def _read(proc, chunks):
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    fd = proc.stdout.fileno()
+    text = ""
+
+    while True:
+        data = os.read(fd, 65536)
+        if not data:
+            chunks.put(text + decoder.decode(b"", True))
+            chunks.put(None)
+            return
+
+        text += decoder.decode(data)
+
+        if text.endswith(_done):
+            chunks.put(text[: -len(_done)])
+            chunks.put(_done)
+            return
+
+        # hold back what could be the start of the marker
+        keep = 0
+        for k in range(min(len(_done) - 1, len(text)), 0, -1):
+            if _done.startswith(text[-k:]):
+                keep = k
+                break
+
+        if len(text) > keep:
+            chunks.put(text[: len(text) - keep])
+            text = text[len(text) - keep :]
+
+
+# Sends code to the worker and appends its output to the end of widget
+# as it arrives. A run still going is stopped first.
+def run(root, widget, code):
+    global _running
+
+    # only the IDE side needs Tk, the worker never loads it
+    import tkinter as tk
+
+    if _running is not None:
+        _running.set()
+        _running = None
+        stop()
+
+    cancel_run = _running = threading.Event()
+    request = json.dumps({"code": code, "cwd": os.getcwd()}) + "\n"
+
+    proc = start()
+    try:
+        proc.stdin.write(request.encode("utf-8"))
+        proc.stdin.flush()
+    except OSError:
+        restart()
+        proc = _proc
+        proc.stdin.write(request.encode("utf-8"))
+        proc.stdin.flush()
+
+    chunks = queue.Queue()
+
+    def finish(note=None):
+        global _running
+
+        if _running is cancel_run:
+            _running = None
+
+        if note:
+            try:
+                widget.insert("end", note)
+            except tk.TclError:
+                pass
+
+        start()
+
+    def drain():
+        if cancel_run.is_set() and _running is not cancel_run:
+            return
+
+        parts = []
+        end = False
+
+        while True:
+            try:
+                item = chunks.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None or item == _done:
+                end = item
+                break
+
+            parts.append(item)
+
+        if parts and not cancel_run.is_set():
+            try:
+                widget.insert("end", "".join(parts))
+            except tk.TclError:
+                # the output window was closed, let the code finish unseen
+                pass
+
+        if end is False:
+            root.after(poll_ms, drain)
+        elif end == _done:
+            finish()
+        elif cancel_run.is_set():
+            finish("\n(Python stopped)\n")
+        else:
+            code = proc.wait()
+            finish(f"\n(Python worker exited with code {code})\n" if code else None)
+
+    threading.Thread(target=_read, args=(proc, chunks), daemon=True).start()
+    root.after(poll_ms, drain)
+
+
+# What the interpreter itself would print for an exception that ended
+# the code: the traceback from the first frame of the editor's code on,
+# the message of a SystemExit, or its status when that is not 0.
+def _report(error):
+    if isinstance(error, SystemExit):
+        if isinstance(error.code, int):
+            if error.code:
+                print(f"SystemExit: {error.code}")
+        elif error.code is not None:
+            print(error.code)
+        return
+
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != "<editor>":
+        tb = tb.tb_next
+
+    print("".join(traceback.format_exception(type(error), error, tb)), end="")
+
+
+# Waits for the threads the code started, as the interpreter does at
+# exit. Daemon threads are not waited for; True when some are left.
+def _join_threads():
+    main = threading.main_thread()
+
+    for thread in threading.enumerate():
+        if thread is not main and not thread.daemon:
+            thread.join()
+
+    return any(thread is not main for thread in threading.enumerate())
+
+
+def serve():
+    requests = sys.stdin.buffer
+    sys.stdin = io.StringIO()
+
+    for line in requests:
+        request = json.loads(line)
+        code = request["code"]
+
+        try:
+            os.chdir(request["cwd"])
+        except OSError:
+            pass
+
+        # so tracebacks can show the lines of the code
+        lines = code.splitlines(True)
+        linecache.cache["<editor>"] = (len(code), None, lines, "<editor>")
+
+        try:
+            exec(compile(code, "<editor>", "exec"), {"__name__": "__main__"})
+            error = None
+        except BaseException as e:
+            error = e
+
+        # the code may have replaced them
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+
+        if error is not None:
+            _report(error)
+
+        left = _join_threads()
+
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        sys.stderr.flush()
+
+        if left:
+            # daemon threads would carry on into the next run
+            sys.stdout.flush()
+            os._exit(0)
+
+        sys.stdout.write(_done)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,269 @@
+import keyword
+import os
+import re
+from functools import lru_cache
+
+
+# Language packs for the highlighters. Every front end (Tk tags in
+# tk_highlight, ANSI escapes and prompt_toolkit fragments in
+# term_highlight) takes one of these and gets back the same spans:
+#
+#   kw, var, eq, num, str, call, comment, pre
+#
+# An identifier is a variable when "=" follows, a call when "(" follows
+# directly and a keyword when it is in the pack's keyword set. Strings
+# and comments are matched before anything inside them can be.
+
+c_keywords = [
+    "auto", "break", "case", "char", "const", "continue", "default", "do",
+    "double", "else", "enum", "extern", "float", "for", "goto", "if",
+    "inline", "int", "long", "register", "restrict", "return", "short",
+    "signed", "sizeof", "static", "struct", "switch", "typedef", "union",
+    "unsigned", "void", "volatile", "while", "_Alignas", "_Alignof",
+    "_Atomic", "_Bool", "_Complex", "_Generic", "_Imaginary", "_Noreturn",
+    "_Static_assert", "_Thread_local",
+]
+
+cpp_keywords = [
+    "alignas", "alignof", "and", "and_eq", "asm", "auto", "bitand", "bitor",
+    "bool", "break", "case", "catch", "char", "char8_t", "char16_t",
+    "char32_t", "class", "compl", "concept", "const", "consteval",
+    "constexpr", "constinit", "const_cast", "continue", "co_await",
+    "co_return", "co_yield", "decltype", "default", "delete", "do", "double",
+    "dynamic_cast", "else", "enum", "explicit", "export", "extern", "false",
+    "float", "for", "friend", "goto", "if", "inline", "int", "long",
+    "mutable", "namespace", "new", "noexcept", "not", "not_eq", "nullptr",
+    "operator", "or", "or_eq", "private", "protected", "public", "register",
+    "reinterpret_cast", "requires", "return", "short", "signed", "sizeof",
+    "static", "static_assert", "static_cast", "struct", "switch", "template",
+    "this", "thread_local", "throw", "true", "try", "typedef", "typeid",
+    "typename", "union", "unsigned", "using", "virtual", "void", "volatile",
+    "wchar_t", "while", "xor", "xor_eq",
+]
+
+rust_keywords = [
+    "as", "async", "await", "break", "const", "continue", "crate", "dyn",
+    "else", "enum", "extern", "false", "fn", "for", "if", "impl", "in",
+    "let", "loop", "match", "mod", "move", "mut", "pub", "ref", "return",
+    "self", "Self", "static", "struct", "super", "trait", "true", "type",
+    "unsafe", "use", "where", "while", "abstract", "become", "box", "do",
+    "final", "macro", "override", "priv", "try", "typeof", "unsized",
+    "virtual", "yield",
+]
+
+go_keywords = [
+    "break", "case", "chan", "const", "continue", "default", "defer", "else",
+    "fallthrough", "for", "func", "go", "goto", "if", "import", "interface",
+    "map", "package", "range", "return", "select", "struct", "switch",
+    "type", "var",
+]
+
+# lines kept in the token cache; a line costs its text plus its spans
+cache_size = 8192
+
+# pack name -> pack, for the cache, which can only key on the name
+_packs = {}
+
+_num = r"\b(?:0[xX][0-9a-fA-F_]+|\d+(?:\.\d+)?)\b"
+_ident = r"(?P<id>[A-Za-z_]\w*)(?P<next>\s*=|\()?"
+
+
+# keywords, line comment start, openers of constructs that can run over
+# several lines (opener -> (closer, span kind)), single-line string
+# pattern and whether a line starting with "#" is a preprocessor line
+def _pack(name, keywords, comment, multiline, strings, preprocessor=False):
+    parts = []
+
+    if preprocessor:
+        parts.append(r"(?P<pre>^\s*\#.*)")
+
+    parts.append("(?P<open>" + "|".join(re.escape(o) for o in multiline) + ")")
+    parts.append(f"(?P<comment>{re.escape(comment)}.*)")
+    parts.append(f"(?P<str>{strings})")
+    parts.append(f"(?P<num>{_num})")
+    parts.append(_ident)
+    parts.append("(?P<eq>=)")
+
+    pack = _packs[name] = {
+        "name": name,
+        "keywords": frozenset(keywords),
+        "token_re": re.compile("|".join(parts)),
+        "multiline": multiline,
+    }
+    return pack
+
+
+_quoted = r""""[^"\n]*"|'[^'\n]*'"""
+_c_quoted = r""""(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])+'"""
+_block = {"/*": ("*/", "comment")}
+
+languages = {
+    "python": _pack(
+        "python",
+        keyword.kwlist,
+        "#",
+        {'"""': ('"""', "str"), "'''": ("'''", "str")},
+        _quoted,
+    ),
+    "c": _pack("c", c_keywords, "//", _block, _c_quoted, preprocessor=True),
+    "cpp": _pack("cpp", cpp_keywords, "//", _block, _c_quoted, preprocessor=True),
+    # 'a is a lifetime, so only proper char literals count as strings
+    "rust": _pack(
+        "rust",
+        rust_keywords,
+        "//",
+        _block,
+        r""""(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])'""",
+    ),
+    "go": _pack(
+        "go",
+        go_keywords,
+        "//",
+        {"/*": ("*/", "comment"), "`": ("`", "str")},
+        _c_quoted,
+    ),
+}
+
+extensions = {
+    ".py": "python",
+    ".c": "c",
+    ".h": "c",
+    ".cpp": "cpp",
+    ".cc": "cpp",
+    ".hpp": "cpp",
+    ".rs": "rust",
+    ".go": "go",
+}
+
+
+# The first pack's syntax with the keywords of all of them, for editors
+# that hold whichever language is pasted in
+def combine(*names):
+    name = "+".join(names)
+    keywords = frozenset().union(*(languages[n]["keywords"] for n in names))
+
+    pack = _packs[name] = dict(languages[names[0]], name=name, keywords=keywords)
+    return pack
+
+
+def for_filename(filename, default="python"):
+    ext = os.path.splitext(filename)[1].lower()
+    return languages[extensions.get(ext, default)]
+
+
+# (tag, start, end) spans of one line and the lexer state at its end.
+# The state is None, or the opener of a string / comment that is still
+# open, so a line only needs re-tokenizing when its text or the state
+# coming in from the line above changed; results are cached on exactly
+# that, so unchanged lines cost a dictionary lookup.
+def tokenize_line(line, state, language):
+    return _cached_line(line, state, language["name"])
+
+
+@lru_cache(maxsize=cache_size)
+def _cached_line(line, state, name):
+    spans, state = _tokenize_line(line, state, _packs[name])
+    return tuple(spans), state
+
+
+def cache_stats():
+    info = _cached_line.cache_info()
+    lookups = info.hits + info.misses
+
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "lines": info.currsize,
+        "max_lines": info.maxsize,
+    }
+
+
+def cache_clear():
+    _cached_line.cache_clear()
+
+
+def _tokenize_line(line, state, language):
+    multiline = language["multiline"]
+    keywords = language["keywords"]
+    spans = []
+    pos = 0
+
+    if state:
+        closer, kind = multiline[state]
+        close = line.find(closer)
+        if close < 0:
+            if line:
+                spans.append((kind, 0, len(line)))
+            return spans, state
+
+        pos = close + len(closer)
+        spans.append((kind, 0, pos))
+
+    search = language["token_re"].search
+    m = search(line, pos)
+
+    while m:
+        kind = m.lastgroup
+        pos = m.end()
+
+        if kind == "open":
+            closer, kind = multiline[m.group()]
+            close = line.find(closer, pos)
+            if close < 0:
+                spans.append((kind, m.start(), len(line)))
+                return spans, m.group()
+
+            pos = close + len(closer)
+            spans.append((kind, m.start(), pos))
+
+        elif kind == "next":
+            s, e = m.span("id")
+
+            if m.group("id") in keywords:
+                # if(x), while(x), return(x) are still keywords, and
+                # whatever followed them is scanned again
+                spans.append(("kw", s, e))
+                pos = e
+            elif m.group("next") == "(":
+                spans.append(("call", s, e))
+            else:
+                spans.append(("var", s, e))
+                spans.append(("eq", pos - 1, pos))
+
+        elif kind == "id":
+            if m.group("id") in keywords:
+                spans.append(("kw", m.start(), pos))
+
+        else:
+            spans.append((kind, m.start(), pos))
+
+        m = search(line, pos)
+
+    return spans, None
+
+
+# Yields (tag, start, end) offsets into text, in order, without overlaps.
+def tokenize(text, language, state=None):
+    offset = 0
+
+    for line in text.split("\n"):
+        spans, state = tokenize_line(line, state, language)
+
+        for tag, s, e in spans:
+            yield tag, offset + s, offset + e
+
+        offset += len(line) + 1
+
+
+# Offsets where each line of text starts
+def line_starts(text):
+    starts = [0]
+    find = text.find
+    i = find("\n")
+
+    while i >= 0:
+        starts.append(i + 1)
+        i = find("\n", i + 1)
+
+    return starts
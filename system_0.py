@@ -1,9 +1,7 @@
 
 import tempfile
 import random
-import io
 import os
-import sys
 import subprocess
 import threading
 import webbrowser
@@ -21,7 +19,6 @@ from tkinter import (
     
 )
 
-import keyword
 import re
 
 from xml.etree import ElementTree
@@ -41,101 +38,33 @@ from deep_translator import GoogleTranslator
 
 from transliterate import translit
 
-
-c_keywords = ["auto","break","case","char","const","continue","default","do","double","else","enum","extern","float","for","goto","if","inline","int","long","register","restrict","return","short","signed","sizeof","static","struct","switch","typedef","union","unsigned","void","volatile","while", "public",
-    "alignas",
-    "alignof",
-    "and",
-    "and_eq",
-    "asm",
-    "auto",
-    "bitand",
-    "bitor",
-    "bool",
-    "break",
-    "case",
-    "catch",
-    "char",
-    "char8_t",
-    "char16_t",
-    "char32_t",
-    "class",
-    "compl",
-    "const",
-    "consteval",
-    "constexpr",
-    "const_cast",
-    "continue",
-    "decltype",
-    "default",
-    "delete",
-    "do",
-    "double",
-    "dynamic_cast",
-    "else",
-    "enum",
-    "explicit",
-    "export",
-    "extern",
-    "false",
-    "float",
-    "for",
-    "friend",
-    "goto",
-    "if",
-    "inline",
-    "int",
-    "long",
-    "mutable",
-    "namespace",
-    "new",
-    "noexcept",
-    "not",
-    "not_eq",
-    "nullptr",
-    "operator",
-    "or",
-    "or_eq",
-    "private",
-    "protected",
-    "public",
-    "register",
-    "reinterpret_cast",
-    "return",
-    "short",
-    "signed",
-    "sizeof",
-    "static",
-    "static_assert",
-    "static_cast",
-    "struct",
-    "switch",
-    "template",
-    "this",
-    "thread_local",
-    "throw",
-    "true",
-    "try",
-    "typedef",
-    "typeid",
-    "typename",
-    "union",
-    "unsigned",
-    "using",
-    "virtual",
-    "void",
-    "volatile",
-    "wchar_t",
-    "while",
-    "xor",
-    "xor_eq",
-    "print",
-    "(",
-    ")" "+",
-    "-",
-    "/",
-    "*",
-]
+import lint_service
+import output_sink
+import python_worker
+import syntax_tokens
+import tk_highlight
+import ui_queue
+
+
+highlight_language = syntax_tokens.combine("python", "cpp")
+
+light_colors = {
+    "kw": "red",
+    "var": "#5c4fad",
+    "eq": "darkred",
+    "num": "#018a5c",
+    "str": "#E67300",
+    "call": "blue",
+}
+
+dark_colors = {
+    "kw": "#1fc7f5",
+    "var": "#ecb696",
+    "eq": "cyan",
+    "num": "yellow",
+    "str": "#9ddba0",
+    "call": "#dbcf35",
+}
 
 unix_words = ["ls", "cat", "cp", "mv", "rm", "mkdir", "rmdir", "pwd", "cd", "echo", "touch", "clear", "whoami", "date", "cal", "grep", "find", "sort", "wc", "head", "tail", "less", "more", "gcc", "g++", "python", "python3", "flake8", "cpplint", "git", "make", "cmake", "ps", "top", "kill", "chmod", "chown"]
 
@@ -281,117 +210,41 @@ def auto_indent(event=None):
 def highlight_code(event=None):
     current_window = root.focus_get()
 
-    line = int(current_window.index("insert").split(".")[0])
-
-    first = max(1, line - 28)
-    last = line + 28
-
-    region_start = f"{first}.0"
-    region_end = f"{last}.end"
-
-    for tag in ("kw", "var", "eq", "num", "str", "call"):
-        current_window.tag_remove(tag, region_start, region_end)
-
-    text = current_window.get(region_start, region_end)
-
-    for k in keyword.kwlist + c_keywords:
-        for m in re.finditer(rf"\b{re.escape(k)}\b", text):
-            s = current_window.index(f"{region_start}+{m.start()}c")
-            e = current_window.index(f"{region_start}+{m.end()}c")
-            current_window.tag_add("kw", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("var", s, e)
-
-    for m in re.finditer(r"=", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        current_window.tag_add("eq", s, f"{s}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("num", s, e)
-
-    for m in re.finditer(r'"[^"\n]*"|\'[^\'\n]*\'', text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("str", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("call", s, e)
+    # the editor itself is kept highlighted by tk_highlight.watch
+    if current_window is editor:
+        tk_highlight.set_colors(editor, light_colors)
+        return
 
-    current_window.tag_config("kw", foreground="red")
-    current_window.tag_config("var", foreground="#5c4fad")
-    current_window.tag_config("eq", foreground="darkred")
-    current_window.tag_config("num", foreground="#018a5c")
-    current_window.tag_config("str", foreground="#E67300")
-    current_window.tag_config("call", foreground="blue")
+    tk_highlight.highlight_visible(
+        current_window,
+        highlight_language,
+        light_colors,
+    )
     
 # for dark background
 def highlight_code_dark(event=None):
     current_window = root.focus_get()
 
-    line = int(current_window.index("insert").split(".")[0])
-
-    first = max(1, line - 28)
-    last = line + 28
-
-    region_start = f"{first}.0"
-    region_end = f"{last}.end"
-
-    for tag in ("kw", "var", "eq", "num", "str", "call"):
-        current_window.tag_remove(tag, region_start, region_end)
-
-    text = current_window.get(region_start, region_end)
-
-    for k in keyword.kwlist + c_keywords:
-        for m in re.finditer(rf"\b{re.escape(k)}\b", text):
-            s = current_window.index(f"{region_start}+{m.start()}c")
-            e = current_window.index(f"{region_start}+{m.end()}c")
-            current_window.tag_add("kw", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("var", s, e)
-
-    for m in re.finditer(r"=", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        current_window.tag_add("eq", s, f"{s}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("num", s, e)
-
-    for m in re.finditer(r'"[^"\n]*"|\'[^\'\n]*\'', text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("str", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("call", s, e)
+    # the editor itself is kept highlighted by tk_highlight.watch
+    if current_window is editor:
+        tk_highlight.set_colors(editor, dark_colors)
+        return
 
-    current_window.tag_config("kw", foreground="#1fc7f5")
-    current_window.tag_config("var", foreground="#ecb696")
-    current_window.tag_config("eq", foreground="cyan")
-    current_window.tag_config("num", foreground="yellow")
-    current_window.tag_config("str", foreground="#9ddba0")
-    current_window.tag_config("call", foreground="#dbcf35")
+    tk_highlight.highlight_visible(
+        current_window,
+        highlight_language,
+        dark_colors,
+    )
     
     
+# the editor itself is re-highlighted by tk_highlight.watch as it changes,
+# this only switches its colours
 def highlight_detect(event=None):
 	if dark_screen:
-		highlight_code_dark()
+		tk_highlight.set_colors(editor, dark_colors)
 		editor.config(insertbackground="gold")
 	else:
-		highlight_code()
+		tk_highlight.set_colors(editor, light_colors)
 		editor.config(insertbackground="darkred")
 
 def goto_line_selected(event=None):
@@ -422,7 +275,7 @@ def goto_line_selected(event=None):
     except:
         pass
 
-def show_output(result):
+def show_output(result, diagnostics=None):
     output_window = tk.Toplevel(root)
     output_window.geometry("460x500+0+0")
     
@@ -453,7 +306,7 @@ def show_output(result):
     ff8_button = tk.Button(
         output_window,
         text="FF8",
-        command=lambda: (output_window.geometry("460x330+0+500"), format_flake8(), highlight_code_dark(), result_text.config(state=tk.DISABLED)),
+        command=lambda: (output_window.geometry("460x330+0+500"), format_flake8(result_text, diagnostics), highlight_code_dark(), result_text.config(state=tk.DISABLED)),
         font=("Courier New", 8),
         bd=5,
         width=2,
@@ -529,24 +382,15 @@ def show_output(result):
     	
     result_text.bind("<Button-1>", goto_line_selected)
 
+    return result_text
+
 
 def run_python():
     current_widget = root.focus_get()
     code = current_widget.get("1.0", tk.END)
 
-    output = io.StringIO()
-    sys.stdout = output
-
-    try:
-        exec(code)
-
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
-
-    finally:
-        sys.stdout = sys.__stdout__
-
-        show_output(output.getvalue())
+    # output streams into the window while the code runs
+    python_worker.run(root, show_output(""), code)
         
 
 
@@ -650,29 +494,8 @@ def unix_command():
     current_window = root.focus_get()
     command = current_window.get("insert linestart", "insert lineend").strip()
 
-    def run_command():
-        try:
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                text=True
-            )
-
-            for line in process.stdout:
-                current_window.insert("end", line)
-                current_window.see("end")
-
-            process.stdout.close()
-            process.wait()
-
-        except:
-            pass
-
-        current_window.see("end")
-
     current_window.see("insert")
-    threading.Thread(target=run_command).start()
+    output_sink.stream(root, current_window, command, shell=True)
 
 
 window_expanded = 0
@@ -1091,19 +914,9 @@ def web_browser():
 
 
 
+# the "trail_ws" ranges are kept up to date by tk_highlight.watch, only
+# for the lines an edit touches, so showing them is just the colour
 def show_whitespaces(event=None):
-    editor.tag_remove("trail_ws", "1.0", "end")
-
-    text = editor.get("1.0", "end-1c")
-    lines = text.splitlines()
-
-    for i, line in enumerate(lines, start=1):
-        match = re.search(r"(?<=\S)[ \t]+$", line)
-        if match:
-            start = f"{i}.{match.start()}"
-            end = f"{i}.{match.end()}"
-            editor.tag_add("trail_ws", start, end)
-
     editor.tag_config("trail_ws", background="red")
 
 
@@ -1111,13 +924,7 @@ def remove_whitespaces():
     w = root.focus_get()
 
     try:
-        text = w.get("1.0", "end-1c")
-        lines = text.splitlines()
-
-        cleaned = [line.rstrip(" \t") for line in lines]
-
-        w.delete("1.0", "end")
-        w.insert("1.0", "\n".join(cleaned))
+        tk_highlight.strip_trailing(w)
 
     except:
         pass
@@ -1204,9 +1011,10 @@ def mandarin_translator():
         pass
                      
 def compile_exe_c():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         try:
-            code = editor.get("1.0", "end-1c")
 
             f = tempfile.NamedTemporaryFile(
                 delete=False,
@@ -1224,12 +1032,12 @@ def compile_exe_c():
                 c = subprocess.run(["gcc", f.name, "-o", exe], capture_output=True, text=True)
 
                 if c.returncode != 0:
-                    show_output(c.stderr)
+                    ui_queue.post(show_output, c.stderr)
                     return
 
                 r = subprocess.run([exe], capture_output=True, text=True)
 
-                show_output(r.stdout + r.stderr)
+                ui_queue.post(show_output, r.stdout + r.stderr)
 
             finally:
                 if os.path.exists(f.name):
@@ -1239,17 +1047,18 @@ def compile_exe_c():
                     os.unlink(exe)
 
         except Exception as e:
-            show_output(str(e))
+            ui_queue.post(show_output, str(e))
 
     threading.Thread(target=task, daemon=True).start()            
 
 
 
 def compile_cpp():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         global cpp_exe_path
         try:
-            code = editor.get("1.0", "end-1c")
 
             f = tempfile.NamedTemporaryFile(
                 delete=False, suffix=".cpp", mode="w", encoding="utf-8"
@@ -1264,13 +1073,13 @@ def compile_cpp():
             )
 
             if c.returncode != 0:
-                show_output(c.stderr)
+                ui_queue.post(show_output, c.stderr)
                 if os.path.exists(f.name):
                     os.unlink(f.name)
                 return
 
             cpp_exe_path = exe
-            show_output("Compilation successful")
+            ui_queue.post(show_output, "Compilation successful")
 
             if os.path.exists(f.name):
                 os.unlink(f.name)
@@ -1287,11 +1096,11 @@ def exe_compiled_cpp():
         global cpp_exe_path
         try:
             if not cpp_exe_path or not os.path.exists(cpp_exe_path):
-                show_output("No compiled executable found")
+                ui_queue.post(show_output, "No compiled executable found")
                 return
 
             r = subprocess.run([cpp_exe_path], capture_output=True, text=True)
-            show_output(r.stdout + r.stderr)
+            ui_queue.post(show_output, r.stdout + r.stderr)
 
         except:
             pass
@@ -1333,19 +1142,20 @@ def compile_and_execute_cpp(event=None):
                 text=True,
             )
 
-            show_output(result.stdout)
+            ui_queue.post(show_output, result.stdout)
 
         except subprocess.CalledProcessError as e:
-            show_output(e.output)
+            ui_queue.post(show_output, e.output)
 
     threading.Thread(target=compile).start()
 
 
 
 def run_cpplint():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         try:
-            code = editor.get("1.0", "end-1c")
 
             f = tempfile.NamedTemporaryFile(delete=False, suffix=".cpp", mode="w", encoding="utf-8")
             f.write(code)
@@ -1360,7 +1170,7 @@ def run_cpplint():
             compile_output = (compile_result.stdout + compile_result.stderr).strip()
 
             if compile_output:
-                show_output("COMPILER:\n" + compile_output)
+                ui_queue.post(show_output, "COMPILER:\n" + compile_output)
                 os.unlink(f.name)
                 return
 
@@ -1373,9 +1183,9 @@ def run_cpplint():
             lint_output = (lint.stdout + lint.stderr).strip()
 
             if lint_output:
-                show_output("CPPLINT:\n" + lint_output)
+                ui_queue.post(show_output, "CPPLINT:\n" + lint_output)
             else:
-                show_output("No issues found")
+                ui_queue.post(show_output, "No issues found")
 
             os.unlink(f.name)
 
@@ -1533,7 +1343,9 @@ def invert_colors():
     
     dark_screen = not dark_screen
     
-    if dark_screen:
+    if widget is editor:
+    	highlight_detect()
+    elif dark_screen:
     	highlight_code_dark()
     else:
     	highlight_code()
@@ -1640,16 +1452,25 @@ def remove_empty_lines():
 
 def format_python_code():
     current_widget = root.focus_get()
+    input_code = current_widget.get("1.0", "end-1c")
 
-    try:
-        input_code = current_widget.get("1.0", "end-1c")
-        reformatted_code = black.format_str(input_code, mode=black.FileMode())
+    def replace(reformatted_code):
+        # typed into while black ran: keep the typing, skip the format
+        if current_widget.get("1.0", "end-1c") != input_code:
+            return
 
         current_widget.delete("1.0", "end")
         current_widget.insert("1.0", reformatted_code)
 
-    except:
-        pass
+    def background_work():
+        try:
+            reformatted_code = black.format_str(input_code, mode=black.FileMode())
+        except:
+            return
+
+        ui_queue.post(replace, reformatted_code)
+
+    threading.Thread(target=background_work, daemon=True).start()
 
 
 def indent_all():
@@ -1663,54 +1484,39 @@ def indent_all():
 
 
 def run_flake8():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         try:
-            code = editor.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".py", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            result = subprocess.run(["flake8", f.name], capture_output=True, text=True)
-
-
-            if result.stdout.strip():
-                show_output(result.stdout)
-                #root.after(100, format_flake8)
-            elif result.stderr.strip():
-                show_output(result.stderr)
-            else:
-                show_output("No issues found")
-
-            os.unlink(f.name)
-
+            diagnostics = lint_service.check(code)
         except:
-            pass
+            return
+
+        if diagnostics:
+            text = lint_service.flake8_lines(diagnostics)
+            ui_queue.post(show_output, text, diagnostics)
+        else:
+            ui_queue.post(show_output, "No issues found")
 
     threading.Thread(target=task, daemon=True).start()
 
 
-def format_flake8():
+# diagnostics come straight from lint_service when run_flake8 made the
+# output; flake8 output pasted into the window is parsed back
+def format_flake8(current_window=None, diagnostics=None):
     try:
-        current_window = root.focus_get()
-
-        text = current_window.get("1.0", "end")
+        if current_window is None:
+            current_window = root.focus_get()
 
-        lines = text.splitlines()
+        if diagnostics is None:
+            diagnostics = lint_service.parse_flake8(current_window.get("1.0", "end"))
 
         grouped = {}
 
-        for line in lines:
-            m = re.search(r"(.+?):(\d+):(\d+):\s+([A-Z]\d+)\s+(.*)", line)
+        for d in diagnostics:
+            line_number = d["line"]
 
-            if not m:
-                continue
-
-            line_number = int(m.group(2))
-
-            message = m.group(5).strip()
+            message = d["message"].strip()
 
             if message:
                 message = message[0].upper() + message[1:]
@@ -1911,6 +1717,8 @@ dev_menu.add_command(label="Unix Command >", command=unix_command)
 
 dev_menu.add_command(label="Python >", command=run_python)
 
+dev_menu.add_command(label="Stop Python", command=python_worker.cancel)
+
 dev_menu.add_command(label="Run Flake8", command=run_flake8)
 
 dev_menu.add_command(label="Run Cpplint", command=run_cpplint)
@@ -2051,10 +1859,14 @@ editor.focus_set()
 
 editor.bind("<Return>", auto_indent)
 
-editor.bind("<Button-1>", highlight_detect)
+tk_highlight.watch(root, editor, highlight_language, trailing="trail_ws")
+
+highlight_detect()
+
 
-editor.bind("<KeyRelease>", highlight_detect)
+python_worker.start()
 
+ui_queue.start(root)
 
 root.mainloop()
 
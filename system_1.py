@@ -1,13 +1,8 @@
 import math
 import random
 import subprocess
-import tempfile
-import os
-import io
-import sys
 import re
 import threading
-import keyword
 
 import tkinter as tk
 from tkinter import (
@@ -25,48 +20,28 @@ import urllib.parse
 
 import black
 
+import arith_sieve
+import build_cache
+import lint_service
+import output_sink
+import prime_analytic
+import prime_bitset
+import prime_count
+import prime_factor
+import prime_sieve
+import prime_stream
+import python_worker
+import syntax_tokens
+import tk_highlight
+import ui_queue
+
 
 
 
 file_path = None
 
 
-c_keywords = [
-    "auto",
-    "break",
-    "case",
-    "char",
-    "const",
-    "continue",
-    "default",
-    "do",
-    "double",
-    "else",
-    "enum",
-    "extern",
-    "float",
-    "for",
-    "goto",
-    "if",
-    "inline",
-    "int",
-    "long",
-    "register",
-    "restrict",
-    "return",
-    "short",
-    "signed",
-    "sizeof",
-    "static",
-    "struct",
-    "switch",
-    "typedef",
-    "union",
-    "unsigned",
-    "void",
-    "volatile",
-    "while",
-]
+highlight_language = syntax_tokens.combine("python", "c")
 
 
 unix_words = [
@@ -209,18 +184,25 @@ def random_expression():
 
 def format_python_code():
     current_widget = root.focus_get()
-    def background_work():
+    input_code = current_widget.get("1.0", "end-1c")
+
+    def replace(reformatted_code):
+        # typed into while black ran: keep the typing, skip the format
+        if current_widget.get("1.0", "end-1c") != input_code:
+            return
 
+        current_widget.delete("1.0", "end")
+        current_widget.insert("1.0", reformatted_code)
+
+    def background_work():
         try:
-            input_code = current_widget.get("1.0", "end-1c")
             reformatted_code = black.format_str(input_code, mode=black.FileMode())
+        except:
+            return
 
-            current_widget.delete("1.0", "end")
-            current_widget.insert("1.0", reformatted_code)
+        ui_queue.post(replace, reformatted_code)
 
-        except:
-            pass
-    threading.Thread(target=background_work).start()
+    threading.Thread(target=background_work, daemon=True).start()
 
 
 def indent_all():
@@ -237,68 +219,48 @@ def indent_all():
 
 def run_flake8():
     current_window = root.focus_get()
+    code = current_window.get("1.0", "end-1c")
 
-    def task():
-        try:
-            code = current_window.get("1.0", "end-1c")
+    def show(diagnostics):
+        if diagnostics:
+            if current_window == editor:
+                result_window.focus_set()
+                format_flake8(result_window, diagnostics)
+                highlight_code_dark()
 
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".py", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            result = subprocess.run(["flake8", f.name], capture_output=True, text=True)
-
-            if result.stdout.strip():
-                if current_window == editor:
-                    result_window.insert(1.0, result.stdout)
-                    result_window.focus_set()
-                    root.after(100, format_flake8)
-                    root.after(200, lambda: result_window.focus_set())
-
-                    root.after(300, highlight_code_dark)
-
-                else:
-                    editor.insert(1.0, result.stdout)
-                    editor.focus_set()
-                    root.after(100, format_flake8)
-                    root.after(200, lambda: editor.focus_set())
-                    root.after(300, highlight_code)
-            elif result.stderr.strip():
-                if current_window == editor:
-                    result_window.insert(1.0, result.stderr)
             else:
-                if current_window == editor:
-                    result_window.insert(1.0, "No issues found")
-
-            os.unlink(f.name)
+                editor.focus_set()
+                format_flake8(editor, diagnostics)
+                highlight_code()
+        else:
+            if current_window == editor:
+                result_window.insert(1.0, "No issues found")
 
+    def task():
+        try:
+            diagnostics = lint_service.check(code)
         except:
-            pass
+            return
+
+        ui_queue.post(show, diagnostics)
 
     threading.Thread(target=task, daemon=True).start()
 
 
-def format_flake8():
+def format_flake8(current_window=None, diagnostics=None):
     try:
-        current_window = root.focus_get()
-
-        text = current_window.get("1.0", "end")
+        if current_window is None:
+            current_window = root.focus_get()
 
-        lines = text.splitlines()
+        if diagnostics is None:
+            diagnostics = lint_service.parse_flake8(current_window.get("1.0", "end"))
 
         grouped = {}
 
-        for line in lines:
-            m = re.search(r"(.+?):(\d+):(\d+):\s+([A-Z]\d+)\s+(.*)", line)
-
-            if not m:
-                continue
+        for d in diagnostics:
+            line_number = d["line"]
 
-            line_number = int(m.group(2))
-
-            message = m.group(5).strip()
+            message = d["message"].strip()
 
             if message:
                 message = message[0].upper() + message[1:]
@@ -503,50 +465,16 @@ def unix_command():
     current_window = root.focus_get()
     command = current_window.get("insert linestart", "insert lineend").strip()
 
-    def run_command():
-        try:
-            process = subprocess.Popen(
-                command, shell=True, stdout=subprocess.PIPE, text=True
-            )
-
-            for line in process.stdout:
-                current_window.insert("end", line)
-                current_window.see("end")
-
-            process.stdout.close()
-            process.wait()
-
-        except:
-            pass
-
-        current_window.see("end")
-
     current_window.see("insert")
-    threading.Thread(target=run_command).start()
+    output_sink.stream(root, current_window, command, shell=True)
 
 
 def is_prime(n):
-    if n < 2:
-        return False
-    i = 2
-    while i * i <= n:
-        if n % i == 0:
-            return False
-        i += 1
-    return True
+    return prime_factor.is_prime(n)
 
 
 def li_approx(x):
-    steps = 1000
-    total = 0.0
-    dx = max(x - 2.0, 0.0) / steps
-
-    for i in range(1, steps):
-        t = 2.0 + i * dx
-        if t > 1:
-            total += dx / math.log(t)
-
-    return total
+    return prime_analytic.offset_li(x)
 
 
 def clear_window():
@@ -569,57 +497,69 @@ def analyze():
     except:
         end = 10000
 
-    primes = 0
-    last = 0
-
-    gap_sum = 0.0
-    gap_count = 0
-    twin = 0
-    max_gap = 0
-
-    for n in range(1, end + 1):
-        if is_prime(n):
-            primes += 1
-
-            if last:
-                gap = n - last
-                gap_sum += gap
-                gap_count += 1
-                if gap > max_gap:
-                    max_gap = gap
-                if gap == 2:
-                    twin += 1
-
-            last = n
-
-    rng = end
+    def show(stats):
+        primes = stats["count"]
+        gap_sum = stats["gap_sum"]
+        gap_count = stats["gap_count"]
+        twin = stats["twin"]
+        max_gap = stats["max_gap"]
+
+        rng = end
+
+        density = primes / rng
+        expected = end / math.log(end)
+        error = primes - expected
+        rel = abs(error) / expected
+
+        avg_gap = gap_sum / gap_count if gap_count else 0
+        li = li_approx(end)
+        li_error = primes - li
+
+        r = prime_analytic.riemann_r(end)
+        r_error = primes - r
+
+        norm_err = error / math.sqrt(end)
+
+        result_window.insert(tk.END, "=== Prime Interval Summary ===\n\n")
+        result_window.insert(tk.END, f"Range: (1, {end})\n")
+        result_window.insert(tk.END, f"Primes: {primes}\n")
+        result_window.insert(tk.END, f"Expected π(x): {expected:.2f}\n")
+        result_window.insert(tk.END, f"Error: {error:.2f}\n")
+        result_window.insert(tk.END, f"Relative Error: {rel:.6f}\n")
+        result_window.insert(tk.END, f"Density: {density:.6f}\n")
+        result_window.insert(tk.END, f"Average Gap: {avg_gap:.3f}\n")
+
+        if max_gap is None:
+            result_window.insert(tk.END, "Max Gap: n/a (counted, not sieved)\n")
+            result_window.insert(tk.END, "Twin Primes: n/a (counted, not sieved)\n\n")
+        else:
+            result_window.insert(tk.END, f"Max Gap: {max_gap}\n")
+            result_window.insert(tk.END, f"Twin Primes: {twin}\n\n")
 
-    density = primes / rng
-    expected = end / math.log(end)
-    error = primes - expected
-    rel = abs(error) / expected
+            result_window.insert(tk.END, "=== Gap Statistics ===\n\n")
+            gaps = prime_sieve.format_gaps(stats["gaps"])
+            result_window.insert(tk.END, gaps + "\n\n")
 
-    avg_gap = gap_sum / gap_count if gap_count else 0
-    li = li_approx(end)
-    li_error = primes - li
+        result_window.insert(tk.END, "=== Analytic Layer ===\n\n")
+        result_window.insert(tk.END, f"Li(x): {li!r}\n")
+        result_window.insert(tk.END, f"Li Error: {li_error!r}\n")
+        result_window.insert(tk.END, f"R(x): {r!r}\n")
+        result_window.insert(tk.END, f"R Error: {r_error!r}\n")
+        result_window.insert(tk.END, f"Normalized Error: {norm_err:.6f}\n")
 
-    norm_err = error / math.sqrt(end)
+    def task():
+        # π(x) alone is counted (sublinear), gap statistics need every
+        # prime and are only sieved up to sieve_limit
+        if end <= prime_count.sieve_limit:
+            stats = prime_sieve.prime_stats(
+                end, segments=prime_bitset.odd_segments, gaps=True
+            )
+        else:
+            stats = prime_count.count_stats(end)
 
-    result_window.insert(tk.END, "=== Prime Interval Summary ===\n\n")
-    result_window.insert(tk.END, f"Range: (1, {end})\n")
-    result_window.insert(tk.END, f"Primes: {primes}\n")
-    result_window.insert(tk.END, f"Expected π(x): {expected:.2f}\n")
-    result_window.insert(tk.END, f"Error: {error:.2f}\n")
-    result_window.insert(tk.END, f"Relative Error: {rel:.6f}\n")
-    result_window.insert(tk.END, f"Density: {density:.6f}\n")
-    result_window.insert(tk.END, f"Average Gap: {avg_gap:.3f}\n")
-    result_window.insert(tk.END, f"Max Gap: {max_gap}\n")
-    result_window.insert(tk.END, f"Twin Primes: {twin}\n\n")
+        ui_queue.post(show, stats)
 
-    result_window.insert(tk.END, "=== Analytic Layer ===\n\n")
-    result_window.insert(tk.END, f"Li(x): {li:.2f}\n")
-    result_window.insert(tk.END, f"Li Error: {li_error:.2f}\n")
-    result_window.insert(tk.END, f"Normalized Error: {norm_err:.6f}\n")
+    threading.Thread(target=task, daemon=True).start()
 
 
 # ---------------- Developer Tools ----------------
@@ -627,57 +567,36 @@ def analyze():
 
 def run_c():
     current_window = root.focus_get()
+    code = current_window.get(1.0, "end")
 
-    def task():
-        try:
-            code = current_window.get(1.0, "end")
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".c", mode="w", encoding="utf-8"
-            )
-
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
-
-            try:
-                c = subprocess.run(
-                    ["gcc", f.name, "-o", exe], capture_output=True, text=True
-                )
-
-                if c.returncode != 0:
-                    if current_window == editor:
-                        result_window.delete(1.0, "end")
-                        result_window.insert(1.0, c.stderr)
-                        result_window.focus_set()
-                        highlight_detect()
-                        expand_window()
-                        return
-                    else:
-                        editor.delete(1.0, "end")
-                        editor.insert(1.0, c.stderr)
-                        return
-
-                r = subprocess.run([exe], capture_output=True, text=True)
-
-                result_window.delete(1.0, "end")
-                result_window.insert(1.0, r.stdout + r.stderr)
+    def show_errors(errors):
+        if current_window == editor:
+            result_window.delete(1.0, "end")
+            result_window.insert(1.0, errors)
+            result_window.focus_set()
+            highlight_detect()
+            expand_window()
+        else:
+            editor.delete(1.0, "end")
+            editor.insert(1.0, errors)
 
-            finally:
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
+    def run(exe):
+        result_window.delete(1.0, "end")
+        output_sink.stream(root, result_window, [exe])
 
-                if os.path.exists(exe):
-                    os.unlink(exe)
+    def task():
+        try:
+            # unchanged code reuses the binary built last time
+            exe, errors = build_cache.build(code, "c")
 
         except Exception as e:
+            ui_queue.post(show_errors, str(e))
+            return
 
-            if current_window == editor:
-                result_window.delete(1.0, "end")
-                result_window.insert(1.0, e)
-            else:
-                editor.delete(1.0, "end")
-                editor.insert(1.0, e)
+        if exe is None:
+            ui_queue.post(show_errors, errors)
+        else:
+            ui_queue.post(run, exe)
 
     threading.Thread(target=task, daemon=True).start()
 
@@ -686,24 +605,10 @@ def run_python():
     current_window = root.focus_get()
     code = current_window.get("1.0", tk.END)
 
-    output = io.StringIO()
-    sys.stdout = output
-
-    try:
-        exec(code)
-
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
+    output = result_window if current_window == editor else editor
+    output.delete(1.0, "end")
 
-    finally:
-        sys.stdout = sys.__stdout__
-
-        if current_window == editor:
-            result_window.delete(1.0, "end")
-            result_window.insert(1.0, output.getvalue())
-        else:
-            editor.delete(1.0, "end")
-            editor.insert(1.0, output.getvalue())
+    python_worker.run(root, output, code)
 
 
 
@@ -1069,110 +974,36 @@ def reset_window():
 def highlight_code(event=None):
     current_window = root.focus_get()
 
-    line = int(current_window.index("insert").split(".")[0])
-
-    first = max(1, line - 28)
-    last = line + 28
-
-    region_start = f"{first}.0"
-    region_end = f"{last}.end"
-
-    for tag in ("kw", "var", "eq", "num", "str", "call"):
-        current_window.tag_remove(tag, region_start, region_end)
-
-    text = current_window.get(region_start, region_end)
-
-    for k in keyword.kwlist + c_keywords:
-        for m in re.finditer(rf"\b{re.escape(k)}\b", text):
-            s = current_window.index(f"{region_start}+{m.start()}c")
-            e = current_window.index(f"{region_start}+{m.end()}c")
-            current_window.tag_add("kw", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("var", s, e)
-
-    for m in re.finditer(r"=", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        current_window.tag_add("eq", s, f"{s}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("num", s, e)
-
-    for m in re.finditer(r'"[^"\n]*"|\'[^\'\n]*\'', text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("str", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("call", s, e)
-
-    current_window.tag_config("kw", foreground="red")
-    current_window.tag_config("var", foreground="#5c4fad")
-    current_window.tag_config("eq", foreground="darkred")
-    current_window.tag_config("num", foreground="#018a5c")
-    current_window.tag_config("str", foreground="#E67300")
-    current_window.tag_config("call", foreground="blue")
+    tk_highlight.highlight_visible(
+        current_window,
+        highlight_language,
+        {
+            "kw": "red",
+            "var": "#5c4fad",
+            "eq": "darkred",
+            "num": "#018a5c",
+            "str": "#E67300",
+            "call": "blue",
+        },
+    )
 
 
 # for dark background
 def highlight_code_dark(event=None):
     current_window = root.focus_get()
 
-    line = int(current_window.index("insert").split(".")[0])
-
-    first = max(1, line - 28)
-    last = line + 28
-
-    region_start = f"{first}.0"
-    region_end = f"{last}.end"
-
-    for tag in ("kw", "var", "eq", "num", "str", "call"):
-        current_window.tag_remove(tag, region_start, region_end)
-
-    text = current_window.get(region_start, region_end)
-
-    for k in keyword.kwlist + c_keywords:
-        for m in re.finditer(rf"\b{re.escape(k)}\b", text):
-            s = current_window.index(f"{region_start}+{m.start()}c")
-            e = current_window.index(f"{region_start}+{m.end()}c")
-            current_window.tag_add("kw", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("var", s, e)
-
-    for m in re.finditer(r"=", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        current_window.tag_add("eq", s, f"{s}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("num", s, e)
-
-    for m in re.finditer(r'"[^"\n]*"|\'[^\'\n]*\'', text):
-        s = current_window.index(f"{region_start}+{m.start()}c")
-        e = current_window.index(f"{region_start}+{m.end()}c")
-        current_window.tag_add("str", s, e)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        s = current_window.index(f"{region_start}+{m.start(1)}c")
-        e = current_window.index(f"{region_start}+{m.end(1)}c")
-        current_window.tag_add("call", s, e)
-
-    current_window.tag_config("kw", foreground="#1fc7f5")
-    current_window.tag_config("var", foreground="#ecb696")
-    current_window.tag_config("eq", foreground="white")
-    current_window.tag_config("num", foreground="#15d2bb")
-    current_window.tag_config("str", foreground="#9ddba0")
-    current_window.tag_config("call", foreground="gold")
+    tk_highlight.highlight_visible(
+        current_window,
+        highlight_language,
+        {
+            "kw": "#1fc7f5",
+            "var": "#ecb696",
+            "eq": "white",
+            "num": "#15d2bb",
+            "str": "#9ddba0",
+            "call": "gold",
+        },
+    )
 
 
 def highlight_detect(event=None):
@@ -1250,6 +1081,9 @@ def read_only():
         pass
 
 
+log_table_limit = 10000
+
+
 def prime_logarithms():
     current_window = root.focus_get()
 
@@ -1265,37 +1099,29 @@ def prime_logarithms():
         if start > end:
             start, end = end, start
 
-        def is_prime(n):
-            if n < 2:
-                return False
-            if n == 2:
-                return True
-            if n % 2 == 0:
-                return False
-            i = 3
-            while i * i <= n:
-                if n % i == 0:
-                    return False
-                i += 2
-            return True
+        stats = prime_sieve.parallel_stats(start, end)
+        theta = stats["theta"]
 
         output = []
         output.append("=== Prime Logarithms ===")
         output.append("")
         output.append(f"Range: ({start}, {end})")
         output.append("")
-        output.append(f"{'Prime':>8} {'ln(p)':>12}")
 
-        theta = 0.0
+        # a per-prime table past this size only freezes the Text widget
+        if stats["count"] <= log_table_limit:
+            output.append(f"{'Prime':>8} {'ln(p)':>12}")
 
-        for p in range(start, end + 1):
-            if is_prime(p):
-                lp = math.log(p)
-                theta += lp
-                output.append(f"{p:>8} {lp:>12.6f}")
+            for p in prime_bitset.primes_between(start, end):
+                output.append(f"{p:>8} {math.log(p):>12.6f}")
+        else:
+            output.append(f"({stats['count']} primes, table skipped)")
 
         output.append("")
         output.append("=== Chebyshev Theta ===")
+        output.append(f"Primes: {stats['count']}")
+        output.append(f"Max Gap: {stats['max_gap']}")
+        output.append(f"Twin Primes: {stats['twin']}")
         output.append(f"θ = {theta:.6f}")
         output.append(f"End - θ = {end - theta:.6f}")
 
@@ -1306,6 +1132,49 @@ def prime_logarithms():
         print(e)
 
 
+def mobius_mertens():
+    current_window = root.focus_get()
+
+    try:
+        text = current_window.get("insert linestart", "insert lineend").strip()
+
+        if "," in text:
+            start, end = map(int, text.split(",", 1))
+        else:
+            start = 1
+            end = int(text)
+
+        if start > end:
+            start, end = end, start
+
+        prime_stream.stream_text(
+            root,
+            result_window,
+            lambda cancel: arith_sieve.arith_chunks(start, end, cancel),
+            label="μ/φ",
+        )
+
+    except Exception as e:
+        print(e)
+
+
+def chebyshev_psi():
+    current_window = root.focus_get()
+
+    try:
+        end = int(current_window.get("insert linestart", "insert lineend").strip())
+
+        prime_stream.stream_text(
+            root,
+            result_window,
+            lambda cancel: arith_sieve.psi_chunks(end, cancel),
+            label="ψ",
+        )
+
+    except Exception as e:
+        print(e)
+
+
 def list_primes():
     current_window = root.focus_get()
 
@@ -1321,18 +1190,17 @@ def list_primes():
         if start > end:
             start, end = end, start
 
-        result = []
+        path = None
 
-        for n in range(max(2, start), end + 1):
-            prime = True
-            for i in range(2, int(n**0.5) + 1):
-                if n % i == 0:
-                    prime = False
-                    break
-            if prime:
-                result.append(str(n))
+        if prime_stream.estimate_count(start, end) > prime_stream.file_limit:
+            if messagebox.askyesno(
+                "List Primes", "That's a lot of primes. Write them to a file instead?"
+            ):
+                path = filedialog.asksaveasfilename(defaultextension=".txt")
+                if not path:
+                    return
 
-        current_window.insert("insert", f"\nPrimes = {result}\n")
+        prime_stream.stream_primes(root, current_window, start, end, path)
 
     except Exception as e:
         print(e)
@@ -1350,24 +1218,11 @@ def check_if_prime():
 
         if n < 2:
             result = f"{n} = not prime"
-        elif n == 2:
-            result = "2 = prime"
-        elif n % 2 == 0:
-            result = f"{n} = not prime"
+        elif prime_factor.is_prime(n):
+            result = f"{n} = prime.\n"
         else:
-            i = 3
-            is_prime = True
-
-            while i * i <= n:
-                if n % i == 0:
-                    is_prime = False
-                    break
-                i += 2
-
-            if is_prime:
-                result = f"{n} = prime.\n"
-            else:
-                result = f"{n} = not prime.\n"
+            factors = prime_factor.format_factors(prime_factor.factorize(n))
+            result = f"{n} = not prime. {n} = {factors}\n"
 
         current_window.delete("insert linestart", "insert lineend")
         current_window.insert("insert linestart", result)
@@ -1542,10 +1397,16 @@ menu.add_cascade(label="Math", menu=math_menu)
 
 math_menu.add_command(label="List Primes", command=list_primes)
 
+math_menu.add_command(label="Stop Listing", command=prime_stream.stop_primes)
+
 math_menu.add_command(label="Analyze Primes", command=analyze)
 
 math_menu.add_command(label="Prime Logarithms", command=prime_logarithms)
 
+math_menu.add_command(label="Möbius & Euler φ", command=mobius_mertens)
+
+math_menu.add_command(label="Chebyshev ψ", command=chebyshev_psi)
+
 math_menu.add_command(label="Check if Prime", command=check_if_prime)
 
 
@@ -1583,6 +1444,8 @@ menu.add_cascade(label="Dev", menu=dev_menu)
 
 dev_menu.add_command(label="Run Python", command=run_python)
 
+dev_menu.add_command(label="Stop Python", command=python_worker.cancel)
+
 dev_menu.add_command(label="Flake8 Code", command=run_flake8)
 
 
@@ -1709,5 +1572,9 @@ result_window.bind("<Button-1>", goto_line_selected)
 
 editor.focus_set()
 
+python_worker.start()
+
+ui_queue.start(root)
+
 root.mainloop()
 
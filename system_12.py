@@ -1,9 +1,7 @@
 
 import tempfile
 import random
-import io
 import os
-import sys
 import subprocess
 import threading
 import webbrowser
@@ -21,7 +19,6 @@ from tkinter import (
     
 )
 
-import keyword
 import re
 
 from xml.etree import ElementTree
@@ -41,8 +38,15 @@ from deep_translator import GoogleTranslator
 
 from transliterate import translit
 
+import lint_service
+import output_sink
+import python_worker
+import syntax_tokens
+import tk_highlight
+import ui_queue
 
-c_keywords = ["auto","break","case","char","const","continue","default","do","double","else","enum","extern","float","for","goto","if","inline","int","long","register","restrict","return","short","signed","sizeof","static","struct","switch","typedef","union","unsigned","void","volatile","while"]
+
+highlight_language = syntax_tokens.combine("python", "c")
 
 unix_words = ["ls", "cat", "cp", "mv", "rm", "mkdir", "rmdir", "pwd", "cd", "echo", "touch", "clear", "whoami", "date", "cal", "grep", "find", "sort", "wc", "head", "tail", "less", "more", "gcc", "g++", "python", "python3", "flake8", "cpplint", "git", "make", "cmake", "ps", "top", "kill", "chmod", "chown"]
 
@@ -160,55 +164,20 @@ def auto_indent(event=None):
 
 
 def highlight_code(event=None):
-    editor.tag_remove("kw", "1.0", "end")
-    editor.tag_remove("var", "1.0", "end")
-    editor.tag_remove("eq", "1.0", "end")
-    editor.tag_remove("num", "1.0", "end")
-    editor.tag_remove("str", "1.0", "end")
-    editor.tag_remove("call", "1.0", "end")
-
-    text = editor.get("1.0", "end-1c")
-
-    for k in keyword.kwlist + c_keywords:
-        start = "1.0"
-        while True:
-            pos = editor.search(rf"\y{k}\y", start, stopindex="end", regexp=True)
-            if not pos:
-                break
-            end = f"{pos}+{len(k)}c"
-            editor.tag_add("kw", pos, end)
-            start = end
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\s*=", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        editor.tag_add("var", start, end)
-
-    for m in re.finditer(r"=", text):
-        p = f"1.0+{m.start()}c"
-        editor.tag_add("eq", p, f"{p}+1c")
-
-    for m in re.finditer(r"\b\d+(\.\d+)?\b", text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        editor.tag_add("num", start, end)
-
-    for m in re.finditer(r'".*?"|\'.*?\'', text):
-        start = f"1.0+{m.start()}c"
-        end = f"1.0+{m.end()}c"
-        editor.tag_add("str", start, end)
-
-    for m in re.finditer(r"\b([A-Za-z_]\w*)\(", text):
-        start = f"1.0+{m.start(1)}c"
-        end = f"1.0+{m.end(1)}c"
-        editor.tag_add("call", start, end)
-
-    editor.tag_config("kw", foreground="red")
-    editor.tag_config("var", foreground="#8B5A2B")
-    editor.tag_config("eq", foreground="#333333")
-    editor.tag_config("num", foreground="blue")
-    editor.tag_config("str", foreground="#E67300")
-    editor.tag_config("call", foreground="green")
+    tk_highlight.highlight_lines(
+        editor,
+        1,
+        None,
+        highlight_language,
+        {
+            "kw": "red",
+            "var": "#8B5A2B",
+            "eq": "#333333",
+            "num": "blue",
+            "str": "#E67300",
+            "call": "green",
+        },
+    )
 
 def goto_line_selected(event=None):
     try:
@@ -238,7 +207,7 @@ def goto_line_selected(event=None):
     except:
         pass
 
-def show_output(result):
+def show_output(result, diagnostics=None):
     output_window = tk.Toplevel(root)
     output_window.geometry("460x500+0+0")
     
@@ -280,7 +249,7 @@ def show_output(result):
     format_button = tk.Button(
         output_window,
         text="Format",
-        command=lambda: (root.geometry("460x300"), output_window.geometry("460x230+0+330"), format_flake8()),
+        command=lambda: (root.geometry("460x300"), output_window.geometry("460x230+0+330"), format_flake8(result_text, diagnostics)),
         font=("Courier New", 8),
         bd=5,
         width=2,
@@ -294,24 +263,15 @@ def show_output(result):
     	
     output_window.bind("<Button-1>", goto_line_selected)
 
+    return result_text
+
 
 def run_python():
     current_widget = root.focus_get()
     code = current_widget.get("1.0", tk.END)
 
-    output = io.StringIO()
-    sys.stdout = output
-
-    try:
-        exec(code)
-
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
-
-    finally:
-        sys.stdout = sys.__stdout__
-
-        show_output(output.getvalue())
+    # output streams into the window while the code runs
+    python_worker.run(root, show_output(""), code)
         
 
 
@@ -415,29 +375,8 @@ def unix_command():
     current_window = root.focus_get()
     command = current_window.get("insert linestart", "insert lineend").strip()
 
-    def run_command():
-        try:
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                text=True
-            )
-
-            for line in process.stdout:
-                current_window.insert("end", line)
-                current_window.see("end")
-
-            process.stdout.close()
-            process.wait()
-
-        except:
-            pass
-
-        current_window.see("end")
-
     current_window.see("insert")
-    threading.Thread(target=run_command).start()
+    output_sink.stream(root, current_window, command, shell=True)
 
 
 window_expanded = 0
@@ -856,19 +795,9 @@ def web_browser():
 
 
 
+# the "trail_ws" ranges are kept up to date by tk_highlight.watch, only
+# for the lines an edit touches, so showing them is just the colour
 def show_whitespaces(event=None):
-    editor.tag_remove("trail_ws", "1.0", "end")
-
-    text = editor.get("1.0", "end-1c")
-    lines = text.splitlines()
-
-    for i, line in enumerate(lines, start=1):
-        match = re.search(r"(?<=\S)[ \t]+$", line)
-        if match:
-            start = f"{i}.{match.start()}"
-            end = f"{i}.{match.end()}"
-            editor.tag_add("trail_ws", start, end)
-
     editor.tag_config("trail_ws", background="red")
 
 
@@ -876,13 +805,7 @@ def remove_whitespaces():
     w = root.focus_get()
 
     try:
-        text = w.get("1.0", "end-1c")
-        lines = text.splitlines()
-
-        cleaned = [line.rstrip(" \t") for line in lines]
-
-        w.delete("1.0", "end")
-        w.insert("1.0", "\n".join(cleaned))
+        tk_highlight.strip_trailing(w)
 
     except:
         pass
@@ -969,9 +892,10 @@ def mandarin_translator():
         pass
                      
 def compile_exe_c():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         try:
-            code = editor.get("1.0", "end-1c")
 
             f = tempfile.NamedTemporaryFile(
                 delete=False,
@@ -989,12 +913,12 @@ def compile_exe_c():
                 c = subprocess.run(["gcc", f.name, "-o", exe], capture_output=True, text=True)
 
                 if c.returncode != 0:
-                    show_output(c.stderr)
+                    ui_queue.post(show_output, c.stderr)
                     return
 
                 r = subprocess.run([exe], capture_output=True, text=True)
 
-                show_output(r.stdout + r.stderr)
+                ui_queue.post(show_output, r.stdout + r.stderr)
 
             finally:
                 if os.path.exists(f.name):
@@ -1004,7 +928,7 @@ def compile_exe_c():
                     os.unlink(exe)
 
         except Exception as e:
-            show_output(str(e))
+            ui_queue.post(show_output, str(e))
 
     threading.Thread(target=task, daemon=True).start()            
 
@@ -1151,16 +1075,25 @@ def remove_empty_lines():
 
 def format_python_code():
     current_widget = root.focus_get()
+    input_code = current_widget.get("1.0", "end-1c")
 
-    try:
-        input_code = current_widget.get("1.0", "end-1c")
-        reformatted_code = black.format_str(input_code, mode=black.FileMode())
+    def replace(reformatted_code):
+        # typed into while black ran: keep the typing, skip the format
+        if current_widget.get("1.0", "end-1c") != input_code:
+            return
 
         current_widget.delete("1.0", "end")
         current_widget.insert("1.0", reformatted_code)
 
-    except:
-        pass
+    def background_work():
+        try:
+            reformatted_code = black.format_str(input_code, mode=black.FileMode())
+        except:
+            return
+
+        ui_queue.post(replace, reformatted_code)
+
+    threading.Thread(target=background_work, daemon=True).start()
 
 
 def indent_all():
@@ -1174,54 +1107,39 @@ def indent_all():
 
 
 def run_flake8():
+    code = editor.get("1.0", "end-1c")
+
     def task():
         try:
-            code = editor.get("1.0", "end-1c")
-
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".py", mode="w", encoding="utf-8"
-            )
-            f.write(code)
-            f.close()
-
-            result = subprocess.run(["flake8", f.name], capture_output=True, text=True)
-
-
-            if result.stdout.strip():
-                show_output(result.stdout)
-                #root.after(100, format_flake8)
-            elif result.stderr.strip():
-                show_output(result.stderr)
-            else:
-                show_output("No issues found")
-
-            os.unlink(f.name)
-
+            diagnostics = lint_service.check(code)
         except:
-            pass
+            return
+
+        if diagnostics:
+            text = lint_service.flake8_lines(diagnostics)
+            ui_queue.post(show_output, text, diagnostics)
+        else:
+            ui_queue.post(show_output, "No issues found")
 
     threading.Thread(target=task, daemon=True).start()
 
 
-def format_flake8():
+# diagnostics come straight from lint_service when run_flake8 made the
+# output; flake8 output pasted into the window is parsed back
+def format_flake8(current_window=None, diagnostics=None):
     try:
-        current_window = root.focus_get()
-
-        text = current_window.get("1.0", "end")
+        if current_window is None:
+            current_window = root.focus_get()
 
-        lines = text.splitlines()
+        if diagnostics is None:
+            diagnostics = lint_service.parse_flake8(current_window.get("1.0", "end"))
 
         grouped = {}
 
-        for line in lines:
-            m = re.search(r"(.+?):(\d+):(\d+):\s+([A-Z]\d+)\s+(.*)", line)
+        for d in diagnostics:
+            line_number = d["line"]
 
-            if not m:
-                continue
-
-            line_number = int(m.group(2))
-
-            message = m.group(5).strip()
+            message = d["message"].strip()
 
             if message:
                 message = message[0].upper() + message[1:]
@@ -1378,6 +1296,8 @@ dev_menu.add_command(label="Unix Command >", command=unix_command)
 
 dev_menu.add_command(label="Python >", command=run_python)
 
+dev_menu.add_command(label="Stop Python", command=python_worker.cancel)
+
 dev_menu.add_command(label="Run Flake8", command=run_flake8)
 
 
@@ -1510,5 +1430,11 @@ editor.focus_set()
 
 editor.bind("<Return>", auto_indent)
 
+tk_highlight.watch(root, editor, None, trailing="trail_ws")
+
+python_worker.start()
+
+ui_queue.start(root)
+
 root.mainloop()
 
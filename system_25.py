@@ -1,23 +1,27 @@
-import io
-import os
-import sys
 import subprocess
 import threading
-import tempfile
 import math
 
 import tkinter as tk
 from tkinter import (
     filedialog,
     simpledialog,
-    colorchooser
+    colorchooser,
+    messagebox
 )
 
-from pygments import lex
-
-from pygments.lexers.python import PythonLexer
-
-from pygments.styles import get_style_by_name
+import arith_sieve
+import build_cache
+import output_sink
+import prime_analytic
+import prime_bitset
+import prime_count
+import prime_factor
+import prime_sieve
+import prime_stream
+import python_worker
+import tk_pygments
+import ui_queue
 
 
 
@@ -236,29 +240,42 @@ def unix_command():
     current_window = root.focus_get()
     command = current_window.get("insert linestart", "insert lineend").strip()
 
-    def run_command():
-        try:
-            process = subprocess.Popen(
-                command, shell=True, stdout=subprocess.PIPE, text=True
-            )
+    current_window.see("insert")
+    output_sink.stream(root, current_window, command, shell=True)
 
-            for line in process.stdout:
-                current_window.insert("end", line)
-                current_window.see("end")
 
-            process.stdout.close()
-            process.wait()
+def list_primes():
+    current_window = root.focus_get()
 
-        except:
-            pass
+    try:
+        text = current_window.get("insert linestart", "insert lineend").strip()
 
-        current_window.see("end")
+        if "," in text:
+            start, end = map(int, text.split(",", 1))
+        else:
+            start = 0
+            end = int(text)
 
-    current_window.see("insert")
-    threading.Thread(target=run_command).start()
+        if start > end:
+            start, end = end, start
 
+        path = None
 
-def list_primes():
+        if prime_stream.estimate_count(start, end) > prime_stream.file_limit:
+            if messagebox.askyesno(
+                "List Primes", "That's a lot of primes. Write them to a file instead?"
+            ):
+                path = filedialog.asksaveasfilename(defaultextension=".txt")
+                if not path:
+                    return
+
+        prime_stream.stream_primes(root, current_window, start, end, path)
+
+    except Exception as e:
+        print(e)
+
+
+def mobius_mertens():
     current_window = root.focus_get()
 
     try:
@@ -267,24 +284,35 @@ def list_primes():
         if "," in text:
             start, end = map(int, text.split(",", 1))
         else:
-            start = 0
+            start = 1
             end = int(text)
 
         if start > end:
             start, end = end, start
 
-        result = []
+        prime_stream.stream_text(
+            root,
+            result_window,
+            lambda cancel: arith_sieve.arith_chunks(start, end, cancel),
+            label="μ/φ",
+        )
 
-        for n in range(max(2, start), end + 1):
-            prime = True
-            for i in range(2, int(n**0.5) + 1):
-                if n % i == 0:
-                    prime = False
-                    break
-            if prime:
-                result.append(str(n))
+    except Exception as e:
+        print(e)
+
+
+def chebyshev_psi():
+    current_window = root.focus_get()
+
+    try:
+        end = int(current_window.get("insert linestart", "insert lineend").strip())
 
-        current_window.insert("insert", f"\nPrimes = {result}\n")
+        prime_stream.stream_text(
+            root,
+            result_window,
+            lambda cancel: arith_sieve.psi_chunks(end, cancel),
+            label="ψ",
+        )
 
     except Exception as e:
         print(e)
@@ -302,24 +330,11 @@ def check_if_prime():
 
         if n < 2:
             result = f"{n} = not prime"
-        elif n == 2:
-            result = "2 = prime"
-        elif n % 2 == 0:
-            result = f"{n} = not prime"
+        elif prime_factor.is_prime(n):
+            result = f"{n} = prime.\n"
         else:
-            i = 3
-            is_prime = True
-
-            while i * i <= n:
-                if n % i == 0:
-                    is_prime = False
-                    break
-                i += 2
-
-            if is_prime:
-                result = f"{n} = prime.\n"
-            else:
-                result = f"{n} = not prime.\n"
+            factors = prime_factor.format_factors(prime_factor.factorize(n))
+            result = f"{n} = not prime. {n} = {factors}\n"
 
         current_window.delete("insert linestart", "insert lineend")
         current_window.insert("insert linestart", result)
@@ -330,27 +345,11 @@ def check_if_prime():
 
 
 def is_prime(n):
-    if n < 2:
-        return False
-    i = 2
-    while i * i <= n:
-        if n % i == 0:
-            return False
-        i += 1
-    return True
+    return prime_factor.is_prime(n)
 
 
 def li_approx(x):
-    steps = 1000
-    total = 0.0
-    dx = max(x - 2.0, 0.0) / steps
-
-    for i in range(1, steps):
-        t = 2.0 + i * dx
-        if t > 1:
-            total += dx / math.log(t)
-
-    return total
+    return prime_analytic.offset_li(x)
 
 
 def clear_window():
@@ -373,57 +372,69 @@ def analyze_number():
     except:
         end = 10000
 
-    primes = 0
-    last = 0
-
-    gap_sum = 0.0
-    gap_count = 0
-    twin = 0
-    max_gap = 0
-
-    for n in range(1, end + 1):
-        if is_prime(n):
-            primes += 1
-
-            if last:
-                gap = n - last
-                gap_sum += gap
-                gap_count += 1
-                if gap > max_gap:
-                    max_gap = gap
-                if gap == 2:
-                    twin += 1
-
-            last = n
-
-    rng = end
+    def show(stats):
+        primes = stats["count"]
+        gap_sum = stats["gap_sum"]
+        gap_count = stats["gap_count"]
+        twin = stats["twin"]
+        max_gap = stats["max_gap"]
+
+        rng = end
+
+        density = primes / rng
+        expected = end / math.log(end)
+        error = primes - expected
+        rel = abs(error) / expected
+
+        avg_gap = gap_sum / gap_count if gap_count else 0
+        li = li_approx(end)
+        li_error = primes - li
+
+        r = prime_analytic.riemann_r(end)
+        r_error = primes - r
+
+        norm_err = error / math.sqrt(end)
+
+        result_window.insert(tk.END, "=== Prime Interval Summary ===\n\n")
+        result_window.insert(tk.END, f"Range: (1, {end})\n")
+        result_window.insert(tk.END, f"Primes: {primes}\n")
+        result_window.insert(tk.END, f"Expected π(x): {expected:.2f}\n")
+        result_window.insert(tk.END, f"Error: {error:.2f}\n")
+        result_window.insert(tk.END, f"Relative Error: {rel:.6f}\n")
+        result_window.insert(tk.END, f"Density: {density:.6f}\n")
+        result_window.insert(tk.END, f"Average Gap: {avg_gap:.3f}\n")
+
+        if max_gap is None:
+            result_window.insert(tk.END, "Max Gap: n/a (counted, not sieved)\n")
+            result_window.insert(tk.END, "Twin Primes: n/a (counted, not sieved)\n\n")
+        else:
+            result_window.insert(tk.END, f"Max Gap: {max_gap}\n")
+            result_window.insert(tk.END, f"Twin Primes: {twin}\n\n")
 
-    density = primes / rng
-    expected = end / math.log(end)
-    error = primes - expected
-    rel = abs(error) / expected
+            result_window.insert(tk.END, "=== Gap Statistics ===\n\n")
+            gaps = prime_sieve.format_gaps(stats["gaps"])
+            result_window.insert(tk.END, gaps + "\n\n")
 
-    avg_gap = gap_sum / gap_count if gap_count else 0
-    li = li_approx(end)
-    li_error = primes - li
+        result_window.insert(tk.END, "=== Analytic Layer ===\n\n")
+        result_window.insert(tk.END, f"Li(x): {li!r}\n")
+        result_window.insert(tk.END, f"Li Error: {li_error!r}\n")
+        result_window.insert(tk.END, f"R(x): {r!r}\n")
+        result_window.insert(tk.END, f"R Error: {r_error!r}\n")
+        result_window.insert(tk.END, f"Normalized Error: {norm_err:.6f}\n")
 
-    norm_err = error / math.sqrt(end)
+    def task():
+        # π(x) alone is counted (sublinear), gap statistics need every
+        # prime and are only sieved up to sieve_limit
+        if end <= prime_count.sieve_limit:
+            stats = prime_sieve.prime_stats(
+                end, segments=prime_bitset.odd_segments, gaps=True
+            )
+        else:
+            stats = prime_count.count_stats(end)
 
-    result_window.insert(tk.END, "=== Prime Interval Summary ===\n\n")
-    result_window.insert(tk.END, f"Range: (1, {end})\n")
-    result_window.insert(tk.END, f"Primes: {primes}\n")
-    result_window.insert(tk.END, f"Expected π(x): {expected:.2f}\n")
-    result_window.insert(tk.END, f"Error: {error:.2f}\n")
-    result_window.insert(tk.END, f"Relative Error: {rel:.6f}\n")
-    result_window.insert(tk.END, f"Density: {density:.6f}\n")
-    result_window.insert(tk.END, f"Average Gap: {avg_gap:.3f}\n")
-    result_window.insert(tk.END, f"Max Gap: {max_gap}\n")
-    result_window.insert(tk.END, f"Twin Primes: {twin}\n\n")
+        ui_queue.post(show, stats)
 
-    result_window.insert(tk.END, "=== Analytic Layer ===\n\n")
-    result_window.insert(tk.END, f"Li(x): {li:.2f}\n")
-    result_window.insert(tk.END, f"Li Error: {li_error:.2f}\n")
-    result_window.insert(tk.END, f"Normalized Error: {norm_err:.6f}\n")
+    threading.Thread(target=task, daemon=True).start()
 
 
 def undo_last():
@@ -559,92 +570,12 @@ def save_last_opened():
 
 
 def apply_syntax_single(event=None):
-
-    style = get_style_by_name(pygment_theme)
-
-    line = editor.index(tk.INSERT).split(".")[0]
-
-    start = f"{line}.0"
-    end = f"{line}.end"
-
-    editor.tag_remove("syntax", start, end)
-
-    text = editor.get(start, end)
-
-    position = start
-
-    for token, value in lex(text, PythonLexer()):
-        next_position = f"{position}+{len(value)}c"
-
-        color = None
-
-        token_name = str(token)
-
-        for key, style_value in style.styles.items():
-            if str(key) == token_name:
-                if style_value:
-                    for item in style_value.split():
-                        if item.startswith("#"):
-                            color = item
-                            break
-
-        if color:
-            editor.tag_configure(token_name, foreground=color)
-            editor.tag_add(token_name, position, next_position)
-
-        position = next_position
+    tk_pygments.highlight_changes(editor, pygment_theme)
 
 
 
 def apply_syntax_all(event=None):
-
-    code = editor.get("1.0", tk.END)
-
-    editor.tag_remove("all", "1.0", tk.END)
-
-    style = get_style_by_name(pygment_theme)
-
-    for token, value in lex(code, PythonLexer()):
-        tag = str(token)
-
-        color = None
-
-        for key, style_value in style.styles.items():
-            if str(key) == tag:
-                if style_value:
-                    parts = style_value.split()
-                    for part in parts:
-                        if part.startswith("#"):
-                            color = part
-                            break
-
-        if color:
-            start = editor.index(tk.INSERT)
-            editor.tag_configure(tag, foreground=color)
-
-    position = "1.0"
-
-    for token, value in lex(code, PythonLexer()):
-        end = f"{position}+{len(value)}c"
-
-        tag = str(token)
-
-        color = None
-
-        for key, style_value in style.styles.items():
-            if str(key) == tag:
-                if style_value:
-                    parts = style_value.split()
-                    for part in parts:
-                        if part.startswith("#"):
-                            color = part
-                            break
-
-        if color:
-            editor.tag_configure(tag, foreground=color)
-            editor.tag_add(tag, position, end)
-
-        position = end
+    tk_pygments.highlight_all(editor, pygment_theme)
 
 
 
@@ -652,54 +583,33 @@ def apply_syntax_all(event=None):
 
 def run_c():
     current_window = root.focus_get()
+    code = current_window.get(1.0, "end")
 
-    def task():
-        try:
-            code = current_window.get(1.0, "end")
-            f = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".c", mode="w", encoding="utf-8"
-            )
-
-            f.write(code)
-            f.close()
-
-            exe = f.name + ".out"
-
-            try:
-                c = subprocess.run(
-                    ["gcc", f.name, "-o", exe], capture_output=True, text=True
-                )
-
-                if c.returncode != 0:
-                    if current_window == editor:
-                        result_window.delete(1.0, "end")
-                        result_window.insert(1.0, c.stderr)
-                        return
-                    else:
-                        editor.delete(1.0, "end")
-                        editor.insert(1.0, c.stderr)
-                        return
-
-                r = subprocess.run([exe], capture_output=True, text=True)
-
-                result_window.delete(1.0, "end")
-                result_window.insert(1.0, r.stdout + r.stderr)
+    def show_errors(errors):
+        if current_window == editor:
+            result_window.delete(1.0, "end")
+            result_window.insert(1.0, errors)
+        else:
+            editor.delete(1.0, "end")
+            editor.insert(1.0, errors)
 
-            finally:
-                if os.path.exists(f.name):
-                    os.unlink(f.name)
+    def run(exe):
+        result_window.delete(1.0, "end")
+        output_sink.stream(root, result_window, [exe])
 
-                if os.path.exists(exe):
-                    os.unlink(exe)
+    def task():
+        try:
+            # unchanged code reuses the binary built last time
+            exe, errors = build_cache.build(code, "c")
 
         except Exception as e:
+            ui_queue.post(show_errors, str(e))
+            return
 
-            if current_window == editor:
-                result_window.delete(1.0, "end")
-                result_window.insert(1.0, e)
-            else:
-                editor.delete(1.0, "end")
-                editor.insert(1.0, e)
+        if exe is None:
+            ui_queue.post(show_errors, errors)
+        else:
+            ui_queue.post(run, exe)
 
     threading.Thread(target=task, daemon=True).start()
 
@@ -708,25 +618,10 @@ def run_python():
     current_window = root.focus_get()
     code = current_window.get("1.0", tk.END)
 
-    output = io.StringIO()
-    old_stdout = sys.stdout
-    sys.stdout = output
+    output = result_window if current_window == editor else editor
+    output.delete(1.0, "end")
 
-    try:
-        exec(code)
-
-    except Exception as e:
-        output.write(f"{type(e).__name__}: {e}")
-
-    finally:
-        sys.stdout = old_stdout
-
-        if current_window == editor:
-            result_window.delete(1.0, "end")
-            result_window.insert(1.0, output.getvalue())
-        else:
-            editor.delete(1.0, "end")
-            editor.insert(1.0, output.getvalue())
+    python_worker.run(root, output, code)
 
 pygment_theme = "one-dark"
 
@@ -815,6 +710,8 @@ file_menu.add_command(label="View File", command=open_file_from_cursor)
 
 file_menu.add_command(label="Highlight Python Code", command=apply_syntax_all)
 
+file_menu.add_command(label="Stop Python", command=python_worker.cancel)
+
 edit_menu = tk.Menu(
     menu,
     tearoff=0,
@@ -848,9 +745,15 @@ extra_menu.add_command(label="Analize Number", command=analyze_number)
 
 extra_menu.add_command(label="List Primes a, b", command=list_primes)
 
+extra_menu.add_command(label="Stop Listing", command=prime_stream.stop_primes)
+
 
 extra_menu.add_command(label="Check if Prime", command=check_if_prime)
 
+extra_menu.add_command(label="Möbius & Euler φ", command=mobius_mertens)
+
+extra_menu.add_command(label="Chebyshev ψ", command=chebyshev_psi)
+
 extra_menu.add_command(label="Chinese", command=mandarin_translator)
 
 
@@ -960,4 +863,8 @@ editor.bind("<Return>", auto_indent)
 
 editor.focus_set()
 
+python_worker.start()
+
+ui_queue.start(root)
+
 root.mainloop()
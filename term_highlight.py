@@ -0,0 +1,99 @@
+import syntax_tokens
+
+
+RESET = "\033[0m"
+
+# span kind -> prompt_toolkit class; pygments' own names, so the
+# style_from_pygments_cls themes colour these fragments too
+prompt_classes = {
+    "kw": "class:pygments.keyword",
+    "var": "class:pygments.name.variable",
+    "eq": "class:pygments.operator",
+    "num": "class:pygments.literal.number",
+    "str": "class:pygments.literal.string",
+    "call": "class:pygments.name.function",
+    "comment": "class:pygments.comment",
+    "pre": "class:pygments.comment.preproc",
+}
+
+
+# line with its spans wrapped in ANSI colours. colors maps span kind to
+# an escape sequence; keyword_colors, if given, colours single keywords.
+def ansi_line(line, spans, colors, keyword_colors=None):
+    out = []
+    pos = 0
+
+    for tag, s, e in spans:
+        word = line[s:e]
+
+        color = None
+        if tag == "kw" and keyword_colors:
+            color = keyword_colors.get(word)
+        if color is None:
+            color = colors.get(tag)
+        if color is None:
+            continue
+
+        out.append(line[pos:s])
+        out.append(f"{color}{word}{RESET}")
+        pos = e
+
+    out.append(line[pos:])
+    return "".join(out)
+
+
+# Every line of text coloured, the lexer state carried from line to line
+def ansi_lines(lines, language, colors, keyword_colors=None):
+    state = None
+
+    for line in lines:
+        spans, state = syntax_tokens.tokenize_line(line, state, language)
+        yield ansi_line(line, spans, colors, keyword_colors)
+
+
+def fragments(line, spans, classes=prompt_classes):
+    out = []
+    pos = 0
+
+    for tag, s, e in spans:
+        if s > pos:
+            out.append(("", line[pos:s]))
+        out.append((classes.get(tag, ""), line[s:e]))
+        pos = e
+
+    if pos < len(line):
+        out.append(("", line[pos:]))
+
+    return out
+
+
+# A prompt_toolkit Lexer for a language pack. prompt_toolkit is only
+# imported when one is asked for, so the Tk front ends don't need it.
+def prompt_lexer(language):
+    from prompt_toolkit.lexers import Lexer
+
+    class SpanLexer(Lexer):
+        def lex_document(self, document):
+            lines = document.lines
+            done = []
+            states = [None]
+
+            # lines are asked for roughly in order; the state of line i
+            # needs every line above it, so they are tokenized once, in order
+            def get_line(i):
+                if i >= len(lines):
+                    return []
+
+                while len(done) <= i:
+                    k = len(done)
+                    spans, state = syntax_tokens.tokenize_line(
+                        lines[k], states[k], language
+                    )
+                    done.append(fragments(lines[k], spans))
+                    states.append(state)
+
+                return done[i]
+
+            return get_line
+
+    return SpanLexer()
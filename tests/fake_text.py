@@ -0,0 +1,224 @@
+# Just enough of a Tk Text widget, and of the root window's after(), to
+# run the highlighters without a display. Tags are kept as sets of
+# (row, column) character positions; column len(line) is the newline.
+# insert() and delete() go through the widget's Tcl command in tk, like
+# tkinter's, so a command put in front of it sees them.
+
+import bisect
+
+
+class FakeTk:
+    def __init__(self):
+        self.commands = {}
+
+    def call(self, *args):
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+
+        if args[0] == "rename":
+            self.commands[args[2]] = self.commands.pop(args[1])
+            return ""
+
+        return self.commands[args[0]](*args[1:])
+
+    def createcommand(self, name, func):
+        self.commands[name] = func
+
+    def deletecommand(self, name):
+        del self.commands[name]
+
+
+class FakeText:
+    def __init__(self, text="", name=".text"):
+        self.lines = text.split("\n")
+        self.tags = {}
+        self.colors = {}
+        self.binds = {}
+        self.name = name
+        self.view = (0.0, 1.0)
+        self.yscrollcommand = ""
+        self.modified = False
+        self.read = 0
+        self.cursor = (0, 0)
+        self.tk = FakeTk()
+        self.tk.createcommand(name, self._command)
+
+    def __str__(self):
+        return self.name
+
+    def _index(self, index):
+        if index == "insert":
+            return self.cursor
+        if index == "end":
+            return len(self.lines) - 1, len(self.lines[-1]) + 1
+        if index == "end-1c":
+            return len(self.lines) - 1, len(self.lines[-1])
+
+        row, col = index.split(".")
+        row = int(row) - 1
+        if row >= len(self.lines):
+            return self._index("end")
+
+        line = self.lines[row]
+        return row, len(line) if col == "end" else min(int(col), len(line))
+
+    def _chars(self, start, end):
+        r1, c1 = self._index(start)
+        r2, c2 = self._index(end)
+
+        for r in range(r1, r2 + 1):
+            stop = c2 if r == r2 else len(self.lines[r]) + 1
+            for c in range(c1 if r == r1 else 0, stop):
+                yield r, c
+
+    def index(self, index):
+        row, col = self._index(index)
+        return f"{row + 1}.{col}"
+
+    def get(self, start, end):
+        text = "\n".join(self.lines) + "\n"
+        offsets = [0]
+        for line in self.lines:
+            offsets.append(offsets[-1] + len(line) + 1)
+
+        (r1, c1), (r2, c2) = self._index(start), self._index(end)
+        self.read += offsets[r2] + c2 - offsets[r1] - c1
+        return text[offsets[r1] + c1 : offsets[r2] + c2]
+
+    def insert(self, index, chars):
+        self.tk.call(self.name, "insert", index, chars)
+
+    def delete(self, start, end=None):
+        self.tk.call(self.name, "delete", start, *([end] if end else []))
+
+    def _command(self, op, *args):
+        if op == "index":
+            return self.index(args[0])
+        if op == "mark":
+            if args[:2] == ("set", "insert"):
+                self.cursor = self._index(args[2])
+            return ""
+        if op == "insert":
+            start = self._offset(args[0])
+            self._edit(start, start, args[1])
+        elif op == "delete":
+            start = self._offset(args[0])
+            end = self._offset(args[1]) if len(args) > 1 else start + 1
+            self._edit(start, max(start, end), "")
+        self.modified = True
+        return ""
+
+    def mark_set(self, name, index):
+        self.tk.call(self.name, "mark", "set", name, index)
+
+    def _offset(self, index):
+        row, col = self._index(index)
+        starts = self._starts()
+        return min(starts[row] + col, starts[-1] + len(self.lines[-1]))
+
+    # Replaces characters start..end-1 of the text with chars. As in Tk,
+    # tags and the insert mark after the change move with their text, the
+    # mark ends up after text inserted right at it and new characters get
+    # the tags found on both sides of them.
+    def _edit(self, start, end, chars):
+        shift = len(chars) - (end - start)
+
+        def moved(o):
+            return o + shift if o >= end else min(o, start)
+
+        starts = self._starts()
+        tags = {}
+
+        for tag, positions in self.tags.items():
+            offsets = {starts[r] + c for r, c in positions}
+            tags[tag] = {moved(o) for o in offsets if not start <= o < end}
+            if chars and start - 1 in offsets and end in offsets:
+                tags[tag].update(range(start, start + len(chars)))
+
+        cursor = moved(starts[self.cursor[0]] + self.cursor[1])
+
+        text = "\n".join(self.lines)
+        self.lines = (text[:start] + chars + text[end:]).split("\n")
+
+        starts = self._starts()
+
+        def position(o):
+            row = bisect.bisect_right(starts, o) - 1
+            return row, o - starts[row]
+
+        self.tags = {tag: set(map(position, offsets)) for tag, offsets in tags.items()}
+        self.cursor = position(cursor)
+
+    def _starts(self):
+        starts = [0]
+        for line in self.lines[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+        return starts
+
+    def tag_add(self, tag, *indexes):
+        chars = self.tags.setdefault(tag, set())
+        for i in range(0, len(indexes), 2):
+            chars.update(self._chars(indexes[i], indexes[i + 1]))
+
+    def tag_remove(self, tag, start, end):
+        self.tags.get(tag, set()).difference_update(self._chars(start, end))
+
+    def tag_config(self, tag, **options):
+        self.colors[tag] = options
+
+    tag_configure = tag_config
+
+    def edit_modified(self, flag=None):
+        if flag is None:
+            return self.modified
+        self.modified = bool(flag)
+
+    def bind(self, event, func, add=None):
+        self.binds[event] = func
+
+    def yview(self):
+        return self.view
+
+    def cget(self, option):
+        return getattr(self, option)
+
+    def config(self, **options):
+        for option, value in options.items():
+            setattr(self, option, value)
+
+    def after(self, ms, func):
+        func()
+
+    # Replaces lines i..j-1 (0-based) with new. Tags on the replaced lines
+    # go, the ones below move with their text, as in Tk.
+    def replace_lines(self, i, j, new):
+        shift = len(new) - (j - i)
+
+        for tag, chars in self.tags.items():
+            self.tags[tag] = {
+                (r if r < i else r + shift, c) for r, c in chars if not i <= r < j
+            }
+
+        self.lines[i:j] = new
+        if not self.lines:
+            self.lines = [""]
+
+    def tagged(self, tags=None):
+        return {
+            tag: chars
+            for tag, chars in self.tags.items()
+            if chars and (tags is None or tag in tags)
+        }
+
+
+class FakeRoot:
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, func):
+        self.calls.append(func)
+        return len(self.calls)
+
+    def run(self):
+        while self.calls:
+            self.calls.pop(0)()
@@ -0,0 +1,72 @@
+import math
+import threading
+
+import arith_sieve
+
+
+def psi_text(x):
+    return "".join(text for _, text in arith_sieve.psi_chunks(x, threading.Event()))
+
+
+def test_psi():
+    # ψ(10) = log lcm(1..10) = log 2520
+    assert math.isclose(arith_sieve.chebyshev_psi(10), math.log(2520))
+    assert f"ψ(10) = {math.log(2520):.6f}" in psi_text(10)
+
+
+def test_psi_below_two():
+    for x in (-5, 0, 1):
+        assert f"ψ({x}) = 0" in psi_text(x)
+
+
+def mu_phi(n):
+    mu, phi, m, p = 1, n, n, 2
+    while p * p <= m:
+        if m % p == 0:
+            m //= p
+            mu = 0 if m % p == 0 else -mu
+            while m % p == 0:
+                m //= p
+            phi -= phi // p
+        p += 1
+    if m > 1:
+        mu = -mu
+        phi -= phi // m
+    return mu, phi
+
+
+def test_segments(monkeypatch):
+    monkeypatch.setattr(arith_sieve, "segment_size", 97)
+
+    for start, end in ((1, 1), (0, 500), (300, 2000), (9973, 10100)):
+        found = [
+            (low + i, int(m), int(f))
+            for low, mu, phi in arith_sieve.arith_segments(start, end)
+            for i, (m, f) in enumerate(zip(mu, phi))
+        ]
+        assert found == [(n, *mu_phi(n)) for n in range(max(start, 1), end + 1)]
+
+
+def test_mertens(monkeypatch):
+    # M(10^k) for k = 0..9
+    assert [arith_sieve.mertens(10**k) for k in range(10)] == [
+        1, -1, 1, 2, -23, -48, 212, 1037, 1928, -222
+    ]
+
+    # a tiny prefix table so almost everything goes through the recursion
+    monkeypatch.setattr(arith_sieve, "mertens_table", 50)
+    m = 0
+    for n in range(1, 5001):
+        m += mu_phi(n)[0]
+        if n < 300 or n % 97 == 0:
+            assert arith_sieve.mertens(n) == m, n
+
+
+def test_table_starts_from_the_right_mertens_value():
+    chunks = arith_sieve.arith_chunks(1000, 1003, threading.Event())
+    text = "".join(text for _, text in chunks)
+
+    # M(999) = 2, mu(1000) = 0, mu(1001) = -1, mu(1002) = -1, mu(1003) = 1
+    assert "      1000     0        2        400" in text
+    assert "      1003     1        1        928" in text
+    assert "M(1003) = 1" in text
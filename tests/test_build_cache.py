@@ -0,0 +1,62 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import build_cache
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+
+hello = '#include <stdio.h>\nint main(void) { puts("hi"); return 0; }\n'
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(build_cache, "cache_dir", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_build_and_reuse(cache_dir):
+    exe, errors = build_cache.build(hello)
+
+    assert errors is None
+    assert subprocess.run([exe], capture_output=True, text=True).stdout == "hi\n"
+
+    os.utime(exe, (0, 0))
+    assert build_cache.build(hello) == (exe, None)
+    # a hit counts as a use
+    assert os.stat(exe).st_mtime > 0
+
+
+def test_key_covers_source_and_flags():
+    exe, _ = build_cache.build(hello)
+
+    assert build_cache.build(hello, flags=("-O2",))[0] != exe
+    assert build_cache.build(hello.replace("hi", "ho"))[0] != exe
+
+
+def test_errors():
+    exe, errors = build_cache.build("int main(void) { return x; }\n")
+
+    assert exe is None
+    assert "x" in errors
+    assert os.listdir(build_cache.cache_dir) == []
+
+
+def test_eviction(monkeypatch, cache_dir):
+    first, _ = build_cache.build(hello)
+    os.utime(first, (1, 1))
+    monkeypatch.setattr(build_cache, "max_bytes", os.stat(first).st_size + 1)
+
+    second, _ = build_cache.build(hello.replace("hi", "ho"))
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_clear(cache_dir):
+    build_cache.build(hello)
+    build_cache.clear()
+
+    assert not cache_dir.exists()
@@ -0,0 +1,137 @@
+import ast
+import glob
+import os
+import random
+
+import pytest
+
+pycodestyle = pytest.importorskip("pycodestyle")
+pytest.importorskip("pyflakes")
+
+import lint_service
+from pyflakes import checker
+
+here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# (line, col, code) pycodestyle reports for the whole text in one run
+def whole_style(code):
+    style = pycodestyle.StyleGuide(quiet=True, max_line_length=79)
+    found = set()
+
+    class Report(pycodestyle.BaseReport):
+        def error(self, line_number, offset, text, check):
+            if super().error(line_number, offset, text, check):
+                found.add((line_number, offset + 1, text[:4]))
+
+    pycodestyle.Checker(
+        lines=code.splitlines(keepends=True),
+        options=style.options,
+        report=Report(style.options),
+    ).check_all()
+
+    return found
+
+
+def style_part(code):
+    return {
+        (d["line"], d["col"], d["code"])
+        for d in lint_service.check(code)
+        if not d["code"].startswith(("F", "E999"))
+    }
+
+
+def flakes_part(code):
+    return sorted(
+        (d["line"], d["message"]) for d in lint_service.check(code) if d["code"][0] == "F"
+    )
+
+
+def test_example():
+    code = "import os\nx=1\ndef f():\n  return y\n"
+
+    assert lint_service.flake8_lines(lint_service.check(code)) == (
+        "stdin:1:1: F401 'os' imported but unused\n"
+        "stdin:2:2: E225 missing whitespace around operator\n"
+        "stdin:3:1: E302 expected 2 blank lines, found 0\n"
+        "stdin:4:3: E111 indentation is not a multiple of 4\n"
+        "stdin:4:10: F821 undefined name 'y'\n"
+    )
+
+
+def test_file_wide_state_crosses_blocks():
+    # E402 needs the code seen before, E101 the first indent of the file
+    code = (
+        "import os\n\nx = os.sep\n\n\ndef f():\n    return 1\n\n\n"
+        "import sys\n\n\ndef g():\n\treturn sys\n"
+    )
+
+    assert style_part(code) == whole_style(code)
+    assert {c for _, _, c in style_part(code)} >= {"E402", "E101"}
+
+
+# some of the IDEs have invalid escapes in string literals
+@pytest.mark.filterwarnings("ignore::DeprecationWarning", "ignore::SyntaxWarning")
+def test_repository_files():
+    for path in sorted(glob.glob(os.path.join(here, "*.py"))):
+        with open(path, encoding="utf-8") as f:
+            code = f.read()
+
+        assert style_part(code) == whole_style(code), path
+
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            continue
+
+        messages = checker.Checker(tree, "stdin").messages
+        assert flakes_part(code) == sorted(
+            (m.lineno, m.message % m.message_args) for m in messages
+        ), path
+
+
+def test_edits_match_a_whole_file_check():
+    pool = [
+        "import os\n",
+        "x=1\n",
+        "def f(a):\n    return a\n",
+        "def g():\n\treturn 2\n",
+        "class C:\n  pass\n",
+        "\n",
+        "# comment\n",
+        '"""doc"""\n',
+        "y = [\n    1,\n  2]\n",
+        "if x:\n    import sys\n",
+    ]
+    rng = random.Random(4)
+    blocks = [rng.choice(pool) for _ in range(20)]
+
+    for _ in range(200):
+        i = rng.randrange(len(blocks))
+        if rng.random() < 0.5:
+            blocks[i] = rng.choice(pool)
+        else:
+            blocks.insert(i, rng.choice(pool))
+
+        code = "".join(blocks)
+        assert style_part(code) == whole_style(code), code
+
+
+def test_cache_is_used():
+    code = "".join(f"def f{i}():\n    return {i}\n\n\n" for i in range(50))
+    lint_service.cache_clear()
+    lint_service.check(code)
+    misses = lint_service._style.cache_info().misses
+
+    lint_service.check(code.replace("return 25", "return  25"))
+
+    assert lint_service._style.cache_info().misses - misses <= 3
+
+
+def test_parse_flake8():
+    text = "x.py:3:5: E225 missing whitespace\nnoise\nx.py:10:1: F401 'os' unused\n"
+
+    assert lint_service.parse_flake8(text) == [
+        {"file": "x.py", "line": 3, "col": 5, "code": "E225", "message": "missing whitespace"},
+        {"file": "x.py", "line": 10, "col": 1, "code": "F401", "message": "'os' unused"},
+    ]
@@ -0,0 +1,95 @@
+import sys
+import time
+
+import output_sink
+
+
+class Root:
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, func):
+        self.calls.append((time.monotonic() + ms / 1000, func))
+
+    def run(self, timeout=30):
+        end = time.monotonic() + timeout
+        while self.calls and time.monotonic() < end:
+            self.calls.sort(key=lambda call: call[0])
+            when, func = self.calls.pop(0)
+            time.sleep(max(0, when - time.monotonic()))
+            func()
+
+
+# a Text widget as far as the sink uses it: text, and marks that stay
+# put when text is inserted at the end
+class Widget:
+    def __init__(self, text=""):
+        self.text = text
+        self.marks = {}
+
+    def mark_set(self, mark, index):
+        assert index == "end-1c"
+        self.marks[mark] = len(self.text)
+
+    def mark_gravity(self, mark, gravity):
+        assert gravity == "left"
+
+    def mark_unset(self, mark):
+        del self.marks[mark]
+
+    def insert(self, index, text):
+        assert index == "end"
+        self.text += text
+
+    def delete(self, start, end):
+        count = int(end.split("+")[1].split()[0])
+        at = self.marks[start]
+        self.text = self.text[:at] + self.text[at + count :]
+
+    def see(self, index):
+        pass
+
+
+def run(args, widget, monkeypatch, **settings):
+    monkeypatch.setattr(output_sink, "poll_ms", 5)
+    for name, value in settings.items():
+        monkeypatch.setattr(output_sink, name, value)
+
+    root = Root()
+    codes = []
+    output_sink.stream(root, widget, args, on_done=codes.append)
+    root.run()
+    return codes
+
+
+def test_output_and_exit_code(monkeypatch):
+    widget = Widget("$ ")
+    code = "import sys; print('out'); sys.stdout.flush(); print('err', file=sys.stderr); sys.exit(3)"
+
+    assert run([sys.executable, "-c", code], widget, monkeypatch) == [3]
+    assert widget.text == "$ out\nerr\n"
+    assert not widget.marks
+
+
+def test_long_output_is_capped(monkeypatch):
+    widget = Widget("$ ")
+    code = "for i in range(200000): print(i)"
+
+    assert run([sys.executable, "-c", code], widget, monkeypatch, max_chars=5000) == [0]
+
+    # the text before the stream stays, the streamed part keeps the end
+    assert widget.text.startswith("$ ")
+    assert len(widget.text) - 2 <= 5000
+    assert widget.text.endswith("199998\n199999\n")
+
+
+def test_dropped_output_is_noted(monkeypatch):
+    widget = Widget()
+    code = "import sys; sys.stdout.write('x' * 2000000 + '\\nend\\n')"
+
+    # the widget is polled long after the child is done
+    run([sys.executable, "-c", code], widget, monkeypatch, max_chars=1000, poll_ms=300)
+
+    assert "characters skipped ...]" in widget.text
+    assert widget.text.endswith("x\nend\n")
+    assert len(widget.text) <= 1000
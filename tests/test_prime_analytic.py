@@ -0,0 +1,54 @@
+import math
+
+import prime_analytic
+
+# published values of li(10^k) and R(10^k)
+li_values = {
+    3: 177.6096579901520,
+    6: 78627.54915946218,
+    9: 50849234.95700184,
+    12: 37607950280.80463,
+    18: 24739954309690415.0,
+}
+
+r_values = {
+    3: 168.3594462811673,
+    6: 78527.39942912770,
+    9: 50847455.42772142,
+    12: 37607910542.22591,
+    18: 24739954284239494.0,
+}
+
+
+def test_li():
+    for k, expected in li_values.items():
+        assert math.isclose(prime_analytic.li(10**k), expected, rel_tol=1e-12), k
+
+    # li(1/2), li(2) and Soldner's constant, the root of li
+    assert math.isclose(prime_analytic.li(0.5), -0.3786710430610880, rel_tol=1e-12)
+    assert math.isclose(prime_analytic.li(2), prime_analytic.li_2, rel_tol=1e-14)
+    assert abs(prime_analytic.li(1.451369234883381)) < 1e-12
+    assert prime_analytic.li(1) == -math.inf
+    offset = prime_analytic.offset_li(10**6)
+    assert math.isclose(offset, 78626.50399568206, rel_tol=1e-12)
+
+
+def test_riemann_r():
+    for k, expected in r_values.items():
+        assert math.isclose(prime_analytic.riemann_r(10**k), expected, rel_tol=1e-12), k
+
+
+def test_zeta():
+    assert math.isclose(prime_analytic.zeta(2), math.pi**2 / 6, rel_tol=1e-15)
+    assert math.isclose(prime_analytic.zeta(3), 1.2020569031595943, rel_tol=1e-15)
+    assert math.isclose(prime_analytic.zeta(4), math.pi**4 / 90, rel_tol=1e-15)
+
+
+def test_many_match_the_scalar_versions():
+    xs = [2, 3.5, 10, 1000, 123456, 10**9]
+    li = prime_analytic.li_many(xs)
+    r = prime_analytic.riemann_r_many(xs)
+
+    for x, a, b in zip(xs, li, r):
+        assert math.isclose(a, prime_analytic.li(x), rel_tol=1e-12), x
+        assert math.isclose(b, prime_analytic.riemann_r(x), rel_tol=1e-12), x
@@ -0,0 +1,73 @@
+import pytest
+
+import prime_bitset
+import prime_sieve
+
+
+@pytest.fixture
+def bits(monkeypatch, tmp_path):
+    monkeypatch.setattr(prime_bitset, "bits_path", str(tmp_path / "bits"))
+    monkeypatch.setattr(prime_bitset, "min_limit", 1 << 10)
+    prime_bitset._close()
+    yield prime_bitset
+    if prime_bitset._builder is not None:
+        prime_bitset._builder.join()
+    prime_bitset._close()
+
+
+def sieved(start, end, size):
+    return [(low, bytes(seg)) for low, seg in prime_sieve.odd_segments(start, end, size)]
+
+
+def read(start, end, size):
+    return [(low, bytes(seg)) for low, seg in prime_bitset.odd_segments(start, end, size)]
+
+
+def test_segments_match_the_sieve(bits):
+    assert bits.ensure(5000, wait=True)
+
+    # starts and ends on every bit of a byte, segment edges inside bytes
+    for start in range(0, 40):
+        for end in (start, start + 1, 100, 4095, 5000):
+            for size in (3, 8, 1000):
+                assert read(start, end, size) == sieved(start, end, size), (start, end, size)
+
+
+def test_count_and_primes_between(bits):
+    assert bits.ensure(3000, wait=True)
+    primes = prime_sieve.small_primes(3000)
+
+    for start, end in ((0, 1), (1, 2), (2, 2), (3, 3000), (17, 1000), (990, 1010)):
+        expected = [p for p in primes if start <= p <= end]
+        assert list(bits.primes_between(start, end)) == expected
+        assert bits.count_between(start, end) == len(expected)
+
+    assert [n for n in range(3001) if bits.is_prime(n)] == primes
+
+
+def test_background_build_falls_back_to_the_sieve(bits):
+    # nothing on disk yet: the build runs elsewhere, answers come from the sieve
+    assert not bits.ensure(2000)
+    assert read(1, 2000, 100) == sieved(1, 2000, 100)
+    assert bits.count_between(1, 2000) == 303
+
+    bits._builder.join()
+    assert bits.ensure(2000)
+
+
+def test_growing_keeps_the_old_bits(bits):
+    assert bits.ensure(1000, wait=True)
+    small = bits._limit
+
+    assert bits.ensure(50000, wait=True)
+    assert bits._limit > small
+    assert read(1, 50000, 1 << 12) == sieved(1, 50000, 1 << 12)
+
+
+def test_swap_with_a_live_view(bits):
+    assert bits.ensure(1000, wait=True)
+    view = memoryview(bits._bits)
+
+    assert bits.ensure(20000, wait=True)
+    assert bits.count_between(1, 20000) == 2262
+    view.release()
@@ -0,0 +1,48 @@
+import pytest
+
+import prime_count
+import prime_sieve
+
+# π(10^k), k = 0..9
+pi_powers = [0, 4, 25, 168, 1229, 9592, 78498, 664579, 5761455, 50847534]
+
+
+def test_prime_pi_of_powers_of_ten():
+    for k, expected in enumerate(pi_powers):
+        assert prime_count.prime_pi(10**k) == expected, k
+
+
+def test_prime_pi_matches_the_sieve():
+    primes = prime_sieve.small_primes(20000)
+    counts = [0] * 20001
+    for p in primes:
+        counts[p] = 1
+    for n in range(1, 20001):
+        counts[n] += counts[n - 1]
+
+    for x in list(range(-2, 400)) + list(range(400, 20001, 37)):
+        assert prime_count.prime_pi(x) == counts[max(x, 0)], x
+
+
+def test_lucy_with_and_without_numpy():
+    np = pytest.importorskip("numpy")
+
+    for x in (2, 3, 10, 99, 1000, 12345, 10**6 + 3):
+        assert prime_count._lucy_numpy(x, np) == prime_count._lucy(x), x
+
+
+def test_count_stats_matches_prime_stats():
+    for start, end in ((1, 1), (1, 2), (1, 100), (10, 100), (24, 28), (1000, 50000)):
+        counted = prime_count.count_stats(end, start)
+        sieved = prime_sieve.prime_stats(end, start)
+
+        for key in ("count", "first", "last", "gap_sum", "gap_count"):
+            assert counted[key] == sieved[key], (start, end, key)
+        assert counted["max_gap"] is None and counted["twin"] is None
+
+
+def test_last_prime():
+    assert prime_count.last_prime(1) == 0
+    assert prime_count.last_prime(2) == 2
+    assert prime_count.last_prime(100) == 97
+    assert prime_count.last_prime(10**12) == 10**12 - 11
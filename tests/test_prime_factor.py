@@ -0,0 +1,75 @@
+import math
+import random
+
+import prime_factor
+import prime_sieve
+
+# smallest strong pseudoprimes to the first k prime bases, k = 1..13
+strong_pseudoprimes = [
+    2047,
+    1373653,
+    25326001,
+    3215031751,
+    2152302898747,
+    3474749660383,
+    341550071728321,
+    341550071728321,
+    3825123056546413051,
+    3825123056546413051,
+    3825123056546413051,
+    318665857834031151167461,
+    3317044064679887385961981,
+]
+
+# strong Lucas pseudoprimes (Selfridge parameters)
+lucas_pseudoprimes = [5459, 5777, 10877, 16109, 18971, 22499, 24569, 25199, 40309, 58519]
+
+carmichael = [561, 1105, 1729, 2465, 2821, 6601, 8911, 41041, 825265, 321197185]
+
+
+def test_small_numbers_match_the_sieve():
+    primes = set(prime_sieve.small_primes(100000))
+    assert [n for n in range(-5, 100001) if prime_factor.is_prime(n)] == sorted(primes)
+
+
+def test_pseudoprimes_are_composite():
+    for n in strong_pseudoprimes + lucas_pseudoprimes + carmichael:
+        assert not prime_factor.is_prime(n), n
+
+    # the last one is where the fixed bases stop, BPSW has to reject it
+    assert strong_pseudoprimes[-1] == prime_factor.mr_limit
+
+
+def test_strong_lucas_pseudoprimes_fool_only_the_lucas_half():
+    for n in lucas_pseudoprimes:
+        assert prime_factor._strong_lucas(n), n
+
+        d, s = n - 1, 0
+        while d % 2 == 0:
+            d, s = d // 2, s + 1
+        assert not prime_factor._strong_probable_prime(n, 2, d, s), n
+
+
+def test_mersenne_numbers():
+    for p in (2, 3, 5, 7, 13, 17, 19, 31, 61, 89, 107, 127, 521, 607):
+        assert prime_factor.is_prime(2**p - 1), p
+
+    for p in (11, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71, 101, 131):
+        assert not prime_factor.is_prime(2**p - 1), p
+
+
+def test_factorize():
+    assert prime_factor.factorize(1) == {}
+    assert prime_factor.factorize(360) == {2: 3, 3: 2, 5: 1}
+    assert prime_factor.factorize(2**67 - 1) == {193707721: 1, 761838257287: 1}
+    assert prime_factor.factorize(2**32 + 1) == {641: 1, 6700417: 1}
+    assert prime_factor.factorize(1000003**2 * 999983) == {999983: 1, 1000003: 2}
+    assert prime_factor.format_factors({2: 3, 7: 1}) == "2^3 × 7"
+
+    rng = random.Random(5)
+    for _ in range(200):
+        n = rng.randrange(2, 10**15)
+        factors = prime_factor.factorize(n)
+
+        assert math.prod(p**e for p, e in factors.items()) == n
+        assert all(prime_factor.is_prime(p) for p in factors)
@@ -0,0 +1,87 @@
+import math
+from collections import Counter
+
+import prime_sieve
+
+
+def is_prime(n):
+    return n >= 2 and all(n % d for d in range(2, math.isqrt(n) + 1))
+
+
+# prime_stats worked out by trial division
+def reference(end, start=1):
+    primes = [p for p in range(max(start, 2), end + 1) if is_prime(p)]
+    found = set(primes)
+    gaps = [b - a for a, b in zip(primes, primes[1:])]
+
+    records = []
+    for p, gap in zip(primes, gaps):
+        if gap > (records[-1][1] if records else 0):
+            records.append((p, gap))
+
+    def pattern(*offsets):
+        return sum(all(p + d in found for d in offsets) for p in primes)
+
+    return {
+        "count": len(primes),
+        "first": primes[0] if primes else 0,
+        "last": primes[-1] if primes else 0,
+        "max_gap": max(gaps, default=0),
+        "twin": gaps.count(2),
+        "theta": math.fsum(map(math.log, primes)),
+        "gaps": {
+            "histogram": dict(sorted(Counter(gaps).items())),
+            "records": records,
+            "cousin": pattern(4),
+            "sexy": pattern(6),
+            "triplet": pattern(2, 6) + pattern(4, 6),
+        },
+    }
+
+
+def small_segments(start, end):
+    # tiny segments so runs and patterns straddle segment boundaries
+    return prime_sieve.odd_segments(start, end, size=5)
+
+
+def test_small_primes():
+    assert prime_sieve.small_primes(1) == []
+    assert prime_sieve.small_primes(30) == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+
+def test_odd_segments():
+    numbers = [
+        low + 2 * i
+        for low, seg in prime_sieve.odd_segments(1, 200, size=8)
+        for i, flag in enumerate(seg)
+        if flag
+    ]
+    assert numbers == [p for p in range(3, 201) if is_prime(p)]
+
+
+def test_prime_stats_against_trial_division():
+    for start, end in ((1, 1), (1, 2), (1, 100), (10, 100), (90, 97), (1, 3000), (1000, 5000)):
+        for segments in (prime_sieve.odd_segments, small_segments):
+            stats = prime_sieve.prime_stats(end, start, segments, theta=True, gaps=True)
+            expected = reference(end, start)
+
+            for key in ("count", "first", "last", "max_gap", "twin"):
+                assert stats[key] == expected[key], (start, end, key)
+
+            assert math.isclose(stats["theta"], expected["theta"], abs_tol=1e-9)
+            assert stats["gaps"] == expected["gaps"], (start, end)
+
+
+def test_merge_and_parallel_stats(monkeypatch):
+    parts = [prime_sieve.prime_stats(b, a, theta=True) for a, b in ((1, 999), (1000, 1996), (1997, 3000))]
+    merged = prime_sieve.merge_stats(parts)
+    whole = prime_sieve.prime_stats(3000, theta=True)
+
+    for key in ("count", "first", "last", "gap_sum", "gap_count", "max_gap", "twin"):
+        assert merged[key] == whole[key]
+
+    monkeypatch.setattr(prime_sieve, "parallel_min", 0)
+    parallel = prime_sieve.parallel_stats(1, 3000, workers=2)
+    assert parallel["count"] == whole["count"] == 430
+    assert parallel["twin"] == whole["twin"]
+    assert math.isclose(parallel["theta"], whole["theta"])
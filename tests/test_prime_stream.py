@@ -0,0 +1,29 @@
+import threading
+
+import prime_bitset
+import prime_stream
+
+
+def listing(monkeypatch, tmp_path, start, end, size):
+    monkeypatch.setattr(prime_bitset, "bits_path", str(tmp_path / "bits"))
+    monkeypatch.setattr(prime_bitset, "min_limit", 1 << 12)
+    monkeypatch.setattr(prime_stream, "batch_size", size)
+    prime_bitset._close()
+
+    try:
+        chunks = prime_stream.listing_chunks(start, end, threading.Event())
+        return "".join(text for _, text in chunks)
+    finally:
+        prime_bitset._close()
+
+
+def test_listing(monkeypatch, tmp_path):
+    expected = "\nPrimes = ['2', '3', '5', '7', '11', '13']\n"
+
+    # 6 primes: a partial last batch, full batches only, one batch
+    for size in (4, 3, 2, 6, 100):
+        assert listing(monkeypatch, tmp_path, 1, 13, size) == expected
+
+
+def test_empty_listing(monkeypatch, tmp_path):
+    assert listing(monkeypatch, tmp_path, 24, 28, 3) == "\nPrimes = []\n"
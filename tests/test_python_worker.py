@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+import python_worker
+from fake_text import FakeRoot, FakeText
+
+
+class Root(FakeRoot):
+    # after() callbacks run in order, with the delay slept for real
+    def run(self, until=None, timeout=20):
+        deadline = time.monotonic() + timeout
+
+        while self.calls and not (until and until()):
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(python_worker.poll_ms / 1000)
+            self.calls.pop(0)()
+
+
+@pytest.fixture
+def output():
+    root = Root()
+    widget = FakeText()
+
+    def run(code, until=None):
+        python_worker.run(root, widget, code)
+        root.run(until)
+        return widget.get("1.0", "end-1c")
+
+    yield run, root, widget
+    python_worker.stop()
+
+
+def test_output_streams_in(output):
+    run, root, widget = output
+    code = "import time\nprint('first')\ntime.sleep(1)\nprint('second')\n"
+
+    text = run(code, until=lambda: "first" in widget.get("1.0", "end"))
+    assert text == "first\n"
+
+    root.run()
+    assert widget.get("1.0", "end-1c") == "first\nsecond\n"
+
+
+def test_traceback_starts_in_the_code(output):
+    run, _, _ = output
+    text = run("def f():\n    return 1 / 0\n\nf()\n")
+
+    assert text.startswith("Traceback (most recent call last):\n")
+    assert 'File "<editor>", line 4, in <module>\n    f()\n' in text
+    assert 'File "<editor>", line 2, in f\n    return 1 / 0\n' in text
+    assert text.endswith("ZeroDivisionError: division by zero\n")
+    assert "python_worker" not in text
+
+
+def test_syntax_error(output):
+    run, _, _ = output
+    text = run("x = (\n")
+
+    assert 'File "<editor>", line 1' in text
+    assert "SyntaxError" in text
+    assert "Traceback" not in text
+
+
+def test_system_exit(output):
+    run, _, widget = output
+
+    assert run("raise SystemExit('bye')") == "bye\n"
+    widget.delete("1.0", "end")
+    assert run("import sys\nsys.exit(3)") == "SystemExit: 3\n"
+    widget.delete("1.0", "end")
+    assert run("import sys\nprint('a')\nsys.exit()") == "a\n"
+
+
+def test_threads_are_waited_for(output):
+    run, _, _ = output
+    code = (
+        "import threading, time\n"
+        "def late():\n"
+        "    time.sleep(0.3)\n"
+        "    print('late')\n"
+        "threading.Thread(target=late).start()\n"
+        "print('main')\n"
+    )
+
+    assert run(code) == "main\nlate\n"
+
+
+def test_leftover_daemon_threads_restart_the_worker(output):
+    run, _, widget = output
+    code = (
+        "import threading, time\n"
+        "threading.Thread(target=time.sleep, args=(60,), daemon=True).start()\n"
+    )
+    first = python_worker.start()
+
+    assert run(code) == ""
+    assert python_worker._proc is not first
+
+    widget.delete("1.0", "end")
+    assert run("import threading\nprint(threading.active_count())") == "1\n"
+
+
+def test_streams_are_put_back(output):
+    run, _, widget = output
+
+    run("import io, sys\nsys.stdout = sys.stderr = io.StringIO()")
+    assert run("print('seen')") == "seen\n"
+
+
+def test_cancel(output):
+    run, root, widget = output
+
+    code = "import time\nprint('start')\nwhile True:\n    time.sleep(0.01)\n"
+    python_worker.run(root, widget, code)
+    root.run(until=lambda: "start" in widget.get("1.0", "end"))
+    first = python_worker._proc
+
+    python_worker.cancel()
+    root.run()
+    assert widget.get("1.0", "end-1c") == "start\n\n(Python stopped)\n"
+
+    widget.delete("1.0", "end")
+    assert run("print('again')") == "again\n"
+    assert python_worker._proc is not first
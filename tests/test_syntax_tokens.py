@@ -0,0 +1,87 @@
+import syntax_tokens
+
+python = syntax_tokens.languages["python"]
+c = syntax_tokens.languages["c"]
+
+
+def spans(line, state=None, language=python):
+    return syntax_tokens.tokenize_line(line, state, language)
+
+
+def test_line():
+    assert spans("def f(a):") == ((("kw", 0, 3), ("call", 4, 5)), None)
+    assert spans("x = 1  # hi") == (
+        (("var", 0, 1), ("eq", 2, 3), ("num", 4, 5), ("comment", 7, 11)),
+        None,
+    )
+    assert spans('y = f("s", 0x1F)')[0][3:] == (("str", 6, 9), ("num", 11, 15))
+
+
+
+def test_keyword_before_a_parenthesis():
+    assert spans("if(x):")[0] == (("kw", 0, 2),)
+    assert spans("while(x): f(x)")[0] == (("kw", 0, 5), ("call", 10, 11))
+    assert spans("return(not(x))")[0] == (("kw", 0, 6), ("kw", 7, 10))
+    assert spans("while(n--) g(n);", language=c)[0] == (("kw", 0, 5), ("call", 11, 12))
+
+def test_string_across_lines():
+    assert spans('s = """doc') == (
+        (("var", 0, 1), ("eq", 2, 3), ("str", 4, 10)),
+        '"""',
+    )
+    assert spans("still doc", '"""') == ((("str", 0, 9),), '"""')
+    assert spans("", '"""') == ((), '"""')
+    assert spans('end""" if x', '"""') == ((("str", 0, 6), ("kw", 7, 9)), None)
+
+    # the other quote does not close it
+    assert spans("'''", '"""')[1] == '"""'
+
+
+def test_c_comment_and_preprocessor():
+    assert spans("#include <x.h>", language=c) == ((("pre", 0, 14),), None)
+    assert spans("int a; /* x", language=c) == (
+        (("kw", 0, 3), ("comment", 7, 11)),
+        "/*",
+    )
+    assert spans("y */ int b;", "/*", c) == ((("comment", 0, 4), ("kw", 5, 8)), None)
+
+
+def test_tokenize_matches_the_lines():
+    text = 'x = 1\ns = """a\nb\nc""" + f(2)\n# done'
+    offsets = syntax_tokens.line_starts(text)
+    expected = []
+    state = None
+
+    for start, line in zip(offsets, text.split("\n")):
+        line_spans, state = spans(line, state)
+        expected.extend((tag, start + s, start + e) for tag, s, e in line_spans)
+
+    found = list(syntax_tokens.tokenize(text, python))
+    assert found == expected
+
+    for (_, _, e), (_, s, _) in zip(found, found[1:]):
+        assert e <= s
+
+
+def test_line_starts():
+    assert syntax_tokens.line_starts("") == [0]
+    assert syntax_tokens.line_starts("ab\n\ncd\n") == [0, 3, 4, 7]
+
+
+def test_cache_keys_on_text_and_state():
+    syntax_tokens.cache_clear()
+
+    spans("x = 1")
+    spans("x = 1")
+    spans("x = 1", '"""')
+
+    stats = syntax_tokens.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["lines"]) == (1, 2, 2)
+
+
+def test_packs():
+    both = syntax_tokens.combine("c", "python")
+    assert spans("int def", language=both)[0] == (("kw", 0, 3), ("kw", 4, 7))
+
+    assert syntax_tokens.for_filename("main.RS")["name"] == "rust"
+    assert syntax_tokens.for_filename("notes.txt")["name"] == "python"
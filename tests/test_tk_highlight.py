@@ -0,0 +1,213 @@
+import random
+
+import syntax_tokens
+import tk_highlight
+from fake_text import FakeRoot, FakeText
+
+python = syntax_tokens.languages["python"]
+c = syntax_tokens.languages["c"]
+
+pool = [
+    "x = 1",
+    "def f(a):",
+    '"""doc',
+    'end"""',
+    "'''",
+    'y = "s" + f(2)',
+    "# hi  ",
+    "for i in range(3):",
+    "    pass",
+    "",
+]
+
+
+# tags of lines first..last (1-based) when the whole text is tokenized
+def full(lines, language, first=1, last=None):
+    last = len(lines) if last is None else last
+    tags = {}
+    state = None
+
+    for row, line in enumerate(lines):
+        spans, state = syntax_tokens.tokenize_line(line, state, language)
+        if first <= row + 1 <= last:
+            for tag, s, e in spans:
+                tags.setdefault(tag, set()).update((row, col) for col in range(s, e))
+
+    return tags
+
+
+def rows(tags, first, last):
+    found = {}
+    for tag, chars in tags.items():
+        chars = {(r, c) for r, c in chars if first <= r + 1 <= last}
+        if chars:
+            found[tag] = chars
+    return found
+
+
+def random_edit(rng, widget):
+    i = rng.randrange(len(widget.lines))
+    r = rng.random()
+
+    if r < 0.4:
+        widget.replace_lines(i, i, [rng.choice(pool) for _ in range(rng.randrange(1, 3))])
+    elif r < 0.7 and len(widget.lines) > 1:
+        widget.replace_lines(i, min(len(widget.lines), i + rng.randrange(1, 3)), [])
+    else:
+        line = rng.choice(pool)
+        if line != widget.lines[i]:
+            widget.replace_lines(i, i + 1, [line])
+
+
+def test_changed_lines():
+    assert tk_highlight.changed_lines(["a", "b", "c"], ["a", "x", "c"]) == (1, 2)
+    assert tk_highlight.changed_lines(["a", "b", "c"], ["a", "c"]) == (1, 1)
+    assert tk_highlight.changed_lines(["a", "c"], ["a", "b", "b", "c"]) == (1, 3)
+    assert tk_highlight.changed_lines([], ["a", "b"]) == (0, 2)
+    # the inserted "b" could be either of the two, so both count
+    assert tk_highlight.changed_lines(["a", "b", "c"], ["a", "b", "b", "c"]) == (1, 3)
+
+
+# a random insert or delete of a few characters, possibly over several
+# lines, made at the cursor through the widget command like typing or
+# pasting
+def random_typing(rng, widget):
+    row = rng.randrange(len(widget.lines))
+    col = rng.randint(0, len(widget.lines[row]))
+    widget.mark_set("insert", f"{row + 1}.{col}")
+
+    if rng.random() < 0.6:
+        text = rng.choice(pool + ["\n", " ", "  \n", "(", '"""', "x\ny"])
+        widget.insert("insert", text)
+    else:
+        end = widget.index(f"{row + 1}.{col + rng.randrange(1, 12)}")
+        if rng.random() < 0.3:
+            end = f"{min(row + rng.randrange(1, 3), len(widget.lines) - 1) + 1}.0"
+        widget.delete("insert", end)
+
+
+# trailing whitespace of every line but skip
+def trailing_tags(widget, skip=None):
+    return {
+        (row, col)
+        for row, line in enumerate(widget.lines)
+        if row != skip
+        for col in range(len(line.rstrip(" \t")) if line.strip() else len(line), len(line))
+    }
+
+
+def test_watch_matches_a_full_tokenize():
+    rng = random.Random(2)
+    root = FakeRoot()
+    widget = FakeText("\n".join(rng.choice(pool) for _ in range(10)))
+    tk_highlight.watch(root, widget, python, trailing="trail_ws")
+    root.run()
+
+    for _ in range(300):
+        # sometimes several edits land in one pass
+        for _ in range(rng.choice((1, 1, 2, 4))):
+            random_typing(rng, widget)
+        root.run()
+
+        assert widget.tagged(tk_highlight.tags) == full(widget.lines, python)
+        # the line just typed on is left alone
+        typed = widget.cursor[0]
+        assert widget.tags.get("trail_ws", set()) == trailing_tags(widget, typed)
+
+        # moving away from the line tags it
+        if rng.random() < 0.2:
+            row = rng.randrange(len(widget.lines))
+            widget.mark_set("insert", f"{row + 1}.0")
+            root.run()
+            skip = typed if row == typed else None
+            assert widget.tags.get("trail_ws", set()) == trailing_tags(widget, skip)
+
+
+def test_trailing_whitespace_waits_for_the_cursor_to_leave():
+    root = FakeRoot()
+    widget = FakeText("x = 1\ny = 2")
+    tk_highlight.watch(root, widget, None, trailing="trail_ws")
+    root.run()
+
+    widget.mark_set("insert", "1.end")
+    widget.insert("insert", " ")
+    root.run()
+    assert not widget.tags.get("trail_ws")
+
+    widget.mark_set("insert", "1.2")
+    root.run()
+    assert not widget.tags.get("trail_ws")
+
+    widget.mark_set("insert", "2.0")
+    root.run()
+    assert widget.tags["trail_ws"] == {(0, 5)}
+
+    # Enter after the spaces: the line left behind is tagged at once
+    widget.mark_set("insert", "2.end")
+    widget.insert("insert", "  ")
+    widget.insert("insert", "\n")
+    root.run()
+    assert widget.tags["trail_ws"] == {(0, 5), (1, 5), (1, 6)}
+
+
+def test_watch_reads_only_the_edited_lines():
+    root = FakeRoot()
+    widget = FakeText("\n".join(f"x{i} = {i}" for i in range(2000)))
+    tk_highlight.watch(root, widget, python)
+    root.run()
+
+    widget.read = 0
+    widget.insert("1000.3", "  ")
+    widget.delete("1500.0", "1502.0")
+    root.run()
+
+    assert widget.read < 10000
+    assert widget.tagged(tk_highlight.tags) == full(widget.lines, python)
+
+
+def test_watch_leaves_the_modified_flag_alone():
+    root = FakeRoot()
+    widget = FakeText("x = 1")
+    tk_highlight.watch(root, widget, python)
+    root.run()
+
+    widget.insert("1.0", "y = 2\n")
+    root.run()
+    assert widget.edit_modified()
+
+    # the host saved and cleared it, later edits set it again
+    widget.edit_modified(False)
+    widget.insert("end", "\nz = 3")
+    root.run()
+    assert widget.edit_modified()
+
+
+def test_visible_lines_start_in_the_right_state():
+    lines = ["x = 1", "/* open"] + [f"int a{i} = {i};" for i in range(200)] + ["close */", "int b;"]
+    widget = FakeText("\n".join(lines), name=".c_view")
+    widget.view = (0.5, 0.6)
+
+    tk_highlight.highlight_visible(widget, c, {})
+
+    first, last = tk_highlight._views[".c_view"]["ranges"][0]
+    assert first > 2
+    assert rows(widget.tagged(tk_highlight.tags), first, last) == full(lines, c, first, last)
+
+
+def test_visible_lines_match_a_full_tokenize():
+    rng = random.Random(3)
+    widget = FakeText("\n".join(rng.choice(pool) for _ in range(150)), name=".view")
+    tk_highlight.highlight_visible(widget, python, {})
+
+    for _ in range(300):
+        if rng.random() < 0.3:
+            top = rng.random() * 0.9
+            widget.view = (top, top + 0.1)
+            widget.yscrollcommand("0", "1")
+        else:
+            random_edit(rng, widget)
+            tk_highlight.highlight_visible(widget, python, {})
+
+        tags = widget.tagged(tk_highlight.tags)
+        for first, last in tk_highlight._views[".view"]["ranges"]:
+            assert rows(tags, first, last) == full(widget.lines, python, first, last)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+pytest.importorskip("pygments")
+
+import tk_pygments
+from fake_text import FakeText
+
+theme = "one-dark"
+
+
+def full(lines):
+    widget = FakeText("\n".join(lines), name=".full")
+    tk_pygments._lines.pop(".full", None)
+    tk_pygments._configured.pop(".full", None)
+    tk_pygments.highlight_all(widget, theme)
+    return widget.tagged()
+
+
+def edited(lines, i, j, new):
+    widget = FakeText("\n".join(lines), name=f".edited{random.random()}")
+    tk_pygments.highlight_all(widget, theme)
+    widget.replace_lines(i, j, new)
+    tk_pygments.highlight_changes(widget, theme)
+    return widget
+
+
+def test_deleting_the_line_that_closes_a_string():
+    lines = ["def f():", "# hi", '    return f"{x}"', "'''", "doc", "# hi", "# hi", "x = 1"]
+    widget = edited(lines, 3, 4, [])
+
+    assert widget.tagged() == full(widget.lines)
+
+
+def test_opening_a_string_above_a_docstring_at_the_end():
+    # the docstring is one token, its last line never got a checkpoint
+    lines = ["if y:", "x = 1", '"""doc', "x = 2", 'end"""']
+    widget = edited(lines, 1, 2, ['doc """'])
+
+    assert widget.tagged() == full(widget.lines)
+
+
+def test_random_edits_match_a_full_relex():
+    pool = [
+        "x = 1",
+        "def f(a):",
+        '"""doc',
+        'end"""',
+        "'''",
+        'y = "s" + f(2)',
+        "# hi",
+        '    return f"{x}"',
+        "for i in range(3):",
+        "    pass",
+        "",
+    ]
+    rng = random.Random(1)
+    widget = FakeText("\n".join(rng.choice(pool) for _ in range(12)), name=".random")
+    tk_pygments.highlight_all(widget, theme)
+
+    for _ in range(300):
+        i = rng.randrange(len(widget.lines))
+        r = rng.random()
+
+        if r < 0.4:
+            widget.replace_lines(i, i, [rng.choice(pool) for _ in range(rng.randrange(1, 3))])
+        elif r < 0.7 and len(widget.lines) > 1:
+            widget.replace_lines(i, min(len(widget.lines), i + rng.randrange(1, 3)), [])
+        else:
+            line = rng.choice(pool)
+            if line == widget.lines[i]:
+                # Tk would keep the tags, this fake drops them
+                continue
+            widget.replace_lines(i, i + 1, [line])
+
+        tk_pygments.highlight_changes(widget, theme)
+        assert widget.tagged() == full(widget.lines), widget.lines
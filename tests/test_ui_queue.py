@@ -0,0 +1,102 @@
+import queue
+import threading
+import time
+
+import pytest
+
+import ui_queue
+
+
+class Root:
+    def __init__(self):
+        self.calls = []
+        self.errors = []
+
+    def after(self, ms, func):
+        self.calls.append(func)
+
+    # one poll round: runs what was scheduled, not what that schedules
+    def round(self):
+        calls, self.calls = self.calls, []
+        for func in calls:
+            func()
+
+    def report_callback_exception(self, kind, value, tb):
+        self.errors.append(value)
+
+
+@pytest.fixture
+def root(monkeypatch):
+    monkeypatch.setattr(ui_queue, "_calls", queue.SimpleQueue())
+    monkeypatch.setattr(ui_queue, "_root", None)
+    return Root()
+
+
+def test_posts_run_in_order(root):
+    seen = []
+    ui_queue.post(seen.append, "early")
+    ui_queue.start(root)
+
+    def worker(name):
+        for i in range(200):
+            ui_queue.post(seen.append, (name, i))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in "abc"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    while len(seen) < 601:
+        root.round()
+
+    assert seen[0] == "early"
+    for name in "abc":
+        assert [i for n, i in seen[1:] if n == name] == list(range(200))
+
+
+def test_calls_run_on_the_polling_thread(root):
+    ran = []
+    ui_queue.start(root)
+
+    def call():
+        ran.append(threading.current_thread())
+
+    t = threading.Thread(target=ui_queue.post, args=(call,))
+    t.start()
+    t.join()
+    assert not ran
+
+    root.round()
+    assert ran == [threading.current_thread()]
+
+
+def test_a_round_stops_after_slice_ms(root, monkeypatch):
+    monkeypatch.setattr(ui_queue, "slice_ms", 10)
+    seen = []
+    ui_queue.start(root)
+
+    for i in range(10):
+        ui_queue.post(lambda i=i: (time.sleep(0.004), seen.append(i)))
+
+    root.round()
+    assert 1 <= len(seen) < 10
+
+    while len(seen) < 10:
+        root.round()
+    assert seen == list(range(10))
+
+
+def test_errors_are_reported_and_later_posts_still_run(root):
+    seen = []
+    ui_queue.start(root)
+
+    ui_queue.post(seen.append, 1)
+    ui_queue.post(lambda: 1 / 0)
+    ui_queue.post(seen.append, 2)
+    root.round()
+
+    assert seen == [1, 2]
+    assert [type(e) for e in root.errors] == [ZeroDivisionError]
+    # and polling carries on
+    assert root.calls == [ui_queue._drain]
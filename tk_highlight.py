@@ -0,0 +1,581 @@
+import queue
+import re
+import threading
+import time
+
+import syntax_tokens
+
+
+tags = ("kw", "var", "eq", "num", "str", "call", "comment", "pre")
+
+# typing is coalesced into one re-highlight pass at most this often
+debounce_ms = 40
+
+# highlight_async: lines per batch sent from the tokenizer thread, and
+# how long each after() slice on the Tk main thread may spend tagging
+batch_lines = 200
+slice_ms = 12
+poll_ms = 15
+
+# widget path -> cancel event of the highlight_async run colouring it
+_running = {}
+
+# highlight_visible: lines above and below the view coloured ahead of
+# scrolling
+overscan = 20
+
+# spaces and tabs after the last non-blank character of a line
+_trailing = re.compile(r"(?<=\S)[ \t]+$")
+
+# widget path -> {tag: colour} as last configured by set_colors
+_colors = {}
+
+# widget path -> what highlight_visible knows about it: its lines as of
+# the last edit, the lexer state at the end of each of the first lines
+# (as far as they have been needed), the (first, last) line ranges
+# already coloured and the language pack / colours to use when it is
+# scrolled
+_views = {}
+
+
+# Only tags whose colour differs from what this widget was given last
+# time are reconfigured, so calling it on every keystroke is cheap
+def set_colors(widget, colors):
+    done = _colors.setdefault(str(widget), {})
+
+    for tag, color in colors.items():
+        if done.get(tag) != color:
+            widget.tag_config(tag, foreground=color)
+            done[tag] = color
+
+
+# Applies (tag, start index, end index) ranges with one "tag add" per tag,
+# which takes any number of index pairs, instead of a Tcl call per range
+def add_ranges(widget, ranges):
+    grouped = {}
+
+    for tag, start, end in ranges:
+        grouped.setdefault(tag, []).extend((start, end))
+
+    for tag, indexes in grouped.items():
+        widget.tag_add(tag, *indexes)
+
+
+def _add_spans(widget, first, lines, spans_per_line):
+    for tag in tags:
+        widget.tag_remove(tag, f"{first}.0", f"{first + lines - 1}.end")
+
+    add_ranges(
+        widget,
+        (
+            (tag, f"{row}.{s}", f"{row}.{e}")
+            for row, spans in enumerate(spans_per_line, start=first)
+            for tag, s, e in spans
+        ),
+    )
+
+
+# Tags the trailing whitespace of lines, which start at line first, and
+# clears the tag from the rest of them
+def _mark_trailing(widget, first, lines, tag):
+    widget.tag_remove(tag, f"{first}.0", f"{first + len(lines) - 1}.end")
+    ranges = []
+
+    for row, line in enumerate(lines, start=first):
+        m = _trailing.search(line)
+        if m:
+            ranges.append((tag, f"{row}.{m.start()}", f"{row}.{m.end()}"))
+
+    add_ranges(widget, ranges)
+
+
+# Deletes trailing spaces and tabs line by line, so only those characters
+# change and the rest of the text keeps its tags, marks and undo history
+def strip_trailing(widget):
+    lines = widget.get("1.0", "end-1c").split("\n")
+
+    for i, line in enumerate(lines, start=1):
+        end = len(line.rstrip(" \t"))
+        if end < len(line):
+            widget.delete(f"{i}.{end}", f"{i}.{len(line)}")
+
+
+# Turns offsets into text, which starts at line first of a widget, into
+# "line.col" indexes. Offsets must come in increasing order: the line
+# only ever moves forward.
+def offset_index(text, first):
+    starts = syntax_tokens.line_starts(text) + [len(text) + 1]
+    line = 0
+
+    def index(offset):
+        nonlocal line
+
+        while offset >= starts[line + 1]:
+            line += 1
+
+        return f"{first + line}.{offset - starts[line]}"
+
+    return index
+
+
+# Re-colour lines first..last (last=None means the end of the text) of a
+# Tk Text widget. The region is fetched once, tokenized in a single scan
+# and span offsets are turned into line.col with the region's own line
+# table, so there is no Tcl "index" round-trip per match.
+def highlight_lines(widget, first, last, language, colors):
+    region_start = f"{first}.0"
+    region_end = "end-1c" if last is None else f"{last}.end"
+
+    for tag in tags:
+        widget.tag_remove(tag, region_start, region_end)
+
+    text = widget.get(region_start, region_end)
+    index = offset_index(text, first)
+
+    add_ranges(
+        widget,
+        (
+            (tag, index(s), index(e))
+            for tag, s, e in syntax_tokens.tokenize(text, language)
+        ),
+    )
+
+    set_colors(widget, colors)
+
+
+# Lines top..dirty_end-1 of new are what changed since old; the lines
+# below them are old's last len(new) - dirty_end lines, unchanged.
+def changed_lines(old, new):
+    shift = len(old) - len(new)
+    n = min(len(old), len(new))
+
+    top = 0
+    while top < n and old[top] == new[top]:
+        top += 1
+
+    bottom = 0
+    while bottom < n - top and old[-1 - bottom] == new[-1 - bottom]:
+        bottom += 1
+
+    # when lines were added or removed next to identical lines the edit
+    # could have been anywhere in that run, so count all of it as changed
+    if shift:
+        longer = old if shift > 0 else new
+        while top and longer[top - 1] == longer[top - 1 + abs(shift)]:
+            top -= 1
+
+    return top, len(new) - bottom
+
+
+# Puts a Python command in front of widget's Tcl command, the trick
+# IDLE's WidgetRedirector uses: the widget command is renamed and ours
+# takes its name, so every insert, delete and replace, typed or made by
+# code, passes through with its indexes. edited(first, end, added) gets
+# the lines first..end-1 (0-based) of the text after the change and the
+# number of lines it added; edited(None) means the change is not known
+# line by line. moved() is called when the insert cursor is moved.
+def _redirect(widget, edited, moved=None):
+    tk = widget.tk
+    name = str(widget)
+    orig = name + "_orig"
+    tk.call("rename", name, orig)
+
+    def line(index):
+        return int(str(tk.call(orig, "index", index)).split(".")[0])
+
+    def dispatch(op, *args):
+        if op == "insert":
+            indexes = args[:1]
+        elif op == "delete":
+            indexes = args
+        elif op == "replace":
+            indexes = args[:2]
+        else:
+            result = tk.call((orig, op) + args)
+            if op == "edit" and args[:1] in (("undo",), ("redo",)):
+                edited(None)
+            elif moved and op == "mark" and args[:2] == ("set", "insert"):
+                moved()
+            return result
+
+        count = line("end")
+        rows = [line(i) for i in indexes]
+        result = tk.call((orig, op) + args)
+        added = line("end") - count
+
+        first = min(rows) - 1
+        edited(first, max(max(rows) + added, first + 1), added)
+        return result
+
+    def destroyed(event):
+        try:
+            tk.deletecommand(name)
+        except Exception:
+            pass
+
+    tk.createcommand(name, dispatch)
+    widget.bind("<Destroy>", destroyed, add="+")
+
+
+# Keeps widget highlighted as it is edited. Every change to the text is
+# seen through _redirect, with the lines it touched, and schedules one
+# pass (bursts of typing share it). The pass reads back only those
+# lines, re-tokenizes them and then carries on downwards only while the
+# lexer state at the end of a line differs from what it was before, e.g.
+# after a triple quote was opened or closed. The widget's modified flag
+# is never touched, it stays the host's "unsaved changes". With
+# trailing set to a tag name the changed lines also get their trailing
+# whitespace (re)tagged with it, except the line being typed on, which
+# only gets it once the cursor leaves it; language None leaves out the
+# syntax colouring.
+def watch(root, widget, language, trailing=None):
+    lines = []
+    states = []
+    pending = None
+    # (first, end, added) of everything edited since the last pass, in
+    # the lines as they are now; None when nothing was, "all" when the
+    # whole text has to be read and compared
+    dirty = "all"
+    # line whose trailing whitespace is left untagged while the cursor
+    # is on it
+    typing = None
+
+    def mark_trailing(new, first, end):
+        nonlocal typing
+
+        _mark_trailing(widget, first + 1, new[first:end], trailing)
+
+        row = int(widget.index("insert").split(".")[0]) - 1
+        left = typing
+        typing = None
+
+        if left is not None and left != row and not first <= left < end:
+            _mark_trailing(widget, left + 1, new[left : left + 1], trailing)
+
+        if first <= row < end or left == row:
+            widget.tag_remove(trailing, f"{row + 1}.0", f"{row + 1}.end")
+            typing = row
+
+    def refresh():
+        nonlocal pending, lines, states, dirty
+        pending = None
+
+        if dirty == "all":
+            new = widget.get("1.0", "end-1c").split("\n")
+            top, dirty_end = changed_lines(lines, new)
+            # the line that was being typed on may have moved
+            marked = (0, len(new))
+        elif dirty is None:
+            if trailing:
+                mark_trailing(lines, 0, 0)
+            return
+        else:
+            top, dirty_end, added = dirty
+            read = widget.get(f"{top + 1}.0", f"{dirty_end}.end").split("\n")
+            new = lines[:top] + read + lines[dirty_end - added :]
+            marked = (top, dirty_end)
+
+        dirty = None
+
+        if trailing:
+            mark_trailing(new, *marked)
+
+        if language is None:
+            lines = new
+            return
+
+        shift = len(lines) - len(new)
+        state = states[top - 1] if top else None
+        new_states = states[:top]
+        spans_per_line = []
+        i = top
+
+        while i < len(new):
+            if i >= dirty_end:
+                old = i + shift
+                # an unchanged line that starts in the same state as before
+                # ends in the same state too, and so does the rest
+                if state == (states[old - 1] if old else None):
+                    break
+
+            spans, state = syntax_tokens.tokenize_line(new[i], state, language)
+            spans_per_line.append(spans)
+            new_states.append(state)
+            i += 1
+
+        if spans_per_line:
+            _add_spans(widget, top + 1, len(spans_per_line), spans_per_line)
+
+        new_states.extend(states[i + shift :])
+        lines = new
+        states = new_states
+
+    def edited(first, end=None, added=0):
+        nonlocal pending, dirty, typing
+
+        # keep the untagged line pointing at the same text; if the edit
+        # touched it, it is one of the changed lines anyway
+        if typing is not None and first is not None and first <= typing:
+            typing = typing + added if typing >= end - added else None
+
+        if first is None:
+            dirty = "all"
+        elif dirty is None:
+            dirty = (first, end, added)
+        elif dirty != "all":
+            top, dirty_end, total = dirty
+            # lines added or removed above its end move the earlier range
+            if first < dirty_end:
+                dirty_end = max(dirty_end + added, end)
+            dirty = (min(top, first), max(dirty_end, end), total + added)
+
+        if pending is None:
+            pending = root.after(debounce_ms, refresh)
+
+    def moved():
+        nonlocal pending
+
+        if typing is not None and pending is None:
+            pending = root.after(debounce_ms, refresh)
+
+    _redirect(widget, edited, moved)
+    edited(None)
+
+
+# Colours the whole of widget without blocking the Tk main thread. The
+# text is read once here; a worker thread tokenizes it and queues
+# (first line, spans per line) batches, visible lines first, and the
+# main thread tags them in after() slices of at most slice_ms. A newer
+# call for the same widget, or a change in its line count, stops the
+# run.
+def highlight_async(root, widget, language, colors):
+    key = str(widget)
+    if key in _running:
+        _running[key].set()
+    cancel = _running[key] = threading.Event()
+
+    set_colors(widget, colors)
+
+    lines = widget.get("1.0", "end-1c").split("\n")
+    end = widget.index("end")
+    top = int(widget.index("@0,0").split(".")[0]) - 1
+    bottom = int(widget.index(f"@0,{widget.winfo_height()}").split(".")[0])
+    bottom = min(bottom, len(lines))
+
+    batches = queue.Queue()
+
+    def send(spans, first, last):
+        for low in range(first, last, batch_lines):
+            if cancel.is_set():
+                return
+            high = min(low + batch_lines, last)
+            batches.put((low + 1, spans[low:high]))
+
+    def work():
+        spans = []
+        state = None
+        # lines below the visible region are queued as they are tokenized
+        sent = bottom
+
+        for line in lines:
+            if cancel.is_set():
+                return
+
+            line_spans, state = syntax_tokens.tokenize_line(line, state, language)
+            spans.append(line_spans)
+
+            if len(spans) == bottom:
+                send(spans, top, bottom)
+            elif len(spans) - sent == batch_lines:
+                send(spans, sent, len(spans))
+                sent = len(spans)
+
+        send(spans, sent, len(spans))
+        send(spans, 0, top)
+        batches.put(None)
+
+    def drain():
+        if cancel.is_set():
+            return
+
+        if widget.index("end") != end:
+            cancel.set()
+            return
+
+        deadline = time.perf_counter() + slice_ms / 1000
+
+        while time.perf_counter() < deadline:
+            try:
+                item = batches.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                if _running.get(key) is cancel:
+                    del _running[key]
+                return
+
+            first, spans_per_line = item
+            _add_spans(widget, first, len(spans_per_line), spans_per_line)
+
+        root.after(poll_ms, drain)
+
+    threading.Thread(target=work, daemon=True).start()
+    root.after(poll_ms, drain)
+
+
+# Colours only what is on screen (per yview(), plus overscan lines) and
+# remembers which line ranges are done, so moving the cursor costs
+# nothing and scrolling only colours the lines it exposes. Like watch()
+# it keeps the lexer state at the end of every line above the lowest one
+# coloured, so a view that starts inside a docstring or a /* */ comment
+# is coloured from the right state. An edit drops the changed lines from
+# the done ranges, and the lines below them whose state changed with it,
+# and shifts the rest. The first call also hooks the widget's
+# yscrollcommand so scrolling keeps colouring after that.
+def highlight_visible(widget, language, colors):
+    key = str(widget)
+    view = _views.get(key)
+
+    if view is None:
+        view = _views[key] = {"lines": [], "states": [], "ranges": [], "pending": None}
+        _follow_scroll(widget)
+
+    if view.get("language") is not language:
+        view["states"] = []
+        view["ranges"] = []
+
+    view["language"] = language
+    view["colors"] = colors
+
+    set_colors(widget, colors)
+    _color_view(widget, edited=True)
+
+
+def _follow_scroll(widget):
+    previous = str(widget.cget("yscrollcommand"))
+
+    def scrolled(first, last):
+        if previous:
+            widget.tk.eval(f"{previous} {first} {last}")
+
+        view = _views[str(widget)]
+        if view["pending"] is None:
+            view["pending"] = widget.after(debounce_ms, lambda: _color_view(widget))
+
+    widget.config(yscrollcommand=scrolled)
+
+
+# Brings view up to date with the edit that turned its lines into new
+def _view_edited(view, new):
+    old = view["lines"]
+    old_states = view["states"]
+    top, dirty_end = changed_lines(old, new)
+    shift = len(old) - len(new)
+
+    states = old_states[:top]
+    state = states[-1] if top else None
+    # new line index from which the old states and colours hold again,
+    # None when nothing below the edit is known
+    settled = None
+
+    # only worth working out when there is something known below the edit
+    if len(old_states) > dirty_end + shift:
+        i = top
+
+        while i < len(new):
+            if i >= dirty_end:
+                old_i = i + shift
+                if old_i > len(old_states):
+                    break
+                # an unchanged line that starts in the same state as before
+                # ends in the same state too, and so does the rest
+                if state == (old_states[old_i - 1] if old_i else None):
+                    settled = i
+                    break
+
+            _, state = syntax_tokens.tokenize_line(new[i], state, view["language"])
+            states.append(state)
+            i += 1
+
+        if settled is not None:
+            states.extend(old_states[settled + shift :])
+
+    ranges = []
+    for a, b in view["ranges"]:
+        if a <= top:
+            ranges.append((a, min(b, top)))
+        if settled is not None and b > settled + shift:
+            ranges.append((max(a, settled + shift + 1) - shift, b - shift))
+
+    view["lines"] = new
+    view["states"] = states
+    view["ranges"] = ranges
+
+
+# Colours lines first..last, which are not coloured yet, from the state
+# at the end of the line above, working out the states down to there if
+# they are not known yet
+def _color_lines(widget, view, first, last):
+    lines = view["lines"]
+    states = view["states"]
+    language = view["language"]
+
+    state = states[-1] if states else None
+    while len(states) < first - 1:
+        _, state = syntax_tokens.tokenize_line(lines[len(states)], state, language)
+        states.append(state)
+
+    state = states[first - 2] if first > 1 else None
+    spans_per_line = []
+
+    for i in range(first - 1, last):
+        spans, state = syntax_tokens.tokenize_line(lines[i], state, language)
+        spans_per_line.append(spans)
+        if i == len(states):
+            states.append(state)
+
+    _add_spans(widget, first, len(spans_per_line), spans_per_line)
+
+
+# After an edit (edited) the text is read again; on a scroll it is only
+# read when the line count changed, otherwise the lines of the last
+# edit are coloured and the next highlight_visible() sorts out any
+# typing in between.
+def _color_view(widget, edited=False):
+    view = _views[str(widget)]
+    view["pending"] = None
+
+    if not edited:
+        edited = int(widget.index("end-1c").split(".")[0]) != len(view["lines"])
+
+    if edited:
+        new = widget.get("1.0", "end-1c").split("\n")
+        if new != view["lines"]:
+            _view_edited(view, new)
+
+    lines = view["lines"]
+    f0, f1 = widget.yview()
+    first = max(1, int(f0 * len(lines)) + 1 - overscan)
+    last = min(len(lines), int(f1 * len(lines)) + 1 + overscan)
+
+    start = first
+    for a, b in view["ranges"] + [(last + 1, last + 1)]:
+        if b < start:
+            continue
+        if a > last + 1:
+            a = last + 1
+        if a > start:
+            _color_lines(widget, view, start, a - 1)
+        start = max(start, b + 1)
+        if start > last:
+            break
+
+    merged = []
+    for a, b in sorted(view["ranges"] + [(first, last)]):
+        if merged and a <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+
+    view["ranges"] = merged
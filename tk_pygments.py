@@ -0,0 +1,167 @@
+from functools import lru_cache
+
+from pygments.lexer import ExtendedRegexLexer, LexerContext
+from pygments.lexers.python import PythonLexer
+from pygments.styles import get_style_by_name
+from pygments.token import Token
+
+import syntax_tokens
+import tk_highlight
+
+
+_lexer = PythonLexer()
+
+# widget path -> theme its tags are configured for
+_configured = {}
+
+# widget path -> its lines as of the last pass
+_lines = {}
+
+# widget path -> lexer state at the start of each line: a tuple (the
+# pygments state stack), False when a token runs across the line start
+# so lexing cannot resume there, or None when unknown
+_checkpoints = {}
+
+
+# token type -> (tag, colour) for every type the theme gives a colour,
+# the first "#..." item of its style string as the old code did
+@lru_cache(maxsize=None)
+def style_table(theme):
+    style = get_style_by_name(theme)
+    table = {}
+
+    for ttype, value in style.styles.items():
+        for item in (value or "").split():
+            if item.startswith("#"):
+                table[ttype] = (str(ttype), item)
+                break
+
+    return table
+
+
+# tag for a token type, inheriting from the parent types like pygments
+# does but never from plain Token, so text and whitespace stay untagged
+@lru_cache(maxsize=None)
+def tag_for(theme, ttype):
+    table = style_table(theme)
+
+    while ttype is not Token:
+        if ttype in table:
+            return table[ttype][0]
+        ttype = ttype.parent
+
+    return None
+
+
+def configure(widget, theme):
+    key = str(widget)
+    if _configured.get(key) == theme:
+        return
+
+    for tag, color in style_table(theme).values():
+        widget.tag_configure(tag, foreground=color)
+
+    _configured[key] = theme
+
+
+# Lexes text, which starts at (1-based) line first, from the given state
+# stack and tags it. With stop set, lexing ends at the first line past
+# stop whose state is the same as last time, since the rest of the text
+# is then coloured correctly already.
+def _relex(widget, theme, text, first, stack, cps, stop=None):
+    ctx = LexerContext(text, 0, list(stack))
+    starts = syntax_tokens.line_starts(text) + [len(text) + 1]
+    index = tk_highlight.offset_index(text, first)
+
+    spans = []
+    line = 0
+    end = None
+    cps[first - 1] = tuple(stack)
+
+    for pos, ttype, value in ExtendedRegexLexer.get_tokens_unprocessed(
+        _lexer, context=ctx
+    ):
+        while pos >= starts[line + 1]:
+            line += 1
+            k = first + line - 1
+
+            if pos == starts[line] and ctx.pos == pos:
+                state = tuple(ctx.stack)
+            else:
+                state = False
+
+            # an unknown checkpoint (None) proves nothing, so lexing
+            # goes on past it
+            if stop is not None and k > stop and state and state == cps[k]:
+                end = first + line
+                break
+
+            cps[k] = state
+
+        if end is not None:
+            break
+
+        tag = tag_for(theme, ttype)
+        if tag is not None:
+            spans.append((tag, pos, pos + len(value)))
+
+    if end is None:
+        # the lines inside a token that runs to the end of the text never
+        # got a checkpoint this time, so what they hold is stale
+        cps[first + line :] = [None] * (len(cps) - first - line)
+
+    region_end = "end" if end is None else f"{end}.0"
+
+    for tag, _ in style_table(theme).values():
+        widget.tag_remove(tag, f"{first}.0", region_end)
+
+    tk_highlight.add_ranges(
+        widget, ((tag, index(s), index(e)) for tag, s, e in spans)
+    )
+
+
+# Whole document, one lex pass
+def highlight_all(widget, theme):
+    configure(widget, theme)
+
+    text = widget.get("1.0", "end-1c")
+    lines = _lines[str(widget)] = text.split("\n")
+    cps = _checkpoints[str(widget)] = [None] * len(lines)
+
+    _relex(widget, theme, text, 1, ("root",), cps)
+
+
+# After an edit: finds the lines that changed since the last pass,
+# resumes lexing from the nearest saved state above them and goes on
+# only as far as the state keeps differing from last time.
+def highlight_changes(widget, theme):
+    key = str(widget)
+    if key not in _lines:
+        highlight_all(widget, theme)
+        return
+
+    configure(widget, theme)
+
+    old = _lines[key]
+    new = _lines[key] = widget.get("1.0", "end-1c").split("\n")
+    if new == old:
+        return
+
+    top, dirty_end = tk_highlight.changed_lines(old, new)
+
+    # line top still starts in the state it had, only the lines after it
+    # can start differently now
+    cps = _checkpoints[key]
+    start = cps[top] if top < len(cps) else None
+    cps[top : len(cps) - (len(new) - dirty_end)] = [None] * (dirty_end - top)
+    if top < len(cps):
+        cps[top] = start
+
+    k = min(top, len(new) - 1)
+    while k and not cps[k]:
+        k -= 1
+
+    stack = cps[k] or ("root",)
+    text = "\n".join(new[k:])
+
+    _relex(widget, theme, text, k + 1, stack, cps, stop=dirty_end - 1)
@@ -0,0 +1,46 @@
+import queue
+import sys
+import time
+
+
+# Worker threads must not touch Tk widgets. They post() the call they
+# want made instead, and the Tk main thread runs everything posted every
+# poll_ms, in order, for at most slice_ms per round so a flood of posts
+# cannot freeze the window.
+
+poll_ms = 20
+slice_ms = 15
+
+_calls = queue.SimpleQueue()
+_root = None
+
+
+# Called once by each IDE before mainloop(); posts made earlier wait
+def start(root):
+    global _root
+
+    if _root is None:
+        _root = root
+        root.after(poll_ms, _drain)
+
+
+def post(func, *args):
+    _calls.put((func, args))
+
+
+def _drain():
+    deadline = time.perf_counter() + slice_ms / 1000
+
+    while time.perf_counter() < deadline:
+        try:
+            func, args = _calls.get_nowait()
+        except queue.Empty:
+            break
+
+        try:
+            func(*args)
+        except Exception:
+            # reported like an exception in any other Tk callback
+            _root.report_callback_exception(*sys.exc_info())
+
+    _root.after(poll_ms, _drain)